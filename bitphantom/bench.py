@@ -0,0 +1,238 @@
+"""A small benchmark runner for the bencode and metainfo hot paths.
+
+Benchmarks are registered with :func:`benchmark` by the modules of a suite package (by default
+``bitphantom.benchmarks``). Each one is set up once per input size and timed over several
+rounds, and the best time is kept. Results are written as json and can be compared against a
+stored baseline, failing when a benchmark got slower than a threshold allows. The suite ships
+the baseline of its default run, refresh it with ``-o`` when the reference machine changes.
+
+	python -m bitphantom.bench --baseline bitphantom/benchmarks/baseline.json
+	python -m bitphantom.bench -o bitphantom/benchmarks/baseline.json
+"""
+
+import argparse as ap
+import gc
+import importlib
+import json
+import pkgutil
+import platform
+import sys
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, NoReturn, TextIO
+
+from . import __version__
+
+SUITE: str = "bitphantom.benchmarks"
+ROUNDS: int = 5
+MIN_ROUND_TIME: float = 0.05
+THRESHOLD: float = 0.10
+
+SIZES: dict[str, int] = {
+	"10KB": 10 * 2**10,
+	"1MB": 2**20,
+	"50MB": 50 * 2**20,
+	"500MB": 500 * 2**20,
+}
+DEFAULT_MAX_SIZE: str = "1MB"
+
+Setup = Callable[[int], Callable[[], object]]
+
+
+@dataclass
+class Benchmark:
+	name: str
+	setup: Setup
+	sizes: tuple[str, ...]
+
+
+REGISTRY: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, sizes: Sequence[str] = tuple(SIZES)) -> Callable[[Setup], Setup]:
+	"""Registers a benchmark under ``name``.
+
+	The decorated function is given an input size in bytes, prepares its input and returns the
+	function to time. Preparation is not timed.
+	"""
+
+	def register(setup: Setup) -> Setup:
+		if name in REGISTRY:
+			raise ValueError(f"benchmark {name} is already registered")
+		REGISTRY[name] = Benchmark(name, setup, tuple(sizes))
+		return setup
+
+	return register
+
+
+def load_suite(suite: str = SUITE):
+	"""Imports every module of the ``suite`` package, which registers its benchmarks."""
+	package = importlib.import_module(suite)
+	for module in pkgutil.iter_modules(package.__path__, package.__name__ + "."):
+		importlib.import_module(module.name)
+
+
+def measure(fn: Callable[[], object], rounds: int = ROUNDS) -> float:
+	"""Returns the best time in seconds of a call to ``fn`` over ``rounds`` rounds.
+
+	A round repeats the call until it lasts at least :data:`MIN_ROUND_TIME`, so fast functions
+	are not dominated by the timer resolution. The garbage collector is off while timing.
+	"""
+	fn()  # warm up caches and lazy imports
+	gc_was_enabled = gc.isenabled()
+	gc.disable()
+	try:
+		best = float("inf")
+		for _ in range(rounds):
+			calls = 0
+			start = time.perf_counter()
+			while True:
+				fn()
+				calls += 1
+				elapsed = time.perf_counter() - start
+				if elapsed >= MIN_ROUND_TIME:
+					break
+			best = min(best, elapsed / calls)
+		return best
+	finally:
+		if gc_was_enabled:
+			gc.enable()
+
+
+def run(
+	max_size: str = DEFAULT_MAX_SIZE,
+	selected: str | None = None,
+	rounds: int = ROUNDS,
+	log: TextIO | None = None,
+) -> dict[str, Any]:
+	"""Runs the registered benchmarks whose name contains ``selected``, up to ``max_size`` inputs."""
+	limit = SIZES[max_size]
+	results: dict[str, dict[str, float]] = {}
+
+	for bench in sorted(REGISTRY.values(), key=lambda bench: bench.name):
+		if selected is not None and selected not in bench.name:
+			continue
+		for label in bench.sizes:
+			size = SIZES[label]
+			if size > limit:
+				continue
+			fn = bench.setup(size)
+			seconds = measure(fn, rounds)
+			key = "%s/%s" % (bench.name, label)
+			results[key] = {"seconds": seconds, "throughput": size / seconds}
+			if log is not None:
+				print("%-40s %12.6f s %10.1f MB/s" % (key, seconds, size / seconds / 2**20), file=log)
+
+	return {
+		"version": __version__,
+		"python": platform.python_version(),
+		"implementation": platform.python_implementation(),
+		"machine": platform.machine(),
+		"results": results,
+	}
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float = THRESHOLD) -> list[str]:
+	"""Returns a description of every benchmark that is slower than its baseline beyond ``threshold``.
+
+	Benchmarks missing from either side are not compared.
+	"""
+	regressions = []
+	old_results = baseline["results"]
+	for key, result in results["results"].items():
+		old = old_results.get(key)
+		if old is None:
+			continue
+		ratio = result["seconds"] / old["seconds"]
+		if ratio > 1 + threshold:
+			change = 100 * (ratio - 1)
+			regressions.append("%s: %.6f s -> %.6f s (%+.1f%%)" % (key, old["seconds"], result["seconds"], change))
+	return regressions
+
+
+def err(*msg: str, file: TextIO = sys.stderr, exit_code: int = 1) -> NoReturn:
+	print("\n".join(msg), file=file)
+	exit(exit_code)
+
+
+def init_parser() -> ap.ArgumentParser:
+	parser = ap.ArgumentParser(description=__doc__, formatter_class=ap.RawDescriptionHelpFormatter)
+	parser.add_argument(
+		"-v",
+		"--version",
+		help="script version",
+		action="store_true",
+	)
+	parser.add_argument(
+		"-o",
+		"--outfile",
+		help="path to write the json results to",
+		type=ap.FileType("w"),
+	)
+	parser.add_argument(
+		"--baseline",
+		help="path to json results to compare against, failing on regressions",
+		type=ap.FileType("r"),
+	)
+	parser.add_argument(
+		"--threshold",
+		help=f"tolerated slowdown ratio against the baseline (defaults to {THRESHOLD})",
+		type=float,
+		default=THRESHOLD,
+	)
+	parser.add_argument(
+		"--max-size",
+		help=f"largest input size to run (defaults to {DEFAULT_MAX_SIZE})",
+		choices=tuple(SIZES),
+		default=DEFAULT_MAX_SIZE,
+	)
+	parser.add_argument(
+		"-k",
+		"--select",
+		help="only run benchmarks whose name contains this string",
+	)
+	parser.add_argument(
+		"--rounds",
+		help=f"number of timed rounds per benchmark (defaults to {ROUNDS})",
+		type=int,
+		default=ROUNDS,
+	)
+	parser.add_argument(
+		"--suite",
+		help=f"package holding the benchmark modules (defaults to {SUITE})",
+		default=SUITE,
+	)
+	return parser
+
+
+def main(args: Sequence[str] | None = None) -> int:
+	parser = init_parser()
+	ns = parser.parse_args(args)
+
+	if ns.version:
+		print(__version__)
+		return 0
+
+	try:
+		load_suite(ns.suite)
+	except ImportError as e:
+		err("cannot load the benchmark suite", e.__str__())
+
+	results = run(ns.max_size, ns.select, ns.rounds, sys.stderr)
+	if ns.outfile is not None:
+		json.dump(results, ns.outfile, indent=1)
+
+	if ns.baseline is not None:
+		regressions = compare(results, json.load(ns.baseline), ns.threshold)
+		if regressions:
+			err("regressions against the baseline:", *regressions)
+
+	return 0
+
+
+if __name__ == "__main__":
+	# suite modules register into the importable bitphantom.bench, not into this __main__ copy
+	from bitphantom.bench import main as bench_main
+
+	exit(bench_main(sys.argv[1:]))
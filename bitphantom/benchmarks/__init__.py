@@ -0,0 +1,88 @@
+"""Benchmark suite of ``python -m bitphantom.bench``, with generators of synthetic inputs.
+
+Every generator is seeded, so a given size always produces the same input. ``baseline.json``
+holds reference results of the default run to compare against.
+"""
+
+import random
+
+from ..bencode import Bencode, encode
+from ..meta_info import CHUNK_SIZE
+
+PIECE_LENGTH: int = 2**18
+NESTING_DEPTH: int = 64
+
+
+def synthetic_metainfo(size: int, file_count: int = 8, seed: int = 0) -> dict[str, Bencode]:
+	"""A multi-file metainfo of about ``size`` bytes, almost all of which is its pieces blob."""
+	rng = random.Random(seed)
+	piece_count = max(1, (size - 64 * file_count) // CHUNK_SIZE)
+	total = piece_count * PIECE_LENGTH
+
+	files: list[Bencode] = []
+	for i in range(file_count):
+		length = total // file_count + (total % file_count if i == file_count - 1 else 0)
+		path = [b"dir%02d" % (i % 4), b"file%06d.bin" % i]
+		files.append({"length": length, "path": path})  # type: ignore[dict-item]
+
+	return {
+		"announce": b"http://tracker.example/announce",
+		"announce-list": [[b"http://tracker.example/announce"], [b"udp://backup.example:6969"]],
+		"info": {
+			"files": files,
+			"name": b"bench",
+			"piece length": PIECE_LENGTH,
+			"pieces": rng.randbytes(CHUNK_SIZE * piece_count),
+		},
+	}
+
+
+def synthetic_torrent(size: int, seed: int = 0) -> bytes:
+	return encode(synthetic_metainfo(size, seed=seed))
+
+
+def many_files_torrent(size: int, seed: int = 0) -> bytes:
+	"""A metainfo of about ``size`` bytes spent mostly on small file entries."""
+	return encode(synthetic_metainfo(size, file_count=max(1, size // 128), seed=seed))
+
+
+def many_keys(size: int, seed: int = 0) -> bytes:
+	"""A flat dictionary of about ``size`` bytes with short keys and small values."""
+	rng = random.Random(seed)
+	count = max(1, size // 20)
+	return encode({"k%08d" % i: rng.randrange(2**16) for i in range(count)})
+
+
+def deep_nesting(size: int, seed: int = 0) -> bytes:
+	"""A list of about ``size`` bytes of lists nested :data:`NESTING_DEPTH` levels deep."""
+	rng = random.Random(seed)
+	nested: Bencode = [rng.randrange(2**16), b"leaf"]
+	for _ in range(NESTING_DEPTH):
+		nested = [nested]
+	unit = encode(nested)
+	return b"l" + unit * max(1, size // len(unit)) + b"e"
+
+
+def messages(size: int, seed: int = 0) -> bytes:
+	"""A list of about ``size`` bytes of small, identically shaped announce responses."""
+	rng = random.Random(seed)
+	unit = 76
+	responses: list[Bencode] = [
+		{
+			"complete": rng.randrange(2**10),
+			"incomplete": rng.randrange(2**10),
+			"interval": 1800,
+			"peers": rng.randbytes(12),
+		}
+		for _ in range(max(1, size // unit))
+	]
+	return encode(responses)
+
+
+INPUTS = {
+	"torrent": synthetic_torrent,
+	"files": many_files_torrent,
+	"keys": many_keys,
+	"nested": deep_nesting,
+	"messages": messages,
+}
@@ -0,0 +1,21 @@
+from ..bench import benchmark
+from ..bencode import decode, encode
+from . import INPUTS
+
+
+def _register(kind: str):
+	generate = INPUTS[kind]
+
+	@benchmark("decode." + kind)
+	def bench_decode(size: int):
+		buf = generate(size)
+		return lambda: decode(buf)
+
+	@benchmark("encode." + kind)
+	def bench_encode(size: int):
+		obj, _ = decode(generate(size))
+		return lambda: encode(obj)
+
+
+for kind in INPUTS:
+	_register(kind)
@@ -0,0 +1,23 @@
+from collections import deque
+
+from ..bench import benchmark
+from ..meta_info import iterate_pieces, loads_metainfo
+from . import many_files_torrent, synthetic_torrent
+
+
+@benchmark("loads_metainfo.torrent")
+def bench_loads_torrent(size: int):
+	source = synthetic_torrent(size)
+	return lambda: loads_metainfo(source)
+
+
+@benchmark("loads_metainfo.files", sizes=("10KB", "1MB", "50MB"))
+def bench_loads_files(size: int):
+	source = many_files_torrent(size)
+	return lambda: loads_metainfo(source)
+
+
+@benchmark("iterate_pieces.torrent")
+def bench_iterate_pieces(size: int):
+	pieces = loads_metainfo(synthetic_torrent(size)).pieces
+	return lambda: deque(iterate_pieces(pieces), maxlen=0)
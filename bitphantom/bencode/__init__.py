@@ -1,11 +1,29 @@
 from .bencode_types import Bencode, BenDictionary, BenList
-from .decode import decode, decode_bytestring, decode_dictionary, decode_integer, decode_list
-from .encode import encode, encode_bytestring, encode_dictionary, encode_integer, encode_list
+from .decode import Buffer, Offset, Span, decode, decode_bytestring, decode_dictionary, decode_integer, decode_list
+from .encode import (
+	Writable,
+	encode,
+	encode_bytestring,
+	encode_dictionary,
+	encode_integer,
+	encode_list,
+	encode_to,
+	iter_encode,
+)
+from .index import StructuralIndex, scan
+from .instrument import Stats, collect_stats, phase
+from .lookup import query, query_bytes, query_span, skip
+from .schema import field, marshal, schema, unmarshal
+from .stream import StreamDecoder, Token, Tokenizer
+from .validate import Invalid, validate
 
 __all__ = [
 	"Bencode",
 	"BenDictionary",
 	"BenList",
+	"Buffer",
+	"Offset",
+	"Span",
 	"decode",
 	"decode_bytestring",
 	"decode_dictionary",
@@ -16,4 +34,25 @@ __all__ = [
 	"encode_dictionary",
 	"encode_integer",
 	"encode_list",
+	"encode_to",
+	"iter_encode",
+	"Writable",
+	"query",
+	"query_bytes",
+	"query_span",
+	"skip",
+	"scan",
+	"field",
+	"marshal",
+	"schema",
+	"unmarshal",
+	"Stats",
+	"collect_stats",
+	"phase",
+	"StructuralIndex",
+	"StreamDecoder",
+	"Token",
+	"Tokenizer",
+	"Invalid",
+	"validate",
 ]
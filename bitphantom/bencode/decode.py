@@ -1,112 +1,206 @@
-# TODO: unmarshaling
-# TODO: add an initial scanning for basic syntax checking so that no allocations are wasted
 # TODO: add logging
-# TODO: use errors as values instead of raising them
 
-from collections.abc import Callable
-from typing import TypeAlias
+from typing import Any, NoReturn, TypeAlias
 
+from . import instrument
 from .bencode_types import BenDictionary, BenList, Bencode
+from .scanner import DICTIONARY, EARLY_EOB, END, INTEGER, INTEGER_TOKEN, LENGTH_TOKEN, LIST, NINE, ZERO, Offset
 
-Offset: TypeAlias = int
+Buffer: TypeAlias = bytes | bytearray | memoryview
+Span: TypeAlias = tuple[Offset, Offset]
 
 
-EARLY_EOB: str = "buffer ended too early"
+def view(buf: Buffer) -> memoryview:
+	"""Returns a flat byte view over ``buf`` without copying it."""
+	mv = memoryview(buf)
+	if mv.format != "B" or mv.ndim != 1:
+		mv = mv.cast("B")
+	return mv
 
 
-def decode(buf: bytes) -> tuple[Bencode, Offset]:
-	if len(buf) < 2:  # smallest bencodes are ``0:``, ``le``, ``de``
-		raise ValueError(EARLY_EOB)
-
-	decoder: Callable[[bytes], tuple[Bencode, Offset]]
-	c = buf[0]
-
-	if c == ord(b"i"):
-		decoder = decode_integer
-	elif c == ord(b"l"):
-		decoder = decode_list
-	elif c == ord(b"d"):
-		decoder = decode_dictionary
-	elif ord(b"0") <= c <= ord(b"9"):
-		return decode_bytestring(buf)
-	else:
-		raise ValueError(f"invalid tokens at {chr(c)}")
-
-	val, offset = decoder(buf[1:])
-	return val, offset + 1
-
-
-def decode_bytestring(buf: bytes) -> tuple[bytes, Offset]:
-	idx = buf.find(b":")
-	if idx < 1:
-		raise ValueError("invalid string literal")
-
-	size_str = buf[:idx]
-	try:
-		size = int(size_str)
-	except ValueError:
-		raise ValueError(f"failed to read {size_str} an integer")
-
-	start = idx + 1
-	end = start + size
-	bytestring = buf[start:end]
-	actual_size = len(bytestring)
-	if actual_size != size:
-		raise ValueError(f"bytestring of size {actual_size} does not match encoded size of {size}")
+def decode(buf: Buffer, start: Offset = 0, max_depth: int | None = None) -> tuple[Bencode, Offset]:
+	"""Decodes the bencode value starting at ``buf[start]``.
 
-	return bytestring, end
+	Returns the value and the offset right after it. The buffer is walked through a single
+	:class:`memoryview`, so only the decoded bytestrings are ever copied out of it. Nesting is
+	tracked on an explicit stack, so any depth decodes unless it exceeds ``max_depth``.
+	"""
+	if len(buf) - start < 2:  # smallest bencodes are ``0:``, ``le``, ``de``
+		raise ValueError(EARLY_EOB)
 
+	with view(buf) as mv:
+		if instrument.active is None:
+			return _decode(mv, start, max_depth)
+		with instrument.phase("decode"):
+			value, end = _decode(mv, start, max_depth)
+	instrument.record_decode(value, end - start)
+	return value, end
+
+
+def decode_value(buf: bytes | memoryview, start: Offset = 0, max_depth: int | None = None) -> tuple[Bencode, Offset]:
+	"""Decodes the value at ``buf[start]`` like :func:`decode`, but is neither timed nor counted.
+
+	It is meant for readers that already hold a view of the buffer and do their own accounting.
+	"""
+	return _decode(buf, start, max_depth)  # type: ignore[arg-type]
+
+
+def decode_bytestring(buf: Buffer, start: Offset = 0) -> tuple[bytes, Offset]:
+	with view(buf) as mv:
+		return _decode_bytestring(mv, start)
+
+
+def decode_integer(buf: Buffer, start: Offset = 0) -> tuple[int, Offset]:
+	"""Decodes an integer whose leading ``i`` is right before ``buf[start]``."""
+	with view(buf) as mv:
+		return _decode_integer(mv, start)
+
+
+def decode_list(buf: Buffer, start: Offset = 0, max_depth: int | None = None) -> tuple[BenList, Offset]:
+	"""Decodes a list whose leading ``l`` is right before ``buf[start]``."""
+	res: BenList = []
+	with view(buf) as mv:
+		_, end = _decode(mv, start, max_depth, res)
+	return res, end
+
+
+def decode_dictionary(
+	buf: Buffer,
+	start: Offset = 0,
+	spans: dict[str, Span] | None = None,
+	max_depth: int | None = None,
+) -> tuple[BenDictionary, Offset]:
+	"""Decodes a dictionary whose leading ``d`` is right before ``buf[start]``.
+
+	If ``spans`` is given, the ``(start, end)`` offsets of every value of this dictionary are
+	stored in it under the value's key, so ``buf[start:end]`` is the value's raw bencode.
+	"""
+	res: BenDictionary = {}
+	with view(buf) as mv:
+		if instrument.active is None:
+			_, end = _decode(mv, start, max_depth, res, spans)
+			return res, end
+		with instrument.phase("decode"):
+			_, end = _decode(mv, start, max_depth, res, spans)
+	instrument.record_decode(res, end - start + 1)  # with the leading ``d``
+	return res, end
+
+
+def _decode(
+	mv: memoryview,
+	i: Offset,
+	max_depth: int | None = None,
+	container: BenList | BenDictionary | None = None,
+	spans: dict[str, Span] | None = None,
+) -> tuple[Bencode, Offset]:
+	"""Decodes the value at ``mv[i]``, or the items of ``container`` if one is already open.
+
+	Open containers are kept on an explicit stack along with the key awaiting its value, so the
+	depth is only bounded by ``max_depth`` and memory. ``spans`` records where the values of the
+	outermost dictionary are.
+	"""
+	size = len(mv)
+	stack: list[tuple[Any, str | None, bool]] = []
+	parent: Any = container
+	key: str | None = None
+	in_dictionary = isinstance(container, dict)
+	depth = 0 if container is None else 1
+	value_start = i
 
-def decode_integer(buf: bytes) -> tuple[int, Offset]:
-	end = buf.find(b"e")
-	if end < 1:
-		raise ValueError("empty integer literal")
+	while True:
+		if i >= size:
+			if parent is None or key is not None:
+				raise ValueError(EARLY_EOB)
+			raise ValueError(EARLY_EOB + (" while processing a dictionary" if in_dictionary else " while processing a list"))
+
+		c = mv[i]
+		value: Bencode
+		if c == END and key is None and parent is not None:
+			i += 1
+			value = parent
+			if not stack:
+				return value, i
+			parent, key, in_dictionary = stack.pop()
+			depth -= 1
+
+		elif in_dictionary and key is None:
+			match = LENGTH_TOKEN.match(mv, i)
+			if match is None:
+				raise ValueError("invalid string literal")
+			start = match.end()
+			i = start + int(match.group(1))
+			if i > size:
+				_bytestring_overflow(mv, start, i)
+			try:
+				key = str(mv[start:i], encoding="utf-8", errors="strict")
+			except UnicodeDecodeError:
+				raise ValueError("non utf8 dictionary key")
+			if not stack:
+				value_start = i
+			continue
+
+		elif ZERO <= c <= NINE:
+			match = LENGTH_TOKEN.match(mv, i)
+			if match is None:
+				raise ValueError("invalid string literal")
+			start = match.end()
+			i = start + int(match.group(1))
+			if i > size:
+				_bytestring_overflow(mv, start, i)
+			value = bytes(mv[start:i])
+
+		elif c == INTEGER:
+			value, i = _decode_integer(mv, i + 1)
+
+		elif c == LIST or c == DICTIONARY:
+			if max_depth is not None and depth >= max_depth:
+				raise ValueError(f"nesting deeper than {max_depth} at offset {i}")
+			if parent is not None:
+				stack.append((parent, key, in_dictionary))
+			parent = [] if c == LIST else {}
+			key = None
+			in_dictionary = c == DICTIONARY
+			depth += 1
+			i += 1
+			continue
 
-	integer_str = buf[:end]
-	try:
-		integer = int(integer_str)
-	except ValueError:
-		raise ValueError(f"failed to read {integer_str} an integer")
+		else:
+			raise ValueError(f"invalid tokens at {chr(c)}")
+
+		if parent is None:
+			return value, i
+		elif in_dictionary:
+			parent[key] = value
+			if spans is not None and not stack:
+				spans[key] = (value_start, i)  # type: ignore[index]
+			key = None
+		else:
+			parent.append(value)
 
-	return integer, end + 1
 
+def _bytestring_overflow(mv: memoryview, start: Offset, end: Offset) -> NoReturn:
+	actual_size, size = len(mv) - start, end - start
+	raise ValueError(f"bytestring of size {actual_size} does not match encoded size of {size}")
 
-def decode_list(buf: bytes) -> tuple[BenList, Offset]:
-	res: list[Bencode] = []
-	offset: int = 0
 
-	while True:
-		if len(buf) < 1:
-			raise ValueError(EARLY_EOB + " while processing a list")
-		elif buf[0] == ord(b"e"):
-			return res, offset + 1
-		else:
-			val, j = decode(buf)
-			buf = buf[j:]
-			offset += j
-			res.append(val)
+def _decode_bytestring(mv: memoryview, i: Offset) -> tuple[bytes, Offset]:
+	match = LENGTH_TOKEN.match(mv, i)
+	if match is None:
+		raise ValueError("invalid string literal")
 
+	start = match.end()
+	end = start + int(match.group(1))
+	if end > len(mv):
+		_bytestring_overflow(mv, start, end)
 
-def decode_dictionary(buf: bytes) -> tuple[BenDictionary, Offset]:
-	res: dict[str, Bencode] = {}
-	offset: int = 0
+	return bytes(mv[start:end]), end
 
-	while True:
-		if len(buf) < 1:
-			raise ValueError(EARLY_EOB + " while processing a dictionary")
-		elif buf[0] == ord(b"e"):
-			return res, offset + 1
-		else:
-			key_bytes, j = decode_bytestring(buf)
-			try:
-				key = key_bytes.decode(encoding="utf-8", errors="strict")
-			except UnicodeDecodeError:
-				raise ValueError("non utf8 dictionary key")
-			buf = buf[j:]
-			offset += j
 
-			val, j = decode(buf)
-			buf = buf[j:]
-			offset += j
+def _decode_integer(mv: memoryview, i: Offset) -> tuple[int, Offset]:
+	match = INTEGER_TOKEN.match(mv, i)
+	if match is None:
+		if i < len(mv) and mv[i] == END:
+			raise ValueError("empty integer literal")
+		raise ValueError(f"failed to read an integer at offset {i}")
 
-			res[key] = val
+	return int(match.group(1)), match.end()
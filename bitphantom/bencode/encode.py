@@ -1,42 +1,106 @@
-# TODO: marshaling
 # TODO: add logging
 # TODO: use errors as values instead of raising them
 
+from collections.abc import Callable, Iterator
+from itertools import chain
+from typing import Any, Protocol
 
+from . import instrument
 from .bencode_types import Bencode
+from .scanner import DICTIONARY, END, LIST
+
+CHUNK_SIZE: int = 2**16
+KEY_CACHE_SIZE: int = 1024
+
+
+class Writable(Protocol):
+	def write(self, data: bytes | bytearray | memoryview, /) -> object: ...
 
 
 def encode(bencode: Bencode, buf: bytearray | None = None) -> bytes:
-	buf = encode_value(bencode)
-	return bytes(buf)
+	if instrument.active is None:
+		return bytes(encode_value(bencode, buf))
+	with instrument.phase("encode"):
+		encoded = bytes(encode_value(bencode, buf))
+	instrument.record_encode(len(encoded))
+	return encoded
+
+
+def encode_to(bencode: Bencode, writable: Writable, chunk_size: int = CHUNK_SIZE) -> int:
+	"""Writes the bencode of ``bencode`` to ``writable`` and returns the number of bytes written.
+
+	``writable`` is anything with a ``write`` method taking bytes, e.g. a binary file or an
+	asyncio transport. The output is written in chunks of about ``chunk_size`` bytes.
+	"""
+	written = 0
+	for chunk in iter_encode(bencode, chunk_size):
+		writable.write(chunk)
+		written += len(chunk)
+	instrument.record_encode(written)
+	return written
+
+
+def iter_encode(bencode: Bencode, chunk_size: int = CHUNK_SIZE) -> Iterator[bytearray | memoryview]:
+	"""Yields the bencode of ``bencode`` in chunks of about ``chunk_size`` bytes.
+
+	Bytestrings of at least ``chunk_size`` bytes are yielded on their own as views of the
+	original object instead of being copied into a chunk.
+	"""
+	buf = bytearray()
+	stack: list[Iterator[Bencode]] = [iter((bencode,))]
+
+	while stack:
+		for value in stack[-1]:
+			encoder = _encoder(type(value))
+			if encoder is _encode_list:
+				buf.append(LIST)
+				stack.append(iter(value))  # type: ignore[arg-type]
+				break
+			elif encoder is _encode_dictionary:
+				buf.append(DICTIONARY)
+				stack.append(_iterate_dictionary(value))  # type: ignore[arg-type]
+				break
+			elif encoder is _encode_integer or len(value) < chunk_size:  # type: ignore[arg-type]
+				encoder(value, buf)
+			else:
+				bs = value.encode() if encoder is _encode_str else value  # type: ignore[union-attr]
+				buf += b"%d:" % len(bs)  # type: ignore[arg-type]
+				yield buf
+				buf = bytearray()
+				yield memoryview(bs)  # type: ignore[arg-type]
+
+			if len(buf) >= chunk_size:
+				yield buf
+				buf = bytearray()
+		else:
+			stack.pop()
+			if stack:
+				buf.append(END)
+
+	if buf:
+		yield buf
+
+
+def _iterate_dictionary(d: dict[str, Bencode]) -> Iterator[Bencode]:
+	return chain.from_iterable((key, d[key]) for key in sorted(d))
 
 
 def encode_value(bencode: Bencode, buf: bytearray | None = None) -> bytearray:
 	if buf is None:
 		buf = bytearray()
-
-	if isinstance(bencode, list):
-		return encode_list(bencode, buf)
-	elif isinstance(bencode, dict):
-		return encode_dictionary(bencode, buf)
-	elif isinstance(bencode, int):
-		return encode_integer(bencode, buf)
-	elif isinstance(bencode, (bytes, bytearray, str)):
-		return encode_bytestring(bencode, buf)
+	_encoder(type(bencode))(bencode, buf)
+	return buf
 
 
 def encode_bytestring(bs: bytes | bytearray | str, buf: bytearray | None = None) -> bytearray:
 	if buf is None:
 		buf = bytearray()
 
-	size = len(bs)
-	buf += str(size).encode()
-	buf.append(ord(b":"))
-
 	if isinstance(bs, str):
-		buf += bs.encode()
-	else:
-		buf += bs
+		bs = bs.encode()
+
+	buf += b"%d:" % len(bs)
+	buf += bs
 
 	return buf
 
@@ -44,31 +108,104 @@ def encode_bytestring(bs: bytes | bytearray | str, buf: bytearray | None = None)
 def encode_integer(i: int, buf: bytearray | None = None) -> bytearray:
 	if buf is None:
 		buf = bytearray()
-	buf += f"i{i}e".encode()
+	buf += b"i%de" % i
 	return buf
 
 
 def encode_list(ls: list[Bencode], buf: bytearray | None = None) -> bytearray:
 	if buf is None:
 		buf = bytearray()
-
-	buf.append(ord(b"l"))
-	for bencode in ls:
-		encode_value(bencode, buf)
-	buf.append(ord(b"e"))
-
+	_encode_list(ls, buf)
 	return buf
 
 
 def encode_dictionary(d: dict[str, Bencode], buf: bytearray | None = None) -> bytearray:
 	if buf is None:
 		buf = bytearray()
+	_encode_dictionary(d, buf)
+	return buf
 
-	buf.append(ord(b"d"))
-	keys = sorted((key for key in d))
-	for key in keys:
-		encode_bytestring(key, buf)
-		encode_value(d[key], buf)
-	buf.append(ord(b"e"))
 
-	return buf
+def _encode_bytes(bs: bytes | bytearray, buf: bytearray):
+	buf += b"%d:" % len(bs)
+	buf += bs
+
+
+def _encode_str(s: str, buf: bytearray):
+	bs = s.encode()
+	buf += b"%d:" % len(bs)
+	buf += bs
+
+
+def _encode_integer(i: int, buf: bytearray):
+	buf += b"i%de" % i
+
+
+def _encode_list(ls: list[Bencode], buf: bytearray):
+	buf += b"l"
+	for value in ls:
+		t = type(value)
+		if t is bytes:
+			buf += b"%d:" % len(value)  # type: ignore[arg-type]
+			buf += value  # type: ignore[operator]
+		elif t is int:
+			buf += b"i%de" % value
+		else:
+			_encoder(t)(value, buf)
+	buf += b"e"
+
+
+def _encode_dictionary(d: dict[str, Bencode], buf: bytearray):
+	buf += b"d"
+	keys = _KEY_CACHE
+	for key in sorted(d):
+		encoded_key = keys.get(key)
+		if encoded_key is None:
+			encoded_key = _encode_key(key)
+		buf += encoded_key
+
+		value = d[key]
+		t = type(value)
+		if t is bytes:
+			buf += b"%d:" % len(value)  # type: ignore[arg-type]
+			buf += value  # type: ignore[operator]
+		elif t is int:
+			buf += b"i%de" % value
+		else:
+			_encoder(t)(value, buf)
+	buf += b"e"
+
+
+def _encode_key(key: str | bytes) -> bytes:
+	bs = key.encode() if isinstance(key, str) else key
+	encoded_key = b"%d:%s" % (len(bs), bs)
+	if len(_KEY_CACHE) >= KEY_CACHE_SIZE:
+		_KEY_CACHE.clear()
+	_KEY_CACHE[key] = encoded_key
+	return encoded_key
+
+
+_KEY_CACHE: dict[str | bytes, bytes] = {}
+
+_ENCODERS: dict[type, Callable[[Any, bytearray], None]] = {
+	bytes: _encode_bytes,
+	bytearray: _encode_bytes,
+	str: _encode_str,
+	int: _encode_integer,
+	bool: _encode_integer,
+	list: _encode_list,
+	dict: _encode_dictionary,
+}
+
+
+def _encoder(t: type) -> Callable[[Any, bytearray], None]:
+	"""Returns the encoder of type ``t``, or of its closest supported base class."""
+	encoder = _ENCODERS.get(t)
+	if encoder is not None:
+		return encoder
+	for base in t.__mro__[1:]:
+		encoder = _ENCODERS.get(base)
+		if encoder is not None:
+			_ENCODERS[t] = encoder
+			return encoder
+	raise TypeError(f"cannot bencode a value of type {t.__name__}")
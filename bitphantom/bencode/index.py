@@ -0,0 +1,170 @@
+"""A structural index over a bencode buffer.
+
+:func:`scan` validates a whole bencode value in one pass and records where each of its tokens
+lives, without allocating any of the decoded values. Tokens are numbered in document order, so
+a container's descendants directly follow it and ``nexts[t]`` is the token right after its
+subtree. Decoding, skipping and path queries then work off those arrays, see the ``index``
+argument of :func:`~bitphantom.bencode.query`.
+"""
+
+import bisect
+from array import array
+from collections.abc import Iterator, Sequence
+
+from .bencode_types import Bencode
+from .decode import Buffer, Span, view
+from .scanner import BYTESTRING, DICTIONARY, INTEGER, LIST, Offset, Tables, walk
+
+
+class StructuralIndex:
+	"""Token tables of a scanned bencode value.
+
+	For token ``t``, ``kinds[t]`` is one of :data:`INTEGER`, :data:`BYTESTRING`, :data:`LIST` or
+	:data:`DICTIONARY`, ``buf[starts[t]:ends[t]]`` is its raw bencode, ``buf[payloads[t]:ends[t]]``
+	holds the bytes of a bytestring (or the digits and trailing ``e`` of an integer), and
+	``nexts[t]`` is the first token after it and all of its descendants.
+	"""
+
+	def __init__(
+		self,
+		buf: Buffer,
+		kinds: bytearray,
+		starts: array,
+		ends: array,
+		payloads: array,
+		nexts: array,
+	):
+		self.buf = buf
+		self.kinds = kinds
+		self.starts = starts
+		self.ends = ends
+		self.payloads = payloads
+		self.nexts = nexts
+
+	def __len__(self) -> int:
+		return len(self.kinds)
+
+	@property
+	def end(self) -> Offset:
+		"""Offset right after the indexed value."""
+		return self.ends[0]
+
+	def span(self, token: int = 0) -> Span:
+		return self.starts[token], self.ends[token]
+
+	def token_at(self, offset: Offset) -> int:
+		"""Returns the token whose raw bencode starts at ``offset``."""
+		token = bisect.bisect_left(self.starts, offset)
+		if token == len(self.kinds) or self.starts[token] != offset:
+			raise ValueError("no indexed value starts at offset %d" % offset)
+		return token
+
+	def find(self, path: Sequence[str | bytes | int], token: int = 0) -> int | None:
+		"""Returns the token at ``path`` below ``token``, or ``None`` if it is missing.
+
+		``path`` holds dictionary keys and list indices, as in :func:`~bitphantom.bencode.query`.
+		"""
+		kinds, nexts = self.kinds, self.nexts
+		for item in path:
+			if isinstance(item, int):
+				if item < 0:
+					raise ValueError("negative list index %d in path" % item)
+				if kinds[token] != LIST:
+					return None
+				child, end = token + 1, nexts[token]
+				for _ in range(item):
+					if child >= end:
+						return None
+					child = nexts[child]
+				if child >= end:
+					return None
+				token = child
+			else:
+				if kinds[token] != DICTIONARY:
+					return None
+				found = self.get(item, token)
+				if found is None:
+					return None
+				token = found
+		return token
+
+	def children(self, token: int = 0) -> Iterator[int]:
+		"""Iterates over the items of a list, or the alternating keys and values of a dictionary."""
+		child, end = token + 1, self.nexts[token]
+		nexts = self.nexts
+		while child < end:
+			yield child
+			child = nexts[child]
+
+	def items(self, token: int = 0) -> Iterator[tuple[int, int]]:
+		"""Iterates over the ``(key token, value token)`` pairs of a dictionary."""
+		if self.kinds[token] != DICTIONARY:
+			raise ValueError("token %d is not a dictionary" % token)
+		children = self.children(token)
+		return zip(children, children)
+
+	def get(self, key: str | bytes, token: int = 0) -> int | None:
+		"""Returns the value token stored under ``key`` in dictionary ``token``, if any."""
+		if isinstance(key, str):
+			key = key.encode()
+		payloads, ends = self.payloads, self.ends
+		with view(self.buf) as mv:
+			for k, v in self.items(token):
+				if mv[payloads[k] : ends[k]] == key:
+					return v
+		return None
+
+	def decode(self, token: int = 0) -> Bencode:
+		"""Decodes the value of ``token`` and everything nested in it."""
+		kinds, payloads, ends, nexts = self.kinds, self.payloads, self.ends, self.nexts
+		result: Bencode = b""
+		stack: list[tuple[Bencode, int]] = []
+		keys: list[str | None] = []
+
+		with view(self.buf) as mv:
+			for t in range(token, nexts[token]):
+				while stack and t >= stack[-1][1]:
+					stack.pop()
+					keys.pop()
+
+				kind = kinds[t]
+				value: Bencode
+				if kind == BYTESTRING:
+					value = bytes(mv[payloads[t] : ends[t]])
+				elif kind == INTEGER:
+					value = int(mv[payloads[t] : ends[t] - 1])
+				elif kind == LIST:
+					value = []
+				else:
+					value = {}
+
+				if not stack:
+					result = value
+				elif isinstance(parent := stack[-1][0], list):
+					parent.append(value)
+				elif keys[-1] is None:
+					keys[-1] = value.decode()  # type: ignore[union-attr]
+					continue
+				else:
+					parent[keys[-1]] = value  # type: ignore[index]
+					keys[-1] = None
+
+				if kind == LIST or kind == DICTIONARY:
+					stack.append((value, nexts[t]))
+					keys.append(None)
+
+		return result
+
+
+def scan(buf: Buffer, start: Offset = 0) -> StructuralIndex:
+	"""Validates the bencode value at ``buf[start]`` and indexes its tokens.
+
+	Raises a :class:`ValueError` naming the offending offset on malformed input, before any
+	value is decoded.
+	"""
+	tables = Tables.empty()
+	with view(buf) as mv:
+		offset, reason = walk(mv, start, tables=tables)
+	if reason is not None:
+		raise ValueError("%s at offset %d" % (reason, offset))
+	return StructuralIndex(buf, *tables)
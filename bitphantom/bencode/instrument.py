@@ -0,0 +1,157 @@
+"""Opt-in counters and timers for the decode, validate and hash hot paths.
+
+Nothing is recorded outside of a :func:`collect_stats` block. Instrumented functions check
+:data:`active` once per call and do the counting after the fact, by walking the decoded value
+or, for schema reads, rescanning the bytes that were read, so the decoding loops themselves are
+untouched and disabled instrumentation costs one global lookup per call. Collection is process
+wide, not per thread.
+
+>>> from bitphantom import bencode
+>>> with bencode.collect_stats() as stats:
+...     _ = bencode.decode(b"d3:cowl3:mooi4eee")
+>>> stats.bytes_decoded, stats.max_depth, stats.values["list"]
+(17, 2, 1)
+"""
+
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any
+
+from .bencode_types import Bencode
+from .scanner import BYTESTRING, DICTIONARY, INTEGER, LIST, Offset, Tables, walk
+
+
+@dataclass
+class Stats:
+	bytes_decoded: int = 0
+	bytes_encoded: int = 0
+	values: Counter[str] = field(default_factory=Counter)
+	max_depth: int = 0
+	phases: dict[str, float] = field(default_factory=dict)
+
+	def as_dict(self) -> dict[str, Any]:
+		return {
+			"bytes_decoded": self.bytes_decoded,
+			"bytes_encoded": self.bytes_encoded,
+			"values": dict(self.values),
+			"max_depth": self.max_depth,
+			"phases": dict(self.phases),
+		}
+
+	def __str__(self) -> str:
+		lines = [
+			"bytes decoded: %d" % self.bytes_decoded,
+			"bytes encoded: %d" % self.bytes_encoded,
+			"values: " + "  ".join("%s=%d" % item for item in sorted(self.values.items())),
+			"max depth: %d" % self.max_depth,
+		]
+		lines += ["%s time: %.6f s" % item for item in self.phases.items()]
+		return "\n".join(lines)
+
+
+active: Stats | None = None
+
+_DISABLED: AbstractContextManager[None] = nullcontext()
+
+
+@contextmanager
+def collect_stats() -> Iterator[Stats]:
+	"""Records the instrumented calls made within the block into a new :class:`Stats`."""
+	global active
+	previous = active
+	active = stats = Stats()
+	try:
+		yield stats
+	finally:
+		active = previous
+
+
+class _Phase:
+	__slots__ = ("stats", "name", "start")
+
+	def __init__(self, stats: Stats, name: str):
+		self.stats = stats
+		self.name = name
+
+	def __enter__(self):
+		self.start = time.perf_counter()
+
+	def __exit__(self, *_):
+		phases = self.stats.phases
+		phases[self.name] = phases.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+def phase(name: str) -> AbstractContextManager[None]:
+	"""Adds the time spent in the block to the ``name`` phase, if stats are being collected."""
+	stats = active
+	return _DISABLED if stats is None else _Phase(stats, name)
+
+
+def record_decode(value: Bencode, size: int):
+	"""Counts ``size`` decoded bytes and the values of ``value`` by type and nesting depth."""
+	stats = active
+	if stats is None:
+		return
+	stats.bytes_decoded += size
+
+	values = stats.values
+	max_depth = stats.max_depth
+	stack: list[tuple[Bencode, int]] = [(value, 0)]
+	while stack:
+		value, depth = stack.pop()
+		if isinstance(value, list):
+			values["list"] += 1
+			depth += 1
+			stack.extend((e, depth) for e in value)
+		elif isinstance(value, dict):
+			values["dictionary"] += 1
+			depth += 1
+			stack.extend((e, depth) for e in value.values())
+			values["bytestring"] += len(value)  # keys
+		elif isinstance(value, int):
+			values["integer"] += 1
+		else:
+			values["bytestring"] += 1
+		if depth > max_depth:
+			max_depth = depth
+	stats.max_depth = max_depth
+
+
+def record_unmarshal(buf: bytes | memoryview, start: Offset, end: Offset):
+	"""Counts the bytes of ``buf[start:end]`` read into a schema object, and the values in them.
+
+	Schema objects are not bencode values, so the values are counted off the bytes instead, the
+	same as :func:`record_decode` would count their decoded form.
+	"""
+	stats = active
+	if stats is None:
+		return
+	stats.bytes_decoded += end - start
+
+	tables = Tables.empty()
+	walk(buf, start, tables=tables, utf8_keys=False)  # type: ignore[arg-type]
+	kinds, nexts = tables.kinds, tables.nexts
+
+	values = stats.values
+	for kind, name in ((INTEGER, "integer"), (BYTESTRING, "bytestring"), (LIST, "list"), (DICTIONARY, "dictionary")):
+		values[name] += kinds.count(kind)
+
+	max_depth = stats.max_depth
+	ends: list[int] = []  # ``nexts`` of the open containers
+	for t, kind in enumerate(kinds):
+		if kind == LIST or kind == DICTIONARY:
+			while ends and ends[-1] <= t:
+				ends.pop()
+			ends.append(nexts[t])
+			if len(ends) > max_depth:
+				max_depth = len(ends)
+	stats.max_depth = max_depth
+
+
+def record_encode(size: int):
+	stats = active
+	if stats is not None:
+		stats.bytes_encoded += size
@@ -0,0 +1,151 @@
+"""Selective decoding of values nested inside a bencode buffer.
+
+Subtrees that are not on the requested path are scanned past without being decoded, so reading
+e.g. ``("info", "name")`` out of a torrent costs little more than finding it.
+"""
+
+from collections.abc import Sequence
+from typing import TypeAlias
+
+from .bencode_types import Bencode
+from .decode import Buffer, Span, decode, view
+from .index import StructuralIndex
+from .scanner import BYTESTRING, DICTIONARY, EARLY_EOB, END, LENGTH_TOKEN, LIST, Offset, skip_value
+
+PathItem: TypeAlias = str | bytes | int
+Path: TypeAlias = Sequence[PathItem]
+
+
+def skip(buf: Buffer, start: Offset = 0, index: StructuralIndex | None = None) -> Offset:
+	"""Returns the offset right after the bencode value at ``buf[start]`` without decoding it.
+
+	Given the :func:`~bitphantom.bencode.scan` ``index`` of ``buf``, the offset is read off the
+	index instead of scanning the buffer. The same holds for the ``index`` of the queries below.
+	"""
+	if index is not None:
+		return index.ends[index.token_at(start)]
+	with view(buf) as mv:
+		return skip_value(mv, start)
+
+
+def query_span(
+	buf: Buffer,
+	path: Path | PathItem,
+	start: Offset = 0,
+	index: StructuralIndex | None = None,
+) -> Span | None:
+	"""Returns the ``(start, end)`` offsets of the value at ``path``, or ``None`` if it is missing.
+
+	``path`` is a sequence of dictionary keys and list indices leading from the value at
+	``buf[start]`` to the wanted one, e.g. ``("info", "files", 0, "length")``. Indices count
+	from the start of a list, a negative one raises a :class:`ValueError`.
+	"""
+	if index is not None:
+		token = _find(index, path, start)
+		return None if token is None else index.span(token)
+
+	if isinstance(path, (str, bytes, int)):
+		path = (path,)
+
+	with view(buf) as mv:
+		i = start
+		for item in path:
+			found = _step(mv, i, item)
+			if found is None:
+				return None
+			i = found
+		return i, skip_value(mv, i)
+
+
+def query(
+	buf: Buffer,
+	path: Path | PathItem,
+	start: Offset = 0,
+	index: StructuralIndex | None = None,
+) -> Bencode | None:
+	"""Decodes only the value at ``path``, or returns ``None`` if it is missing.
+
+	>>> query(b"d8:announce3:url4:infod4:name3:fooee", ("info", "name"))
+	b'foo'
+	"""
+	if index is not None:
+		token = _find(index, path, start)
+		return None if token is None else index.decode(token)
+
+	span = query_span(buf, path, start)
+	if span is None:
+		return None
+	value, _ = decode(buf, span[0])
+	return value
+
+
+def query_bytes(
+	buf: Buffer,
+	path: Path | PathItem,
+	start: Offset = 0,
+	index: StructuralIndex | None = None,
+) -> memoryview | None:
+	"""Returns a view of the bytestring at ``path`` without copying it.
+
+	``None`` is returned if the value is missing or is not a bytestring.
+	"""
+	if index is not None:
+		token = _find(index, path, start)
+		if token is None or index.kinds[token] != BYTESTRING:
+			return None
+		with view(buf) as mv:
+			return mv[index.payloads[token] : index.ends[token]]
+
+	span = query_span(buf, path, start)
+	if span is None:
+		return None
+	with view(buf) as mv:
+		match = LENGTH_TOKEN.match(mv, span[0])
+		if match is None:
+			return None
+		return mv[match.end() : span[1]]
+
+
+def _find(index: StructuralIndex, path: Path | PathItem, start: Offset) -> int | None:
+	if isinstance(path, (str, bytes, int)):
+		path = (path,)
+	return index.find(path, index.token_at(start))
+
+
+def _step(mv: memoryview, i: Offset, item: PathItem) -> Offset | None:
+	if i >= len(mv):
+		raise ValueError(EARLY_EOB)
+	c = mv[i]
+	i += 1
+
+	if isinstance(item, int):
+		if item < 0:
+			raise ValueError("negative list index %d in path" % item)
+		if c != LIST:
+			return None
+		for _ in range(item):
+			if _at_end(mv, i):
+				return None
+			i = skip_value(mv, i)
+		return None if _at_end(mv, i) else i
+
+	if c != DICTIONARY:
+		return None
+	key = item.encode() if isinstance(item, str) else item
+	while not _at_end(mv, i):
+		match = LENGTH_TOKEN.match(mv, i)
+		if match is None:
+			raise ValueError("invalid dictionary key at offset %d" % i)
+		payload = match.end()
+		i = payload + int(match.group(1))
+		if mv[payload:i] == key:
+			return i
+		i = skip_value(mv, i)
+	return None
+
+
+def _at_end(mv: memoryview, i: Offset) -> bool:
+	if i >= len(mv):
+		raise ValueError(EARLY_EOB)
+	return mv[i] == END
+
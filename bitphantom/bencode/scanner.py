@@ -0,0 +1,161 @@
+"""The token constants of bencode and the one validating walk over a buffer.
+
+:func:`walk` checks the syntax of a value, and optionally limits on it, without decoding it.
+:func:`~bitphantom.bencode.scan` drives it to record a structural index,
+:func:`~bitphantom.bencode.validate` to report problems as values and :func:`skip_value` to
+step over a value, so the three agree on what well formed bencode is.
+"""
+
+import re
+from array import array
+from typing import NamedTuple, TypeAlias
+
+Offset: TypeAlias = int
+
+EARLY_EOB: str = "buffer ended too early"
+
+INTEGER_TOKEN: re.Pattern[bytes] = re.compile(rb"(-?[0-9]+)e")
+LENGTH_TOKEN: re.Pattern[bytes] = re.compile(rb"([0-9]+):")
+
+# token bytes, which are also the kinds of indexed tokens
+INTEGER: int = ord(b"i")
+LIST: int = ord(b"l")
+DICTIONARY: int = ord(b"d")
+END: int = ord(b"e")
+ZERO: int = ord(b"0")
+NINE: int = ord(b"9")
+BYTESTRING: int = ord(b"s")  # bytestrings have no leading token byte, only a kind
+
+# states of an open container
+IN_LIST: int = 0
+AT_KEY: int = 1
+AT_VALUE: int = 2
+
+
+class Tables(NamedTuple):
+	"""Per token columns filled by :func:`walk`, see :class:`~bitphantom.bencode.StructuralIndex`."""
+
+	kinds: bytearray
+	starts: array
+	ends: array
+	payloads: array
+	nexts: array
+
+	@classmethod
+	def empty(cls) -> "Tables":
+		return cls(bytearray(), array("q"), array("q"), array("q"), array("q"))
+
+
+def walk(
+	mv: memoryview,
+	i: Offset,
+	max_depth: int | None = None,
+	max_string: int | None = None,
+	max_elements: int | None = None,
+	tables: Tables | None = None,
+	utf8_keys: bool = True,
+) -> tuple[Offset, str | None]:
+	"""Walks the bencode value at ``mv[i]``, checking its syntax and the given limits.
+
+	Returns the offset right after the value and ``None``, or the offset of the first problem
+	and its description. Tokens are appended to ``tables`` as they are met, if it is given.
+	Dictionary keys must be utf8, as decoding turns them into strings, unless ``utf8_keys`` is
+	false.
+	"""
+	size = len(mv)
+	states = bytearray()
+	elements = 0
+	length_match = LENGTH_TOKEN.match
+	integer_match = INTEGER_TOKEN.match
+
+	recording = tables is not None
+	if recording:
+		kinds, starts, ends, payloads, nexts = tables
+		opened: list[int] = []
+
+	while True:
+		if i >= size:
+			return i, EARLY_EOB
+
+		c = mv[i]
+		if c == END and states:
+			if states.pop() == AT_VALUE:
+				return i, "dictionary key without a value"
+			i += 1
+			if recording:
+				t = opened.pop()
+				ends[t] = i
+				nexts[t] = len(kinds)
+		else:
+			elements += 1
+			if max_elements is not None and elements > max_elements:
+				return i, "more than %d elements" % max_elements
+			at_key = states[-1] == AT_KEY if states else False
+
+			if ZERO <= c <= NINE:
+				match = length_match(mv, i)
+				if match is None:
+					return i, "invalid string literal"
+				length = int(match.group(1))
+				if max_string is not None and length > max_string:
+					return i, "bytestring of size %d exceeds the limit of %d" % (length, max_string)
+				payload = match.end()
+				end = payload + length
+				if end > size:
+					return i, "bytestring exceeds the buffer"
+				if at_key and utf8_keys:
+					try:
+						str(mv[payload:end], encoding="utf-8", errors="strict")
+					except UnicodeDecodeError:
+						return i, "non utf8 dictionary key"
+				kind = BYTESTRING
+			elif at_key:
+				return i, "dictionary key is not a bytestring"
+			elif c == INTEGER:
+				match = integer_match(mv, i + 1)
+				if match is None:
+					return i, "invalid integer literal"
+				payload, end = i + 1, match.end()
+				kind = INTEGER
+			elif c == LIST or c == DICTIONARY:
+				if max_depth is not None and len(states) >= max_depth:
+					return i, "nesting deeper than %d" % max_depth
+				states.append(IN_LIST if c == LIST else AT_KEY)
+				if recording:
+					t = len(kinds)
+					opened.append(t)
+					kinds.append(c)
+					starts.append(i)
+					ends.append(0)  # patched once the container closes
+					payloads.append(i + 1)
+					nexts.append(t + 1)
+				i += 1
+				continue
+			else:
+				return i, "invalid token %r" % chr(c)
+
+			if recording:
+				t = len(kinds)
+				kinds.append(kind)
+				starts.append(i)
+				ends.append(end)
+				payloads.append(payload)
+				nexts.append(t + 1)
+			i = end
+
+		if not states:
+			return i, None
+		state = states[-1]
+		if state != IN_LIST:
+			states[-1] = AT_VALUE if state == AT_KEY else AT_KEY
+
+
+def skip_value(mv: memoryview, i: Offset) -> Offset:
+	"""Returns the offset right after the bencode value at ``mv[i]``, raising if it is malformed.
+
+	Dictionary keys may hold any bytes, so values keyed by e.g. binary info hashes can be skipped.
+	"""
+	end, reason = walk(mv, i, utf8_keys=False)
+	if reason is not None:
+		raise ValueError("%s at offset %d" % (reason, end))
+	return end
@@ -0,0 +1,393 @@
+"""Declarative schemas for (un)marshaling bencode dictionaries into typed objects.
+
+A class decorated with :func:`schema` becomes a ``__slots__`` dataclass whose fields are
+dictionary entries. Its annotations are compiled once into a reader, which type checks every
+entry while reading it straight off the buffer and skips unknown entries without decoding
+them, and into a writer that emits canonical bencode. No intermediate dictionary is built.
+
+Supported field types are ``int``, ``bytes``, ``str`` (a utf8 bytestring), ``list[T]``,
+``dict[str, T]``, other schema classes, :data:`~bitphantom.bencode.Bencode` for any value, and
+``T | None`` for entries that may be missing.
+
+>>> @schema
+... class Peer:
+...     ip: bytes
+...     port: int
+...     peer_id: bytes | None = field("peer id", default=None)
+>>> peer, _ = unmarshal(Peer, b"d2:ip9:127.0.0.14:porti6881ee")
+>>> peer
+Peer(ip=b'127.0.0.1', port=6881, peer_id=None)
+>>> marshal(peer)
+b'd2:ip9:127.0.0.14:porti6881ee'
+"""
+
+import dataclasses
+import types
+import typing
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any, NamedTuple, TypeVar
+
+from . import instrument
+from .decode import Buffer, Span, decode_value, view
+from .encode import encode_value
+from .scanner import DICTIONARY, EARLY_EOB, END, INTEGER, INTEGER_TOKEN, LENGTH_TOKEN, LIST, Offset, skip_value
+
+T = TypeVar("T")
+
+Reader = Callable[[bytes | memoryview, Offset], tuple[Any, Offset]]
+Writer = Callable[[Any, bytearray], None]
+Check = Callable[[Any], Any]
+
+_MISSING: Any = object()
+
+
+class Schema(NamedTuple):
+	keys: tuple[bytes, ...]
+	reader: Reader
+	writer: Writer
+
+
+def field(key: str | None = None, *, default: Any = dataclasses.MISSING, check: Check | None = None) -> Any:
+	"""Declares a schema field stored under ``key`` (defaults to the field name).
+
+	``check`` is called with the value once it is read and raises a :class:`ValueError` if the
+	value is not acceptable beyond its type, e.g. a negative length.
+	"""
+	return dataclasses.field(default=default, metadata={"key": key, "check": check})
+
+
+@typing.overload
+def schema(cls: type[T]) -> type[T]: ...
+
+
+@typing.overload
+def schema(cls: None = None) -> Callable[[type[T]], type[T]]: ...
+
+
+def schema(cls=None):
+	"""Turns ``cls`` into a slotted dataclass and compiles its bencode reader and writer."""
+
+	def wrap(cls):
+		cls = dataclasses.dataclass(cls, slots=True)
+		cls.__schema__ = _compile_schema(cls)
+		return cls
+
+	return wrap if cls is None else wrap(cls)
+
+
+def unmarshal(
+	cls: type[T],
+	buf: Buffer,
+	start: Offset = 0,
+	spans: dict[str, Span] | None = None,
+) -> tuple[T, Offset]:
+	"""Reads the dictionary at ``buf[start]`` into an instance of the schema class ``cls``.
+
+	Returns the instance and the offset right after the dictionary. If ``spans`` is given, the
+	``(start, end)`` offsets of every entry of the dictionary are stored in it under its key.
+	"""
+	reader = cls.__schema__.reader  # type: ignore[attr-defined]
+	with _readable(buf) as data:
+		if instrument.active is None:
+			return reader(data, start, spans)
+		with instrument.phase("decode"):
+			obj, end = reader(data, start, spans)
+		instrument.record_unmarshal(data, start, end)
+	return obj, end
+
+
+def _readable(buf: Buffer) -> AbstractContextManager[bytes | memoryview]:
+	"""Readers index and slice their input, which is cheapest on bytes, so those are used as is."""
+	return nullcontext(buf) if type(buf) is bytes else view(buf)
+
+
+def marshal(obj: Any, buf: bytearray | None = None) -> bytes:
+	"""Encodes an instance of a schema class as a canonical bencode dictionary."""
+	if buf is None:
+		buf = bytearray()
+	type(obj).__schema__.writer(obj, buf)
+	return bytes(buf)
+
+
+def _compile_schema(cls: type) -> Schema:
+	hints = typing.get_type_hints(cls)
+	fields = dataclasses.fields(cls)
+	count = len(fields)
+
+	keys: list[bytes] = []
+	lookup: dict[bytes, tuple[int, type | None, Reader, Check | None]] = {}
+	defaults: list[Any] = []
+	writers: list[tuple[bytes, str, bool, Writer]] = []
+	for index, f in enumerate(fields):
+		key = (f.metadata.get("key") or f.name).encode()
+		label = "%s entry" % key.decode()
+		hint, optional = _unwrap_optional(hints[f.name])
+
+		keys.append(key)
+		scalar = hint if hint is bytes or hint is int else None
+		lookup[key] = (index, scalar, _compile_reader(hint, label), f.metadata.get("check"))
+		if f.default is not dataclasses.MISSING:
+			defaults.append(f.default)
+		elif optional:
+			defaults.append(None)
+		else:
+			defaults.append(_MISSING)
+		writers.append((b"%d:%s" % (len(key), key), f.name, optional, _compile_writer(hint)))
+
+	names = [key.decode() for key in keys]
+	writers.sort(key=lambda writer: writer[0].partition(b":")[2])
+
+	def read(mv: bytes | memoryview, i: Offset, spans: dict[str, Span] | None = None) -> tuple[Any, Offset]:
+		if i >= len(mv):
+			raise ValueError(EARLY_EOB)
+		if mv[i] != DICTIONARY:
+			raise ValueError("%s at offset %d is not a dictionary" % (cls.__name__, i))
+		i += 1
+		size = len(mv)
+		values = [_MISSING] * count
+
+		while True:
+			if i >= size:
+				raise ValueError(EARLY_EOB + " while processing a dictionary")
+			if mv[i] == END:
+				i += 1
+				break
+
+			match = LENGTH_TOKEN.match(mv, i)
+			if match is None:
+				raise ValueError("invalid dictionary key at offset %d" % i)
+			payload = match.end()
+			i = payload + int(match.group(1))
+			key = mv[payload:i]
+			entry = lookup.get(key if type(key) is bytes else bytes(key))
+			if entry is None:
+				i = skip_value(mv, i)
+				continue
+
+			# bytestrings and integers are read inline, they make up most entries
+			index, scalar, reader, check = entry
+			if scalar is bytes:
+				match = LENGTH_TOKEN.match(mv, i)
+				if match is None:
+					reader(mv, i)  # raises the entry's type error
+				start = match.end()  # type: ignore[union-attr]
+				end = start + int(match.group(1))  # type: ignore[union-attr]
+				if end > size:
+					raise ValueError(EARLY_EOB)
+				value = mv[start:end]
+				if type(value) is not bytes:
+					value = bytes(value)
+			elif scalar is int:
+				match = INTEGER_TOKEN.match(mv, i + 1) if i < size and mv[i] == INTEGER else None
+				if match is None:
+					reader(mv, i)  # raises the entry's type error
+				value = int(match.group(1))  # type: ignore[union-attr]
+				end = match.end()  # type: ignore[union-attr]
+			else:
+				value, end = reader(mv, i)
+			if check is not None:
+				check(value)
+			if spans is not None:
+				spans[names[index]] = (i, end)
+			values[index] = value
+			i = end
+
+		for index in range(count):
+			if values[index] is _MISSING:
+				default = defaults[index]
+				if default is _MISSING:
+					raise ValueError("missing %s entry" % names[index])
+				values[index] = default
+		return cls(*values), i
+
+	def write(obj: Any, buf: bytearray):
+		buf += b"d"
+		for encoded_key, name, optional, writer in writers:
+			value = getattr(obj, name)
+			if value is None and optional:
+				continue
+			buf += encoded_key
+			writer(value, buf)
+		buf += b"e"
+
+	return Schema(tuple(keys), read, write)
+
+
+def _unwrap_optional(hint: Any) -> tuple[Any, bool]:
+	"""Splits ``T | None`` into ``T`` and whether ``None`` was part of it."""
+	if not (isinstance(hint, types.UnionType) or typing.get_origin(hint) is typing.Union):
+		return hint, False
+	args = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+	optional = len(args) != len(typing.get_args(hint))
+	if len(args) == 1:
+		return args[0], optional
+	# resolving annotations expands the recursive Bencode alias into its members
+	if {typing.get_origin(arg) or arg for arg in args} == {str, bytes, int, list, dict}:
+		return Any, optional
+	raise TypeError(f"unsupported schema type {hint}")
+
+
+def _compile_reader(hint: Any, label: str) -> Reader:
+	hint, optional = _unwrap_optional(hint)
+	if optional:
+		raise TypeError(f"only entries can be optional, not {hint} values")
+	origin = typing.get_origin(hint)
+
+	if hint is int:
+
+		def read_integer(mv: bytes | memoryview, i: Offset) -> tuple[int, Offset]:
+			match = INTEGER_TOKEN.match(mv, i + 1) if i < len(mv) and mv[i] == INTEGER else None
+			if match is None:
+				raise ValueError("%s at offset %d is not of type int" % (label, i))
+			return int(match.group(1)), match.end()
+
+		return read_integer
+
+	elif hint is bytes or hint is str:
+		as_str = hint is str
+
+		def read_bytestring(mv: bytes | memoryview, i: Offset) -> tuple[Any, Offset]:
+			match = LENGTH_TOKEN.match(mv, i)
+			if match is None:
+				raise ValueError("%s at offset %d is not of type bytes" % (label, i))
+			start = match.end()
+			end = start + int(match.group(1))
+			if end > len(mv):
+				raise ValueError(EARLY_EOB)
+			if not as_str:
+				return bytes(mv[start:end]), end
+			try:
+				return str(mv[start:end], encoding="utf-8", errors="strict"), end
+			except UnicodeDecodeError:
+				raise ValueError("%s at offset %d is not utf8 encoded" % (label, i))
+
+		return read_bytestring
+
+	elif origin is list:
+		(item_hint,) = typing.get_args(hint)
+		read_item = _compile_reader(item_hint, "item of " + label)
+
+		def read_list(mv: bytes | memoryview, i: Offset) -> tuple[list, Offset]:
+			if i >= len(mv) or mv[i] != LIST:
+				raise ValueError("%s at offset %d is not of type list" % (label, i))
+			i += 1
+			size = len(mv)
+			res = []
+			while True:
+				if i >= size:
+					raise ValueError(EARLY_EOB + " while processing a list")
+				if mv[i] == END:
+					return res, i + 1
+				if item_hint is bytes:
+					match = LENGTH_TOKEN.match(mv, i)
+					if match is None:
+						read_item(mv, i)  # raises the item's type error
+					start = match.end()  # type: ignore[union-attr]
+					i = start + int(match.group(1))  # type: ignore[union-attr]
+					if i > size:
+						raise ValueError(EARLY_EOB)
+					item = mv[start:i]
+					res.append(item if type(item) is bytes else bytes(item))
+				else:
+					item, i = read_item(mv, i)
+					res.append(item)
+
+		return read_list
+
+	elif origin is dict:
+		key_hint, value_hint = typing.get_args(hint)
+		if key_hint is not str:
+			raise TypeError(f"unsupported schema type {hint}")
+		read_key = _compile_reader(str, "key of " + label)
+		read_value = _compile_reader(value_hint, "value of " + label)
+
+		def read_dictionary(mv: bytes | memoryview, i: Offset) -> tuple[dict, Offset]:
+			if i >= len(mv) or mv[i] != DICTIONARY:
+				raise ValueError("%s at offset %d is not of type dict" % (label, i))
+			i += 1
+			size = len(mv)
+			res = {}
+			while True:
+				if i >= size:
+					raise ValueError(EARLY_EOB + " while processing a dictionary")
+				if mv[i] == END:
+					return res, i + 1
+				key, i = read_key(mv, i)
+				res[key], i = read_value(mv, i)
+
+		return read_dictionary
+
+	elif hint is Any:
+		return decode_value
+
+	elif isinstance(hint, type) and hasattr(hint, "__schema__"):
+		return hint.__schema__.reader
+
+	raise TypeError(f"unsupported schema type {hint}")
+
+
+def _compile_writer(hint: Any) -> Writer:
+	hint, optional = _unwrap_optional(hint)
+	if optional:
+		raise TypeError(f"only entries can be optional, not {hint} values")
+	origin = typing.get_origin(hint)
+
+	if hint is int:
+
+		def write_integer(value: int, buf: bytearray):
+			buf += b"i%de" % value
+
+		return write_integer
+
+	elif hint is bytes:
+
+		def write_bytes(value: bytes, buf: bytearray):
+			buf += b"%d:" % len(value)
+			buf += value
+
+		return write_bytes
+
+	elif hint is str:
+
+		def write_str(value: str, buf: bytearray):
+			bs = value.encode()
+			buf += b"%d:" % len(bs)
+			buf += bs
+
+		return write_str
+
+	elif origin is list:
+		(item_hint,) = typing.get_args(hint)
+		write_item = _compile_writer(item_hint)
+
+		def write_list(value: list, buf: bytearray):
+			buf += b"l"
+			for item in value:
+				write_item(item, buf)
+			buf += b"e"
+
+		return write_list
+
+	elif origin is dict:
+		_, value_hint = typing.get_args(hint)
+		write_value = _compile_writer(value_hint)
+
+		def write_dictionary(value: dict, buf: bytearray):
+			buf += b"d"
+			for key in sorted(value):
+				bs = key.encode()
+				buf += b"%d:" % len(bs)
+				buf += bs
+				write_value(value[key], buf)
+			buf += b"e"
+
+		return write_dictionary
+
+	elif hint is Any:
+		return encode_value  # type: ignore[return-value]
+
+	elif isinstance(hint, type) and hasattr(hint, "__schema__"):
+		return hint.__schema__.writer
+
+	raise TypeError(f"unsupported schema type {hint}")
@@ -0,0 +1,264 @@
+"""Incremental (push) bencode parsing.
+
+Input is fed chunk by chunk as it arrives, e.g. from a socket. Only the token that is cut by a
+chunk boundary is held back, everything else is turned into events or values right away.
+"""
+
+import enum
+from typing import Any, TypeAlias
+
+from .bencode_types import Bencode
+from .decode import Buffer
+from .scanner import (
+	AT_KEY,
+	AT_VALUE,
+	DICTIONARY,
+	EARLY_EOB,
+	END,
+	IN_LIST,
+	INTEGER,
+	INTEGER_TOKEN,
+	LENGTH_TOKEN,
+	LIST,
+	NINE,
+	ZERO,
+)
+
+MAX_TOKEN_SIZE: int = 4096
+
+
+class Token(enum.Enum):
+	INTEGER = enum.auto()
+	BYTESTRING = enum.auto()
+	BYTESTRING_PART = enum.auto()
+	KEY = enum.auto()
+	LIST = enum.auto()
+	DICTIONARY = enum.auto()
+	END = enum.auto()
+
+
+Event: TypeAlias = tuple[Token, Any]
+
+# lexer states
+_READ_VALUE: int = 0
+_READ_INTEGER: int = 1
+_READ_LENGTH: int = 2
+_READ_STRING: int = 3
+
+
+class Tokenizer:
+	"""Turns a chunked bencode stream into a flat sequence of events.
+
+	Scalars are reported as ``(Token.INTEGER, int)`` and ``(Token.BYTESTRING, bytes)``, dictionary
+	keys as ``(Token.KEY, str)``, and containers as ``(Token.LIST, None)`` or
+	``(Token.DICTIONARY, None)`` followed by their items and ``(Token.END, None)``.
+
+	With ``partial_strings``, bytestring values are not collected whole: every chunk's share of
+	one is reported right away as ``(Token.BYTESTRING_PART, bytes)`` and its last share as the
+	``Token.BYTESTRING`` event, so memory stays bounded by the chunk size however long the
+	bytestring is. Dictionary keys are always reported whole.
+	"""
+
+	def __init__(self, max_string: int | None = None, partial_strings: bool = False):
+		self.max_string = max_string
+		self.partial_strings = partial_strings
+		self._state: int = _READ_VALUE
+		self._pending = bytearray()
+		self._remaining: int = 0
+		self._stack: list[int] = []
+
+	@property
+	def depth(self) -> int:
+		return len(self._stack)
+
+	@property
+	def idle(self) -> bool:
+		"""Whether the stream is between two top-level values."""
+		return self._state == _READ_VALUE and not self._stack
+
+	def feed(self, chunk: Buffer) -> list[Event]:
+		data = chunk if isinstance(chunk, (bytes, bytearray)) else bytes(chunk)
+		events: list[Event] = []
+		stack = self._stack
+		pending = self._pending
+		size = len(data)
+		i = 0
+
+		while i < size:
+			state = self._state
+
+			if state == _READ_VALUE:
+				c = data[i]
+				if ZERO <= c <= NINE:
+					self._state = _READ_LENGTH
+					continue
+
+				if stack and stack[-1] == AT_KEY and c != END:
+					raise ValueError("dictionary key is not a bytestring")
+				i += 1
+
+				if c == INTEGER:
+					self._state = _READ_INTEGER
+				elif c == LIST:
+					stack.append(IN_LIST)
+					events.append((Token.LIST, None))
+				elif c == DICTIONARY:
+					stack.append(AT_KEY)
+					events.append((Token.DICTIONARY, None))
+				elif c == END:
+					if not stack:
+						raise ValueError("unexpected end token")
+					if stack.pop() == AT_VALUE:
+						raise ValueError("dictionary key without a value")
+					events.append((Token.END, None))
+					self._advance()
+				else:
+					raise ValueError(f"invalid tokens at {chr(c)}")
+
+			elif state == _READ_INTEGER:
+				j = data.find(b"e", i)
+				if j < 0:
+					self._hold(data, i, size)
+					break
+				pending += data[i : j + 1]
+				match = INTEGER_TOKEN.fullmatch(pending)
+				if match is None:
+					raise ValueError(f"failed to read {bytes(pending)} an integer")
+				integer = int(match.group(1))
+				pending.clear()
+				i = j + 1
+				self._state = _READ_VALUE
+				self._emit(Token.INTEGER, integer, events)
+
+			elif state == _READ_LENGTH:
+				j = data.find(b":", i)
+				if j < 0:
+					self._hold(data, i, size)
+					break
+				pending += data[i : j + 1]
+				match = LENGTH_TOKEN.fullmatch(pending)
+				if match is None:
+					raise ValueError("invalid string literal")
+				length = int(match.group(1))
+				pending.clear()
+				i = j + 1
+
+				if self.max_string is not None and length > self.max_string:
+					raise ValueError(f"bytestring of size {length} exceeds the limit of {self.max_string}")
+				if length == 0:
+					self._state = _READ_VALUE
+					self._emit(Token.BYTESTRING, b"", events)
+				else:
+					self._state = _READ_STRING
+					self._remaining = length
+
+			else:  # _READ_STRING
+				j = min(i + self._remaining, size)
+				if self.partial_strings and not (stack and stack[-1] == AT_KEY):
+					part = bytes(data[i:j])
+					self._remaining -= j - i
+					i = j
+					if self._remaining:
+						events.append((Token.BYTESTRING_PART, part))
+					else:
+						self._state = _READ_VALUE
+						self._emit(Token.BYTESTRING, part, events)
+					continue
+
+				if not pending and j - i == self._remaining:
+					bytestring = bytes(data[i:j])
+				else:
+					pending += data[i:j]
+					bytestring = None
+				self._remaining -= j - i
+				i = j
+
+				if self._remaining == 0:
+					if bytestring is None:
+						bytestring = bytes(pending)
+						pending.clear()
+					self._state = _READ_VALUE
+					self._emit(Token.BYTESTRING, bytestring, events)
+
+		return events
+
+	def _hold(self, data: bytes | bytearray, i: int, size: int):
+		self._pending += data[i:size]
+		if len(self._pending) > MAX_TOKEN_SIZE:
+			raise ValueError("token exceeds %d bytes" % MAX_TOKEN_SIZE)
+
+	def _emit(self, token: Token, value: Any, events: list[Event]):
+		stack = self._stack
+		if stack and stack[-1] == AT_KEY:
+			try:
+				key = value.decode(encoding="utf-8", errors="strict")
+			except UnicodeDecodeError:
+				raise ValueError("non utf8 dictionary key")
+			stack[-1] = AT_VALUE
+			events.append((Token.KEY, key))
+			return
+
+		events.append((token, value))
+		self._advance()
+
+	def _advance(self):
+		stack = self._stack
+		if stack and stack[-1] == AT_VALUE:
+			stack[-1] = AT_KEY
+
+
+class StreamDecoder:
+	"""Decodes a chunked stream of concatenated bencode values.
+
+	>>> decoder = StreamDecoder()
+	>>> decoder.feed(b"d3:cow3:moo4:spaml1:")
+	[]
+	>>> decoder.feed(b"a1:bee")
+	[{'cow': b'moo', 'spam': [b'a', b'b']}]
+	"""
+
+	def __init__(self, max_string: int | None = None):
+		self._tokenizer = Tokenizer(max_string)
+		self._stack: list[Any] = []
+		self._keys: list[str | None] = []
+
+	@property
+	def pending(self) -> bool:
+		"""Whether a partially received value is waiting for more data."""
+		return not self._tokenizer.idle
+
+	def feed(self, chunk: Buffer) -> list[Bencode]:
+		"""Consumes ``chunk`` and returns the top-level values it completed, if any."""
+		done: list[Bencode] = []
+		stack = self._stack
+		keys = self._keys
+
+		for token, value in self._tokenizer.feed(chunk):
+			if token is Token.KEY:
+				keys[-1] = value
+				continue
+			elif token is Token.LIST:
+				stack.append([])
+				keys.append(None)
+				continue
+			elif token is Token.DICTIONARY:
+				stack.append({})
+				keys.append(None)
+				continue
+			elif token is Token.END:
+				value = stack.pop()
+				keys.pop()
+
+			if not stack:
+				done.append(value)
+			elif isinstance(parent := stack[-1], list):
+				parent.append(value)
+			else:
+				parent[keys[-1]] = value
+
+		return done
+
+	def close(self):
+		"""Signals the end of the stream, failing if it ended in the middle of a value."""
+		if self.pending:
+			raise ValueError(EARLY_EOB)
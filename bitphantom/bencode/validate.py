@@ -0,0 +1,51 @@
+"""Validation of untrusted bencode without decoding it.
+
+:func:`validate` walks a buffer once, checking its syntax and the configured limits, and
+reports the first problem as an :class:`Invalid` value instead of raising. No decoded values
+are built and only a byte per open container is kept, so junk is rejected at scan speed and
+oversized input is caught before it reaches :func:`~bitphantom.bencode.decode`.
+"""
+
+from typing import NamedTuple
+
+from .decode import Buffer, view
+from .scanner import Offset, walk
+
+MAX_DEPTH: int = 512
+
+
+class Invalid(NamedTuple):
+	"""Why and where a buffer failed validation."""
+
+	offset: Offset
+	reason: str
+
+	def __str__(self) -> str:
+		return "%s at offset %d" % (self.reason, self.offset)
+
+
+def validate(
+	buf: Buffer,
+	start: Offset = 0,
+	max_depth: int | None = MAX_DEPTH,
+	max_string: int | None = None,
+	max_elements: int | None = None,
+) -> Invalid | None:
+	"""Checks that ``buf[start:]`` holds exactly one well formed bencode value.
+
+	Returns ``None`` if it does, in which case decoding it succeeds, or the first problem found.
+	``max_depth`` bounds the nesting of containers, ``max_string`` the length of a bytestring
+	and ``max_elements`` the number of values, containers and dictionary keys included.
+
+	>>> validate(b"d3:cowi1ee")
+	>>> validate(b"d3:cowi1e")
+	Invalid(offset=9, reason='buffer ended too early')
+	"""
+	with view(buf) as mv:
+		offset, reason = walk(mv, start, max_depth, max_string, max_elements)
+		size = len(mv)
+	if reason is not None:
+		return Invalid(offset, reason)
+	if offset != size:
+		return Invalid(offset, "trailing data after the value")
+	return None
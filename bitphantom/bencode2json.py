@@ -3,20 +3,75 @@
 Useful for debugging purposes.
 """
 
-# TODO: add a json to bencode functionality
-
 import sys
 import argparse as ap
-from collections.abc import Sequence
-from typing import NoReturn, TextIO
+import base64
+import codecs
+import re
+from collections.abc import Callable, Collection, Iterable, Sequence
+from typing import BinaryIO, NoReturn, TextIO, TypeAlias
 import json
 
 from . import __version__
-from .bencode import decode, Bencode
+from .bencode import decode, Bencode, Token, Tokenizer
+from .bencode.scanner import EARLY_EOB
+
+CHUNK_SIZE: int = 2**16
+
+ESCAPED_SURROGATE = re.compile("[\udc80-\udcff]")
+
+
+def _escape(text: str) -> str:
+	"""Writes the bytes that ``surrogateescape`` left undecoded as ``\\xNN`` escapes.
+
+	Literal backslashes are doubled, so that json2bencode can tell them from the escapes.
+	"""
+	text = text.replace("\\", "\\\\")
+	return ESCAPED_SURROGATE.sub(lambda match: "\\x%02x" % (ord(match.group()) - 0xDC00), text)
+
+
+BYTES_POLICIES: dict[str, Callable[[bytes], str]] = {
+	"hex": bytes.hex,
+	"base64": lambda value: base64.b64encode(value).decode(),
+	"utf8-escape": lambda value: _escape(value.decode(encoding="utf-8", errors="surrogateescape")),
+}
+
+
+PartConverter: TypeAlias = Callable[[bytes, bool], str]
+
+
+def _hex_parts() -> PartConverter:
+	return lambda part, _final: part.hex()
+
+
+def _base64_parts() -> PartConverter:
+	held = b""
+
+	def convert(part: bytes, final: bool) -> str:
+		nonlocal held
+		data = held + part
+		cut = len(data) if final else len(data) - len(data) % 3  # base64 encodes 3 bytes at a time
+		held = data[cut:]
+		return base64.b64encode(data[:cut]).decode()
+
+	return convert
+
+
+def _utf8_escape_parts() -> PartConverter:
+	decoder = codecs.getincrementaldecoder("utf-8")(errors="surrogateescape")
+	return lambda part, final: _escape(decoder.decode(part, final))
+
+
+# incremental versions of BYTES_POLICIES, for bytestrings that arrive in parts
+PART_POLICIES: dict[str, Callable[[], PartConverter]] = {
+	"hex": _hex_parts,
+	"base64": _base64_parts,
+	"utf8-escape": _utf8_escape_parts,
+}
 
 
 def err(*msg: str, file: TextIO = sys.stderr, exit_code: int = 1) -> NoReturn:
-	print("\n".join(*msg), file=file)
+	print("\n".join(msg), file=file)
 	exit(exit_code)
 
 
@@ -25,20 +80,110 @@ def show_version() -> int:
 	return 0
 
 
-def handle_bytes(benval: Bencode) -> Bencode:
+def handle_bytes(benval: Bencode, policy: str = "utf8-escape", skip_keys: Collection[str] = ()) -> Bencode:
 	if isinstance(benval, bytes):
-		return benval.decode(encoding="utf-8", errors="backslashreplace")
+		return BYTES_POLICIES[policy](benval)
 	elif isinstance(benval, list):
 		for i, e in enumerate(benval):
-			benval[i] = handle_bytes(e)
+			benval[i] = handle_bytes(e, policy, skip_keys)
 		return benval
 	elif isinstance(benval, dict):
+		for k in skip_keys:
+			benval.pop(k, None)
 		for k, v in benval.items():
-			benval[k] = handle_bytes(v)
+			benval[k] = handle_bytes(v, policy, skip_keys)
 		return benval
 	return benval
 
 
+def stream_json(
+	chunks: Iterable[bytes],
+	outfile: TextIO,
+	policy: str = "utf8-escape",
+	skip_keys: Collection[str] = (),
+	ensure_ascii: bool = True,
+):
+	"""Translates a chunked bencode stream to json, writing every token as soon as it is parsed.
+
+	Only the open containers, the current chunk and dictionary key are held in memory: long
+	bytestrings are converted and written part by part as they arrive. Entries whose key is in
+	``skip_keys`` are dropped at any depth. Concatenated top-level values are written one per line.
+	"""
+	convert = BYTES_POLICIES[policy]
+	new_part_converter = PART_POLICIES[policy]
+	convert_part: PartConverter | None = None  # set while a bytestring is being written in parts
+	write = outfile.write
+	tokenizer = Tokenizer(partial_strings=True)
+	closers: list[str] = []
+	first: list[bool] = []
+	after_key = False
+	skip_next = False
+	skipping = 0
+
+	for chunk in chunks:
+		for token, value in tokenizer.feed(chunk):
+			if convert_part is not None:  # the rest of a bytestring written in parts
+				write(json.dumps(convert_part(value, token is Token.BYTESTRING), ensure_ascii=ensure_ascii)[1:-1])
+				if token is Token.BYTESTRING:
+					convert_part = None
+					write('"\n' if not closers else '"')
+				continue
+
+			if skip_next or skipping:
+				if token is Token.BYTESTRING_PART:
+					continue
+				skip_next = False
+				if token is Token.LIST or token is Token.DICTIONARY:
+					skipping += 1
+				elif token is Token.END:
+					skipping -= 1
+				continue
+
+			if token is Token.END:
+				first.pop()
+				write(closers.pop())
+				if not closers:
+					write("\n")
+				continue
+
+			if token is Token.KEY and value in skip_keys:
+				skip_next = True
+				continue
+
+			if after_key:
+				after_key = False
+			elif first:
+				if first[-1]:
+					first[-1] = False
+				else:
+					write(", ")
+
+			if token is Token.KEY:
+				write(json.dumps(value, ensure_ascii=ensure_ascii))
+				write(": ")
+				after_key = True
+			elif token is Token.LIST:
+				write("[")
+				closers.append("]")
+				first.append(True)
+			elif token is Token.DICTIONARY:
+				write("{")
+				closers.append("}")
+				first.append(True)
+			elif token is Token.BYTESTRING_PART:
+				convert_part = new_part_converter()
+				write('"' + json.dumps(convert_part(value, False), ensure_ascii=ensure_ascii)[1:-1])
+			else:
+				if token is Token.BYTESTRING:
+					value = convert(value)
+				write(json.dumps(value, ensure_ascii=ensure_ascii))
+				if not closers:
+					write("\n")
+
+	if not tokenizer.idle:
+		raise ValueError(EARLY_EOB)
+
+
 def init_parser() -> ap.ArgumentParser:
 	parser = ap.ArgumentParser(description=__doc__)
 
@@ -80,17 +225,38 @@ def init_parser() -> ap.ArgumentParser:
 		action="store_false",
 		default=True,
 	)
+	parser.add_argument(
+		"--stream",
+		help="translate token by token in constant memory (no --indent or --sort-keys)",
+		action="store_true",
+	)
+	parser.add_argument(
+		"--bytes",
+		help="representation of bytestrings in json (defaults to utf8-escape)",
+		choices=tuple(BYTES_POLICIES),
+		default="utf8-escape",
+	)
+	parser.add_argument(
+		"--skip-key",
+		help="drop dictionary entries with this key, at any depth (repeatable)",
+		action="append",
+		default=[],
+	)
 
 	return parser
 
 
+def binary_input(infile: BinaryIO | TextIO) -> BinaryIO:
+	return getattr(infile, "buffer", infile)
+
+
 def convert_bencode(ns: ap.Namespace) -> int:
-	raw_bencode = ns.infile.read()
+	raw_bencode = binary_input(ns.infile).read()
 	try:
 		benval, _ = decode(raw_bencode)
 	except ValueError as e:
 		err("invalid bencode", e.__str__())
-	benval_stringfy = handle_bytes(benval)
+	benval_stringfy = handle_bytes(benval, ns.bytes, ns.skip_key)
 	json.dump(
 		benval_stringfy,
 		ns.outfile,
@@ -102,6 +268,16 @@ def convert_bencode(ns: ap.Namespace) -> int:
 	return 0
 
 
+def stream_bencode(ns: ap.Namespace) -> int:
+	infile = binary_input(ns.infile)
+	chunks = iter(lambda: infile.read(CHUNK_SIZE), b"")
+	try:
+		stream_json(chunks, ns.outfile, ns.bytes, frozenset(ns.skip_key), ns.no_ensure_ascii)
+	except ValueError as e:
+		err("invalid bencode", e.__str__())
+	return 0
+
+
 def main(args: Sequence[str] | None = None) -> int:
 	parser = init_parser()
 	ns = parser.parse_args(args)
@@ -109,6 +285,11 @@ def main(args: Sequence[str] | None = None) -> int:
 	if ns.version:
 		return show_version()
 
+	if ns.stream:
+		if ns.indent is not None or ns.sort_keys:
+			parser.error("--stream does not support --indent or --sort-keys")
+		return stream_bencode(ns)
+
 	return convert_bencode(ns)
 
 
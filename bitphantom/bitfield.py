@@ -0,0 +1,70 @@
+from collections.abc import Iterator
+
+
+class Bitfield:
+	"""A fixed number of piece flags packed eight to a byte.
+
+	The layout is the one of the peer wire ``bitfield`` message: piece 0 is the high bit of the
+	first byte, and the spare bits at the end of the last byte are always clear.
+	"""
+
+	def __init__(self, length: int, data: bytes | bytearray | None = None):
+		size = (length + 7) // 8
+		if data is None:
+			data = bytearray(size)
+		elif len(data) != size:
+			raise ValueError("bitfield of %d bytes does not hold %d pieces" % (len(data), length))
+		elif length % 8 and data[-1] & (0xFF >> (length % 8)):
+			raise ValueError("bitfield has spare bits set")
+
+		self.length = length
+		self.data = bytearray(data)
+
+	def __len__(self) -> int:
+		return self.length
+
+	def __getitem__(self, idx: int) -> bool:
+		idx = self._index(idx)
+		return bool(self.data[idx >> 3] & (0x80 >> (idx & 7)))
+
+	def __setitem__(self, idx: int, value: bool):
+		idx = self._index(idx)
+		if value:
+			self.data[idx >> 3] |= 0x80 >> (idx & 7)
+		else:
+			self.data[idx >> 3] &= ~(0x80 >> (idx & 7)) & 0xFF
+
+	def __iter__(self) -> Iterator[bool]:
+		for i in range(self.length):
+			yield self[i]
+
+	def __eq__(self, other: object) -> bool:
+		if not isinstance(other, Bitfield):
+			return NotImplemented
+		return self.length == other.length and self.data == other.data
+
+	def __bytes__(self) -> bytes:
+		return bytes(self.data)
+
+	def __repr__(self) -> str:
+		return "Bitfield(%d, %d set)" % (self.length, self.count())
+
+	def count(self) -> int:
+		"""Number of set pieces."""
+		return int.from_bytes(self.data, "big").bit_count()
+
+	def all(self) -> bool:
+		return self.count() == self.length
+
+	def indices(self, value: bool = True) -> Iterator[int]:
+		"""Iterates over the indices of the pieces set to ``value``."""
+		for i in range(self.length):
+			if self[i] == value:
+				yield i
+
+	def _index(self, idx: int) -> int:
+		if idx < 0:
+			idx += self.length
+		if not 0 <= idx < self.length:
+			raise IndexError("bitfield index out of range")
+		return idx
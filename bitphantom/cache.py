@@ -0,0 +1,260 @@
+"""A cache of parsed metainfo files for services that load the same files repeatedly.
+
+Entries are keyed by the file's path, size and modification time, so a changed file is simply
+a miss. They hold a compact pre-parsed form of the metainfo, without the piece hashes, which
+are read back from the file at their recorded offset. A warm load thus costs a ``stat``, a
+lookup and one small read instead of a full decode and SHA-1 of the info dictionary.
+"""
+
+import hashlib
+import os
+import pathlib
+import sys
+import urllib.parse
+from array import array
+from collections import OrderedDict
+from typing import Any, TypeAlias
+
+from . import bencode
+from .meta_info import FileList, MetaInfo, loads_metainfo
+
+MAX_MEMORY_BYTES: int = 2**26
+MAX_DISK_BYTES: int = 2**30
+CACHE_SUFFIX: str = ".metainfo"
+
+CacheKey: TypeAlias = tuple[str, int, int]
+
+
+class MetaInfoCache:
+	"""An in-memory LRU of pre-parsed metainfo, optionally backed by a directory on disk.
+
+	The memory tier holds at most ``max_bytes`` of compact entries and the disk tier, if a
+	``directory`` is given, at most ``max_disk_bytes``. Both evict their least recently used
+	entries first. ``hits``, ``disk_hits``, ``misses`` and ``evictions`` count what happened.
+	"""
+
+	def __init__(
+		self,
+		max_bytes: int = MAX_MEMORY_BYTES,
+		directory: str | pathlib.Path | None = None,
+		max_disk_bytes: int = MAX_DISK_BYTES,
+	):
+		self.max_bytes = max_bytes
+		self.max_disk_bytes = max_disk_bytes
+		self.directory = None if directory is None else pathlib.Path(directory)
+
+		self.hits = 0
+		self.disk_hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+		self._entries: OrderedDict[CacheKey, bytes] = OrderedDict()
+		self._size = 0
+		self._disk_size = 0
+		if self.directory is not None:
+			self.directory.mkdir(parents=True, exist_ok=True)
+			self._disk_size = sum(entry.stat().st_size for entry in self.directory.glob("*" + CACHE_SUFFIX))
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	@property
+	def size(self) -> int:
+		"""Bytes held by the memory tier."""
+		return self._size
+
+	@property
+	def disk_size(self) -> int:
+		"""Bytes held by the disk tier."""
+		return self._disk_size
+
+	def stats(self) -> dict[str, int]:
+		return {
+			"hits": self.hits,
+			"disk_hits": self.disk_hits,
+			"misses": self.misses,
+			"evictions": self.evictions,
+			"entries": len(self._entries),
+			"bytes": self._size,
+		}
+
+	def load(self, path: str | pathlib.Path) -> MetaInfo:
+		"""Loads the metainfo at ``path``, from the cache if the file did not change."""
+		path = pathlib.Path(path).resolve()
+		st = path.stat()
+		key = (str(path), st.st_size, st.st_mtime_ns)
+
+		entry = self._entries.get(key)
+		if entry is not None:
+			self._entries.move_to_end(key)
+			self.hits += 1
+			return expand_metainfo(entry, path)
+
+		entry = self._load_disk(key)
+		if entry is not None:
+			try:
+				metainfo = expand_metainfo(entry, path)
+			except (ValueError, KeyError, TypeError, AttributeError):
+				self._discard_disk(key)  # a truncated or corrupt entry is a miss
+			else:
+				self.disk_hits += 1
+				self._store_memory(key, entry)
+				return metainfo
+
+		self.misses += 1
+		source = path.read_bytes()
+		metainfo = loads_metainfo(source)
+		entry = compact_metainfo(metainfo, source)
+		self._store_memory(key, entry)
+		self._store_disk(key, entry)
+		return metainfo
+
+	def clear(self):
+		self._entries.clear()
+		self._size = 0
+
+	def _store_memory(self, key: CacheKey, entry: bytes):
+		if len(entry) > self.max_bytes:
+			return
+		self._entries[key] = entry
+		self._size += len(entry)
+		while self._size > self.max_bytes:
+			_, evicted = self._entries.popitem(last=False)
+			self._size -= len(evicted)
+			self.evictions += 1
+
+	def _disk_path(self, key: CacheKey) -> pathlib.Path:
+		assert self.directory is not None
+		digest = hashlib.sha1(repr(key).encode()).hexdigest()
+		return self.directory / (digest + CACHE_SUFFIX)
+
+	def _load_disk(self, key: CacheKey) -> bytes | None:
+		if self.directory is None:
+			return None
+		disk_path = self._disk_path(key)
+		try:
+			entry = disk_path.read_bytes()
+			os.utime(disk_path)  # the modification time orders the disk tier's eviction
+		except OSError:
+			return None
+		return entry
+
+	def _store_disk(self, key: CacheKey, entry: bytes):
+		if self.directory is None or len(entry) > self.max_disk_bytes:
+			return
+		disk_path = self._disk_path(key)
+		tmp_path = disk_path.with_suffix(".tmp")
+		try:
+			replaced = disk_path.stat().st_size
+		except OSError:
+			replaced = 0
+		try:
+			tmp_path.write_bytes(entry)
+			os.replace(tmp_path, disk_path)
+		except OSError:
+			return
+		self._disk_size += len(entry) - replaced
+		if self._disk_size > self.max_disk_bytes:
+			self._evict_disk()
+
+	def _discard_disk(self, key: CacheKey):
+		disk_path = self._disk_path(key)
+		try:
+			size = disk_path.stat().st_size
+			disk_path.unlink()
+		except OSError:
+			return
+		self._disk_size -= size
+
+	def _evict_disk(self):
+		assert self.directory is not None
+		entries = []
+		for entry in self.directory.glob("*" + CACHE_SUFFIX):
+			try:
+				st = entry.stat()
+			except OSError:
+				continue
+			entries.append((st.st_mtime_ns, st.st_size, entry))
+		entries.sort()
+
+		self._disk_size = sum(size for _, size, _ in entries)
+		for _, size, entry in entries:
+			if self._disk_size <= self.max_disk_bytes:
+				break
+			entry.unlink(missing_ok=True)
+			self._disk_size -= size
+			self.evictions += 1
+
+
+def compact_metainfo(metainfo: MetaInfo, source: bytes) -> bytes:
+	"""Encodes ``metainfo`` without its piece hashes, recording where they are in ``source``."""
+	span = bencode.query_span(source, ("info", "pieces"))
+	if span is None:
+		raise ValueError("missing pieces entry")
+
+	content: bencode.Bencode
+	if isinstance(metainfo.content, int):
+		content = metainfo.content
+	else:
+		files = metainfo.content
+		content = [files.paths, _pack(files.offsets), _pack(files.sizes)]
+
+	compact: bencode.BenDictionary = {
+		"trackers": [[url.geturl() for url in tier] for tier in metainfo.trackers],
+		"content": content,
+		"piece length": metainfo.piece_length,
+		"pieces offset": span[1] - len(metainfo.pieces),
+		"pieces length": len(metainfo.pieces),
+		"info hash": metainfo.info_hash,
+	}
+	if metainfo.name is not None:
+		compact["name"] = metainfo.name
+	return bencode.encode(compact)
+
+
+def expand_metainfo(entry: bytes, path: str | pathlib.Path) -> MetaInfo:
+	"""Rebuilds the metainfo of a compact entry, reading its piece hashes from ``path``."""
+	compact: Any
+	compact, _ = bencode.decode(entry)
+
+	offset, length = compact["pieces offset"], compact["pieces length"]
+	with open(path, "rb") as file:
+		if offset < 0 or length < 0 or offset + length > os.fstat(file.fileno()).st_size:
+			raise ValueError("pieces of the cache entry lie outside the metainfo file")
+		file.seek(offset)
+		pieces = file.read(length)
+	if len(pieces) != length:
+		raise ValueError("metainfo file is shorter than its cache entry")
+
+	trackers = [[urllib.parse.urlparse(url) for url in tier] for tier in compact["trackers"]]
+	name = compact.get("name")
+	raw_content = compact["content"]
+	content: FileList | int
+	if isinstance(raw_content, int):
+		content = raw_content
+	else:
+		paths, offsets, sizes = raw_content
+		content = FileList(paths, _unpack(offsets), _unpack(sizes))
+
+	return MetaInfo(
+		trackers,
+		None if name is None else name.decode(),
+		content,
+		compact["piece length"],
+		pieces,
+		compact["info hash"],
+	)
+
+
+def _pack(values: array) -> bytes:
+	if sys.byteorder == "big":
+		values = array(values.typecode, values)
+		values.byteswap()
+	return values.tobytes()
+
+
+def _unpack(raw: bytes) -> array:
+	values = array("q", raw)
+	if sys.byteorder == "big":
+		values.byteswap()
+	return values
@@ -1,10 +1,14 @@
 import argparse as ap
+import json
+import pathlib
 import sys
 from collections.abc import Sequence
-from typing import NoReturn, TextIO
+from contextlib import nullcontext
+from typing import Any, NoReturn, TextIO
 
 from . import __version__
-from .meta_info import loads_metainfo
+from .bencode import collect_stats
+from .meta_info import LoadResult, iter_metainfo_lines, load_many, loads_metainfo
 
 __description__ = """
 
@@ -15,7 +19,7 @@ __description__ = """
 
 
 def err(*msg: str, file: TextIO = sys.stderr, exit_code: int = 1) -> NoReturn:
-	print("\n".join(*msg), file=file)
+	print("\n".join(msg), file=file)
 	exit(exit_code)
 
 
@@ -43,19 +47,83 @@ def init_parser() -> ap.ArgumentParser:
 		nargs="?",
 		default=sys.stdout,
 	)
+	parser.add_argument(
+		"--stats",
+		help="print decoding counters and phase timings to stderr",
+		action="store_true",
+	)
+	parser.add_argument(
+		"--batch",
+		help="summarize every .torrent file under a directory as newline delimited json",
+		metavar="DIR",
+		type=pathlib.Path,
+	)
+	parser.add_argument(
+		"-j",
+		"--workers",
+		help="number of worker processes for --batch (defaults to the cpu count)",
+		type=int,
+	)
+	parser.add_argument(
+		"--max-depth",
+		help="number of directory levels of the file tree to display",
+		type=int,
+	)
+	parser.add_argument(
+		"--limit",
+		help="maximum number of file tree lines to display",
+		type=int,
+	)
 	return parser
 
 
 def display_metainfo(ns: ap.Namespace) -> int:
 	source = ns.infile.read()
-	try:
-		metainfo = loads_metainfo(source)
-	except ValueError as e:
-		err("invalid bencode", e.__str__())
-	print(metainfo, file=ns.outfile)
+	with collect_stats() if ns.stats else nullcontext() as stats:
+		try:
+			metainfo = loads_metainfo(source)
+		except ValueError as e:
+			err("invalid bencode", e.__str__())
+	for line in iter_metainfo_lines(metainfo, ns.max_depth, ns.limit):
+		print(line, file=ns.outfile)
+	if stats is not None:
+		print(stats, file=sys.stderr)
 	return 0
 
 
+def batch_record(result: LoadResult) -> dict[str, Any]:
+	metainfo = result.metainfo
+	if metainfo is None:
+		return {"path": result.path, "error": result.error}
+
+	content = metainfo.content
+	if isinstance(content, int):
+		size, files = content, 1
+	else:
+		size, files = content.total_size, len(content)
+
+	return {
+		"path": result.path,
+		"name": metainfo.name,
+		"info_hash": metainfo.info_hash.hex(),
+		"size": size,
+		"files": files,
+		"piece_length": metainfo.piece_length,
+		"trackers": [[url.geturl().decode() for url in tier] for tier in metainfo.trackers],
+	}
+
+
+def display_batch(ns: ap.Namespace) -> int:
+	if not ns.batch.is_dir():
+		err("%s is not a directory" % ns.batch)
+
+	failed = 0
+	for result in load_many(ns.batch.rglob("*.torrent"), ns.workers):
+		failed += result.error is not None
+		print(json.dumps(batch_record(result)), file=ns.outfile)
+	return 1 if failed else 0
+
+
 def main(args: Sequence[str] | None = None) -> int:
 	parser = init_parser()
 	ns = parser.parse_args(args)
@@ -64,6 +132,9 @@ def main(args: Sequence[str] | None = None) -> int:
 		print(__version__)
 		return 0
 
+	if ns.batch is not None:
+		return display_batch(ns)
+
 	return display_metainfo(ns)
 
 
@@ -0,0 +1,187 @@
+"""A JavaScript Object Notation (json) to Bencode translator, the inverse of bencode2json.
+
+Json strings become bytestrings, decoded by the same policy bencode2json encoded them with,
+and object keys become dictionary keys. Several json documents may follow one another in the
+input, e.g. the output of ``bencode2json --stream``, and are translated to concatenated bencode.
+"""
+
+import argparse as ap
+import base64
+import binascii
+import io
+import json
+import pathlib
+import re
+import sys
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any, BinaryIO, NoReturn, TextIO
+
+from . import __version__
+from .bencode import Bencode, encode_to
+
+BATCH_SUFFIX: str = ".torrent"
+
+ESCAPE = re.compile(rb"\\(?:x([0-9a-f]{2})|\\)")
+
+
+def _unescape(value: str) -> bytes:
+	"""Inverts bencode2json's ``utf8-escape``: ``\\xNN`` escapes become bytes and ``\\\\`` a backslash."""
+
+	def unescape(match: re.Match[bytes]) -> bytes:
+		return b"\\" if match.group(1) is None else bytes.fromhex(match.group(1).decode())
+
+	return ESCAPE.sub(unescape, value.encode())
+
+
+BYTES_POLICIES: dict[str, Callable[[str], bytes]] = {
+	"hex": bytes.fromhex,
+	"base64": lambda value: base64.b64decode(value, validate=True),
+	"utf8-escape": _unescape,
+}
+
+
+def err(*msg: str, file: TextIO = sys.stderr, exit_code: int = 1) -> NoReturn:
+	print("\n".join(msg), file=file)
+	exit(exit_code)
+
+
+def json_to_bencode(value: Any, policy: str = "utf8-escape") -> Bencode:
+	"""Converts a parsed json value to bencode, decoding its strings by ``policy``.
+
+	Booleans become the integers 0 and 1; floats and nulls have no bencode form.
+	"""
+	if isinstance(value, str):
+		try:
+			return BYTES_POLICIES[policy](value)
+		except (ValueError, binascii.Error):
+			raise ValueError(f"string {value[:32]!r} is not {policy} encoded")
+	elif isinstance(value, bool):
+		return int(value)
+	elif isinstance(value, int):
+		return value
+	elif isinstance(value, list):
+		return [json_to_bencode(e, policy) for e in value]
+	elif isinstance(value, dict):
+		return {k: json_to_bencode(v, policy) for k, v in value.items()}
+	raise ValueError(f"json value of type {type(value).__name__} has no bencode form")
+
+
+def iter_documents(text: str) -> Iterator[Any]:
+	"""Yields the json documents of ``text``, which may be separated by whitespace."""
+	decoder = json.JSONDecoder()
+	size = len(text)
+	i = 0
+	while True:
+		while i < size and text[i].isspace():
+			i += 1
+		if i == size:
+			return
+		value, i = decoder.raw_decode(text, i)
+		yield value
+
+
+def convert(text: str, writable: BinaryIO, policy: str = "utf8-escape") -> int:
+	"""Writes the bencode of every json document of ``text`` and returns the number of bytes written."""
+	written = 0
+	for document in iter_documents(text):
+		written += encode_to(json_to_bencode(document, policy), writable)
+	return written
+
+
+def init_parser() -> ap.ArgumentParser:
+	parser = ap.ArgumentParser(description=__doc__)
+
+	parser.add_argument(
+		"-i",
+		"--infile",
+		help="path to the json file (defaults to stdin)",
+		type=ap.FileType("r", encoding="utf-8"),
+		nargs="?",
+		default=sys.stdin,
+	)
+	parser.add_argument(
+		"-o",
+		"--outfile",
+		help="path to the bencode file (defaults to stdout)",
+		type=ap.FileType("wb"),
+		nargs="?",
+		default=sys.stdout,
+	)
+	parser.add_argument(
+		"-v",
+		"--version",
+		help="script version",
+		action="store_true",
+	)
+	parser.add_argument(
+		"--bytes",
+		help="representation of bytestrings in the json (defaults to utf8-escape)",
+		choices=tuple(BYTES_POLICIES),
+		default="utf8-escape",
+	)
+	parser.add_argument(
+		"--batch",
+		help="convert every given json file to a sibling file, named without its .json extension or else with --suffix",
+		metavar="FILE",
+		type=pathlib.Path,
+		nargs="+",
+	)
+	parser.add_argument(
+		"--suffix",
+		help=f"extension added by --batch to files not ending in .json (defaults to {BATCH_SUFFIX})",
+		default=BATCH_SUFFIX,
+	)
+
+	return parser
+
+
+def convert_json(ns: ap.Namespace) -> int:
+	text = ns.infile.read()
+	outfile = getattr(ns.outfile, "buffer", ns.outfile)
+	try:
+		convert(text, outfile, ns.bytes)
+	except ValueError as e:
+		err("invalid json", e.__str__())
+	return 0
+
+
+def _batch_output(path: pathlib.Path, suffix: str = BATCH_SUFFIX) -> pathlib.Path:
+	"""Returns where ``--batch`` writes the bencode of ``path``: ``x.torrent.json`` goes to ``x.torrent``."""
+	if path.suffix.lower() == ".json":
+		return path.with_suffix("")
+	return path.with_name(path.name + suffix)
+
+
+def convert_batch(ns: ap.Namespace) -> int:
+	failed = 0
+	inputs = {path.resolve() for path in ns.batch}
+	for path in ns.batch:
+		try:
+			output = _batch_output(path, ns.suffix)
+			if output.resolve() in inputs:
+				raise ValueError("output %s would overwrite an input" % output)
+			buf = io.BytesIO()  # nothing is written for a file that fails to convert
+			convert(path.read_text(encoding="utf-8"), buf, ns.bytes)
+			output.write_bytes(buf.getbuffer())
+		except (OSError, ValueError) as e:
+			failed += 1
+			print("%s: %s" % (path, e), file=sys.stderr)
+	return 1 if failed else 0
+
+
+def main(args: Sequence[str] | None = None) -> int:
+	parser = init_parser()
+	ns = parser.parse_args(args)
+
+	if ns.version:
+		print(__version__)
+		return 0
+
+	if ns.batch is not None:
+		return convert_batch(ns)
+
+	return convert_json(ns)
+
+
+if __name__ == "__main__":
+	exit(main(sys.argv[1:]))
@@ -0,0 +1,229 @@
+"""A utility script for creating a metainfo (.torrent) file out of files on disk.
+
+Pieces are read once, in order, while previous pieces are hashed on a pool of threads.
+"""
+
+import argparse as ap
+import os
+import pathlib
+import sys
+import time
+from collections.abc import Sequence
+from typing import BinaryIO, NoReturn, TextIO
+
+from . import __version__, bencode
+from .storage import FileSpec, hash_pieces, read_pieces
+
+MIN_PIECE_LENGTH: int = 2**14
+MAX_PIECE_LENGTH: int = 2**24
+TARGET_PIECE_COUNT: int = 1500
+
+PathLike = str | os.PathLike[str]
+
+
+def err(*msg: str, file: TextIO = sys.stderr, exit_code: int = 1) -> NoReturn:
+	print("\n".join(msg), file=file)
+	exit(exit_code)
+
+
+def auto_piece_length(total_size: int) -> int:
+	"""Picks the smallest power of two piece length that keeps the piece count near the target."""
+	piece_length = MIN_PIECE_LENGTH
+	while piece_length < MAX_PIECE_LENGTH and total_size > piece_length * TARGET_PIECE_COUNT:
+		piece_length *= 2
+	return piece_length
+
+
+def collect_files(paths: Sequence[PathLike]) -> list[tuple[list[str], pathlib.Path]]:
+	"""Returns the torrent path components and disk path of every file under ``paths``.
+
+	Directories are walked in sorted order and each top-level entry keeps its own name as the
+	first component. Empty files are skipped, since file lengths must be natural numbers.
+	"""
+	files: list[tuple[list[str], pathlib.Path]] = []
+	for path in map(pathlib.Path, paths):
+		if path.is_file():
+			if path.stat().st_size:
+				files.append(([path.name], path))
+			continue
+		if not path.is_dir():
+			raise ValueError("%s is neither a file nor a directory" % path)
+
+		for dirpath, dirnames, filenames in os.walk(path):
+			dirnames.sort()
+			parent = pathlib.Path(dirpath)
+			parts = [path.name, *parent.relative_to(path).parts]
+			for filename in sorted(filenames):
+				file_path = parent / filename
+				if file_path.is_file() and file_path.stat().st_size:
+					files.append(([*parts, filename], file_path))
+	return files
+
+
+def make_metainfo(
+	paths: PathLike | Sequence[PathLike],
+	piece_length: int | None = None,
+	trackers: Sequence[Sequence[str]] = (),
+	name: str | None = None,
+	comment: str | None = None,
+	private: bool = False,
+	workers: int | None = None,
+) -> bencode.BenDictionary:
+	"""Builds the metainfo dictionary of the given files and directories.
+
+	A single file makes a single-file torrent named after it, and a single directory a
+	multi-file torrent named after it. Several paths make a multi-file torrent whose ``name``
+	must be given. ``trackers`` are announce tiers, each a list of backup urls (BEP 12).
+	"""
+	if isinstance(paths, (str, os.PathLike)):
+		paths = [paths]
+	if not paths:
+		raise ValueError("no content paths")
+
+	single_file = len(paths) == 1 and pathlib.Path(paths[0]).is_file()
+	files = collect_files(paths)
+	if not files:
+		raise ValueError("no non-empty files to share")
+
+	if len(paths) == 1:
+		name = name or pathlib.Path(paths[0]).resolve().name
+		if not single_file:  # the directory itself is the torrent's root
+			files = [(parts[1:], file_path) for parts, file_path in files]
+	elif name is None:
+		raise ValueError("a name is required for more than one content path")
+
+	specs: list[FileSpec] = [(file_path, file_path.stat().st_size) for _, file_path in files]
+	total_size = sum(size for _, size in specs)
+	if piece_length is None:
+		piece_length = auto_piece_length(total_size)
+	elif piece_length <= 0:
+		raise ValueError("piece length is not a natural number")
+
+	digests = hash_pieces(read_pieces(specs, piece_length), workers)
+	pieces = bytearray()
+	for i, digest in enumerate(digests):
+		if digest is None:
+			raise ValueError("failed to read piece %d, was the content modified?" % i)
+		pieces += digest
+
+	info: bencode.BenDictionary = {"name": name.encode(), "piece length": piece_length, "pieces": bytes(pieces)}
+	if single_file:
+		info["length"] = total_size
+	else:
+		info["files"] = [
+			{"length": size, "path": [part.encode() for part in parts]}
+			for (parts, _), (_, size) in zip(files, specs)
+		]
+	if private:
+		info["private"] = 1
+
+	metainfo: bencode.BenDictionary = {
+		"info": info,
+		"creation date": int(time.time()),
+		"created by": "bitphantom %s" % __version__,
+	}
+	tiers = [[url.encode() for url in tier] for tier in trackers if tier]
+	if tiers:
+		metainfo["announce"] = tiers[0][0]
+		if len(tiers) > 1 or len(tiers[0]) > 1:
+			metainfo["announce-list"] = tiers  # type: ignore[assignment]
+	if comment is not None:
+		metainfo["comment"] = comment
+
+	return metainfo
+
+
+def init_parser() -> ap.ArgumentParser:
+	parser = ap.ArgumentParser(description=__doc__)
+	parser.add_argument(
+		"-v",
+		"--version",
+		help="script version",
+		action="store_true",
+	)
+	parser.add_argument(
+		"paths",
+		help="files and directories to share",
+		nargs="*",
+	)
+	parser.add_argument(
+		"-o",
+		"--outfile",
+		help="path to the metainfo file (defaults to stdout)",
+		type=ap.FileType("wb"),
+		default=sys.stdout.buffer,
+	)
+	parser.add_argument(
+		"-t",
+		"--tracker",
+		help="an announce tier as comma separated urls, may be repeated",
+		action="append",
+		default=[],
+	)
+	parser.add_argument(
+		"-l",
+		"--piece-length",
+		help="piece length in bytes (defaults to a size based choice)",
+		type=int,
+	)
+	parser.add_argument(
+		"-n",
+		"--name",
+		help="torrent name (defaults to the name of the only path)",
+	)
+	parser.add_argument(
+		"-c",
+		"--comment",
+		help="free form comment",
+	)
+	parser.add_argument(
+		"--private",
+		help="mark the torrent as private",
+		action="store_true",
+	)
+	parser.add_argument(
+		"-j",
+		"--workers",
+		help="number of hashing threads (defaults to the cpu count)",
+		type=int,
+	)
+	return parser
+
+
+def make_torrent(ns: ap.Namespace) -> int:
+	if not ns.paths:
+		err("no content paths given")
+
+	trackers = [tier.split(",") for tier in ns.tracker]
+	try:
+		metainfo = make_metainfo(
+			ns.paths,
+			piece_length=ns.piece_length,
+			trackers=trackers,
+			name=ns.name,
+			comment=ns.comment,
+			private=ns.private,
+			workers=ns.workers,
+		)
+	except (OSError, ValueError) as e:
+		err("failed to create metainfo", e.__str__())
+
+	outfile: BinaryIO = ns.outfile
+	outfile.write(bencode.encode(metainfo))
+	outfile.flush()
+	return 0
+
+
+def main(args: Sequence[str] | None = None) -> int:
+	parser = init_parser()
+	ns = parser.parse_args(args)
+
+	if ns.version:
+		print(__version__)
+		return 0
+
+	return make_torrent(ns)
+
+
+if __name__ == "__main__":
+	exit(main(sys.argv[1:]))
@@ -1,18 +1,28 @@
 import base64
+import bisect
 import hashlib
+import itertools
+import mmap
+import os
 import pathlib
 import urllib.parse
+from array import array
+from collections.abc import Iterable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from dataclasses import dataclass
-from typing import Any, Iterator, NamedTuple, TypeAlias, Union
+from functools import cached_property
+from typing import Any, Iterator, Literal, NamedTuple, TypeAlias, overload
 
 from . import bencode
+from .bencode.scanner import DICTIONARY
 
 CHUNK_SIZE: int = 20
+BATCH_SIZE: int = 16
 
 
 TrackerTier: TypeAlias = list[list[urllib.parse.ParseResultBytes]]
 PieceLength: TypeAlias = int
-Pieces: TypeAlias = bytes
+Pieces: TypeAlias = bytes | memoryview
 InfoHash: TypeAlias = bytes
 
 
@@ -21,123 +31,285 @@ class Content(NamedTuple):
 	size: int
 
 
-@dataclass
-class MetaInfo:
-	trackers: TrackerTier
-	name: str | None
-	content: list[Content] | int
-	piece_length: int
-	pieces: Pieces
-	info_hash: InfoHash
+class FileList(Sequence[Content]):
+	"""The files of a multi-file torrent, stored as a struct of arrays.
 
-	def __str__(self) -> str:
-		trackers = []
-		for tier in self.trackers:
-			backups = [url.geturl().decode() for url in tier]
-			tier_line = "  ".join(backups)
-			trackers.append("\t" + tier_line)
-
-		name_line = self.name or "."
-		if isinstance(self.content, int):
-			content = "\t%s (%d)" % (name_line, self.content)
-		else:
-			content = ("\t%s/\n" % name_line) + "\n".join(preview_files(self.content, "\t"))
+	``paths`` holds the utf8 path of every file, components joined by ``/``, each followed by a
+	``/`` separator, so that file ``i`` is ``paths[offsets[i] : offsets[i + 1] - 1]``. ``sizes``
+	holds the file lengths. Items are still :class:`Content` tuples, but their
+	:class:`pathlib.Path` is only built when the item is requested.
+	"""
 
-		tracker_section = "trackers:\n" + "\n".join(trackers)
-		content_section = "content:\n" + content
-		piece_length = "piece length: %d" % self.piece_length
-		info_hash = "info hash: %s" % base64.b64encode(self.info_hash).decode()
+	def __init__(self, paths: bytes, offsets: array, sizes: array):
+		if len(offsets) != len(sizes) + 1:
+			raise ValueError("file list offsets do not match its sizes")
+		self.paths = paths
+		self.offsets = offsets
+		self.sizes = sizes
 
-		return "\n".join((tracker_section, content_section, piece_length, info_hash))
+	@classmethod
+	def from_contents(cls, contents: Iterable[Content]) -> "FileList":
+		paths = bytearray()
+		offsets = array("q", [0])
+		sizes = array("q")
+		for content in contents:
+			paths += content.path.as_posix().encode()
+			paths.append(ord(b"/"))
+			offsets.append(len(paths))
+			sizes.append(content.size)
+		return cls(bytes(paths), offsets, sizes)
 
+	def __len__(self) -> int:
+		return len(self.sizes)
 
-FileTree = dict[str, Union[int, "FileTree"]]
+	@overload
+	def __getitem__(self, idx: int) -> Content: ...
 
+	@overload
+	def __getitem__(self, idx: slice) -> list[Content]: ...
 
-def file_tree(files: list[Content]) -> FileTree:
-	ft: FileTree = {}
+	def __getitem__(self, idx: int | slice) -> Content | list[Content]:
+		if isinstance(idx, slice):
+			return [self[i] for i in range(*idx.indices(len(self)))]
+		return Content(self.path(idx), self.sizes[idx])
 
-	for file in files:
-		file_path = file.path
-		path_parts = file_path.parts
-		if len(path_parts) == 1:
-			f = path_parts[0]
-			ft[f] = file.size
-			continue
+	def __iter__(self) -> Iterator[Content]:
+		for i in range(len(self)):
+			yield Content(self.path(i), self.sizes[i])
 
-		file_parents, path_file = path_parts[:-1], path_parts[-1]
-		current_parent = ft
-		for parent in file_parents:
-			in_parent = current_parent.get(parent)
-			if isinstance(in_parent, dict):
-				current_parent = in_parent
-				continue
+	def __eq__(self, other: object) -> bool:
+		if isinstance(other, FileList):
+			return self.paths == other.paths and self.offsets == other.offsets and self.sizes == other.sizes
+		if isinstance(other, list):
+			return list(self) == other
+		return NotImplemented
 
-			p = {}
-			if in_parent is None:
-				current_parent[parent] = p
-			else:  # a file and a directory share the same name
-				parent_dir = parent + "/"
-				current_parent[parent_dir] = p
-			current_parent = p
-		else:
-			current_parent[path_file] = file.size
+	def __repr__(self) -> str:
+		return "FileList(%d files, %d bytes)" % (len(self), self.total_size)
 
-	return ft
+	@property
+	def total_size(self) -> int:
+		return sum(self.sizes)
 
+	def raw_path(self, idx: int) -> bytes:
+		if idx < 0:
+			idx += len(self)
+		return self.paths[self.offsets[idx] : self.offsets[idx + 1] - 1]
 
-def preview_files(files: list[Content], prefix: str = "") -> list[str]:
-	tree = file_tree(files)
-	return preview_tree(tree, prefix)
+	def path_str(self, idx: int) -> str:
+		return self.raw_path(idx).decode()
 
+	def path(self, idx: int) -> pathlib.Path:
+		return pathlib.Path(self.path_str(idx))
 
-def preview_tree_entry(key: str, val: int | FileTree, key_prefix: str, prefix: str, lines: list[str]):
-	if isinstance(val, int):
-		lines.append(f"{key_prefix}{key} ({val})")
-		return
+	def parts(self, idx: int) -> tuple[str, ...]:
+		"""The components of ``path(idx)``, without building the path."""
+		return tuple(part for part in self.path_str(idx).split("/") if part and part != ".")
 
-	postfix = ""
-	if not key.endswith("/"):
-		postfix = "/"
 
-	lines.append(f"{key_prefix}{key}{postfix}")
-	lines += preview_tree(val, prefix)
+@dataclass
+class MetaInfo:
+	trackers: TrackerTier
+	name: str | None
+	content: FileList | int
+	piece_length: int
+	pieces: Pieces
+	info_hash: InfoHash
 
+	@cached_property
+	def piece_table(self) -> "PieceTable":
+		return PieceTable(self.pieces)
 
-def preview_tree(tree: FileTree, prefix: str = "") -> list[str]:
-	lines = []
-	keys = sorted(tree.keys())
-	ks, k_last = keys[:-1], keys[-1]
-	for k in ks:
-		v = tree[k]
-		preview_tree_entry(k, v, "├─ ", "│  ", lines)
+	def __str__(self) -> str:
+		return "\n".join(iter_metainfo_lines(self))
+
+
+TREE_BRANCH: str = "├─ "
+TREE_LAST: str = "└─ "
+TREE_PIPE: str = "│  "
+TREE_SPACE: str = "   "
+TREE_TRUNCATED: str = "..."
+
+
+def iter_metainfo_lines(
+	metainfo: "MetaInfo | LazyMetaInfo",
+	max_depth: int | None = None,
+	limit: int | None = None,
+) -> Iterator[str]:
+	"""Yields the lines of the textual representation of ``metainfo`` one by one.
+
+	``max_depth`` and ``limit`` bound the file tree as in :func:`iter_preview`.
+	"""
+	yield "trackers:"
+	for tier in metainfo.trackers:
+		yield "\t" + "  ".join(url.geturl().decode() for url in tier)
+
+	yield "content:"
+	name_line = metainfo.name or "."
+	content = metainfo.content
+	if isinstance(content, int):
+		yield "\t%s (%d)" % (name_line, content)
 	else:
-		v = tree[k_last]
-		preview_tree_entry(k_last, v, "└─ ", "   ", lines)
-
-	for i in range(len(lines)):
-		current_line = lines[i]
-		lines[i] = prefix + current_line
-
-	return lines
+		yield "\t%s/" % name_line
+		yield from iter_preview(content, "\t", max_depth, limit)
+
+	yield "piece length: %d" % metainfo.piece_length
+	yield "info hash: %s" % base64.b64encode(metainfo.info_hash).decode()
+
+
+def iter_preview(
+	files: Iterable[Content],
+	prefix: str = "",
+	max_depth: int | None = None,
+	limit: int | None = None,
+) -> Iterator[str]:
+	"""Yields the lines of a tree drawing of ``files``, directories first seen first served.
+
+	Paths are sorted once, and each line is rendered as soon as it is known whether its entry
+	is the last one of its directory, so no nested tree is ever built. Only the first
+	``max_depth`` levels are drawn, and the drawing stops after ``limit`` lines.
+	"""
+	if isinstance(files, FileList):
+		entries = [(files.parts(i), files.sizes[i]) for i in range(len(files))]
+	else:
+		entries = [(file.path.parts, file.size) for file in files]
+	entries.sort()
+
+	# bit d of siblings[k] tells whether the entry at depth d of path k has a later sibling
+	siblings = [0] * len(entries)
+	mask = 0
+	for k in range(len(entries) - 2, -1, -1):
+		parts = entries[k][0]
+		common = _common_dirs(parts, entries[k + 1][0])
+		mask = (mask & ((1 << common) - 1)) | (1 << common if common < len(parts) else 0)
+		siblings[k] = mask
+
+	indents = [prefix]
+	previous: tuple[str, ...] = ()
+	count = 0
+	for (parts, size), mask in zip(entries, siblings):
+		depth = _common_dirs(previous, parts)
+		previous = parts
+		del indents[depth + 1 :]
+
+		last = len(parts) - 1
+		for d in range(depth, len(parts)):
+			if max_depth is not None and d >= max_depth:
+				break
+			if limit is not None and count >= limit:
+				yield prefix + TREE_TRUNCATED
+				return
+
+			has_sibling = mask >> d & 1
+			branch = TREE_BRANCH if has_sibling else TREE_LAST
+			if d == last:
+				yield "%s%s%s (%d)" % (indents[d], branch, parts[d], size)
+			else:
+				yield "%s%s%s/" % (indents[d], branch, parts[d])
+				indents.append(indents[d] + (TREE_PIPE if has_sibling else TREE_SPACE))
+			count += 1
+
+
+def _common_dirs(a: tuple[str, ...], b: tuple[str, ...]) -> int:
+	"""Number of leading directories shared by two paths (their last part is a file)."""
+	n = min(len(a), len(b)) - 1
+	i = 0
+	while i < n and a[i] == b[i]:
+		i += 1
+	return i
+
+
+def preview_files(files: Iterable[Content], prefix: str = "") -> list[str]:
+	return list(iter_preview(files, prefix))
+
+
+class PieceTable(Sequence[memoryview]):
+	"""The piece hashes of a metainfo, indexed without copying.
+
+	Items are views of ``chunk_size`` bytes into ``pieces`` and slices are tables over a
+	sub-view, so indexing, slicing and ``len`` are all O(1).
+	"""
+
+	def __init__(self, pieces: bencode.Buffer, chunk_size: int = CHUNK_SIZE):
+		self.view = memoryview(pieces)
+		self.chunk_size = chunk_size
+		if len(self.view) % chunk_size != 0:
+			raise ValueError("pieces entry length is not divisable by %d" % chunk_size)
+
+	def __len__(self) -> int:
+		return len(self.view) // self.chunk_size
+
+	@overload
+	def __getitem__(self, idx: int) -> memoryview: ...
+
+	@overload
+	def __getitem__(self, idx: slice) -> "PieceTable": ...
+
+	def __getitem__(self, idx: int | slice) -> "memoryview | PieceTable":
+		size = self.chunk_size
+		if isinstance(idx, slice):
+			start, stop, step = idx.indices(len(self))
+			if step == 1:
+				return PieceTable(self.view[start * size : max(start, stop) * size], size)
+			return PieceTable(b"".join(self[i] for i in range(start, stop, step)), size)
+
+		count = len(self)
+		if idx < 0:
+			idx += count
+		if not 0 <= idx < count:
+			raise IndexError("piece index out of range")
+		i = idx * size
+		return self.view[i : i + size]
+
+	def __iter__(self) -> Iterator[memoryview]:
+		view, size = self.view, self.chunk_size
+		for i in range(0, len(view), size):
+			yield view[i : i + size]
+
+	def compare(self, digests: bencode.Buffer | Iterable[bencode.Buffer], start: int = 0) -> list[int]:
+		"""Returns the indices of the pieces whose hash differs from the matching digest.
+
+		``digests`` are the hashes computed for pieces ``start``, ``start + 1``, ..., either as
+		separate digests or already concatenated. Runs of matching pieces are compared as whole
+		blocks, so the cost grows with the number of mismatches rather than of pieces.
+		"""
+		if not isinstance(digests, (bytes, bytearray, memoryview)):
+			digests = b"".join(digests)
+		size = self.chunk_size
+		if len(digests) % size != 0:
+			raise ValueError("digests length is not divisable by %d" % size)
+		count = len(digests) // size
+		if start < 0 or start + count > len(self):
+			raise IndexError("digests exceed the piece table")
+
+		expected = self.view[start * size : (start + count) * size]
+		actual = memoryview(digests)
+		failed: list[int] = []
+		ranges = [(0, count)]
+		while ranges:
+			i, j = ranges.pop()
+			if expected[i * size : j * size] == actual[i * size : j * size]:
+				continue
+			if j - i == 1:
+				failed.append(start + i)
+				continue
+			middle = (i + j) // 2
+			ranges.append((middle, j))
+			ranges.append((i, middle))
+		return failed
 
 
-def get_piece(pieces: bytes, idx: int, chunk_size: int = CHUNK_SIZE) -> bytes | None:
-	i = chunk_size * idx
-	if idx == -1:
-		return pieces[i:] or None
-	j = i + chunk_size
-	return pieces[i:j] or None
+def get_piece(pieces: bencode.Buffer, idx: int, chunk_size: int = CHUNK_SIZE) -> bytes | None:
+	try:
+		return bytes(PieceTable(pieces, chunk_size)[idx])
+	except IndexError:
+		return None
 
 
-def iterate_pieces(pieces: bytes, chunk_size: int = CHUNK_SIZE, reverse: bool = False) -> Iterator[bytes]:
-	i, j = (-1, -1) if reverse else (0, 1)
-	while True:
-		chunk = get_piece(pieces, i, chunk_size)
-		if chunk is None:
-			break
-		i += j
-		yield chunk
+def iterate_pieces(pieces: bencode.Buffer, chunk_size: int = CHUNK_SIZE, reverse: bool = False) -> Iterator[bytes]:
+	table = PieceTable(pieces, chunk_size)
+	for piece in reversed(table) if reverse else table:
+		yield bytes(piece)
 
 
 def process_trackers(raw_trackers: Any) -> TrackerTier:
@@ -156,79 +328,158 @@ def process_trackers(raw_trackers: Any) -> TrackerTier:
 	return raw_trackers
 
 
-def process_files(raw_files: Any) -> list[Content]:
-	content: list[Content] = []
+def process_announce(announce_list: Any, announce: Any) -> TrackerTier:
+	"""Returns the tracker tiers, which are empty for a trackerless (DHT only) torrent."""
+	if announce_list is None:
+		if announce is None:
+			return []
+		announce_list = [[announce]]
+	return process_trackers(announce_list)
 
+
+def process_files(raw_files: Any) -> FileList:
 	if not isinstance(raw_files, list):
 		raise ValueError("files entry is not a list")
 
-	for i, file_dict in enumerate(raw_files):
-		if not isinstance(file_dict, dict):
+	paths = bytearray()
+	offsets = array("q", [0])
+	sizes = array("q")
+
+	for i, file in enumerate(raw_files):
+		if isinstance(file, FileSchema):
+			length, path_pieces = file.length, file.path
+		elif isinstance(file, dict):
+			length, path_pieces = file.get("length"), file.get("path")
+		else:
 			raise ValueError("file %d at files entry is not a dictionary" % i)
 
-		length = file_dict.get("length")
 		if not isinstance(length, int) or length <= 0:
 			raise ValueError("length of file %d at files entry is not a natrual number" % i)
 
-		paths = file_dict.get("path")
-		if not isinstance(paths, list):
+		if not isinstance(path_pieces, list):
 			raise ValueError("path of file %d at files entry is not of type list" % i)
 
-		for j, path in enumerate(paths):
+		for j, path in enumerate(path_pieces):
 			if not isinstance(path, bytes):
 				raise ValueError("path piece %d of file %d at files entry is not of type bytes" % (j, i))
-		path_acc = b"/".join(paths)
-
-		try:
-			path = path_acc.decode()
-		except UnicodeDecodeError as err:
-			raise ValueError("path of file %d at files is not utf8 encoded" % i) from err
-
-		content.append(Content(pathlib.Path(path), length))
-
-	return content
-
-
-def process_info(info: bencode.BenDictionary) -> tuple[str | None, list[Content] | int, PieceLength, Pieces, InfoHash]:
-	name = info.get("name")
-	if name is not None:
-		if not isinstance(name, bytes):
-			raise ValueError("name entry is not of type bytes")
-		try:
-			name = name.decode()
-		except UnicodeDecodeError as err:
-			raise ValueError("name entry is not utf8 encoded") from err
-
-	length = info.get("length")
-	raw_files = info.get("files")
-
+			if j:
+				paths.append(ord(b"/"))
+			paths += path
+		paths.append(ord(b"/"))  # no multibyte sequence can span a separator
+		offsets.append(len(paths))
+		sizes.append(length)
+
+	raw_paths = bytes(paths)
+	try:
+		raw_paths.decode()
+	except UnicodeDecodeError as err:
+		i = bisect.bisect_right(offsets, err.start) - 1
+		raise ValueError("path of file %d at files is not utf8 encoded" % i) from err
+
+	return FileList(raw_paths, offsets, sizes)
+
+
+def process_name(name: Any) -> str | None:
+	if name is None:
+		return None
+	if not isinstance(name, bytes):
+		raise ValueError("name entry is not of type bytes")
+	try:
+		return name.decode()
+	except UnicodeDecodeError as err:
+		raise ValueError("name entry is not utf8 encoded") from err
+
+
+def process_content(length: Any, raw_files: Any) -> FileList | int:
 	if length and raw_files:
 		raise ValueError("length and files entries are present")
 
 	if length is None:
-		content = process_files(raw_files)
-	else:
-		if not isinstance(length, int) or length <= 0:
-			raise ValueError("length entry is not a natural number")
-		content = length
+		return process_files(raw_files)
+	if not isinstance(length, int) or length <= 0:
+		raise ValueError("length entry is not a natural number")
+	return length
 
-	piece_length = info.get("piece length")
+
+def process_piece_length(piece_length: Any) -> PieceLength:
 	if piece_length is None or not isinstance(piece_length, int) or piece_length <= 0:
 		raise ValueError("piece length entry is not a natural number")
+	return piece_length
+
 
-	pieces = info.get("pieces")
-	if not isinstance(pieces, bytes):
+def process_pieces(pieces: Any) -> Pieces:
+	if not isinstance(pieces, (bytes, memoryview)):
 		raise ValueError("pieces entry is not of type bytes")
 	if len(pieces) % CHUNK_SIZE != 0:
 		raise ValueError("pieces entry length is not divisable by %d" % CHUNK_SIZE)
+	return pieces
+
+
+@bencode.schema
+class FileSchema:
+	length: int
+	path: list[bytes]
+
+
+@bencode.schema
+class InfoSchema:
+	piece_length: int = bencode.field("piece length", check=process_piece_length)
+	pieces: bytes = bencode.field(check=process_pieces)
+	name: bytes | None = None
+	length: int | None = None
+	files: list[FileSchema] | None = None
 
-	info_bencode = bencode.encode(info)
-	info_hash = hashlib.sha1(info_bencode).digest()
+
+@bencode.schema
+class MetaInfoSchema:
+	"""The entries of a metainfo file that are read, all others are skipped without decoding."""
+
+	info: InfoSchema
+	announce: bytes | None = None
+	announce_list: list[list[bytes]] | None = bencode.field("announce-list", default=None)
+
+
+def process_info(
+	info: bencode.BenDictionary,
+	raw_info: bencode.Buffer | None = None,
+) -> tuple[str | None, FileList | int, PieceLength, Pieces, InfoHash]:
+	"""Validates a decoded info dictionary.
+
+	The info hash is the SHA-1 of ``raw_info``, the info dictionary exactly as it appears in the
+	metainfo file. Without it, the dictionary is re-encoded, which only matches the original
+	bytes if the source was canonically encoded.
+	"""
+	with bencode.phase("validate"):
+		name = process_name(info.get("name"))
+		content = process_content(info.get("length"), info.get("files"))
+		piece_length = process_piece_length(info.get("piece length"))
+		pieces = process_pieces(info.get("pieces"))
+
+	if raw_info is None:
+		raw_info = bencode.encode(info)
+	with bencode.phase("hash"):
+		info_hash = hashlib.sha1(raw_info).digest()
 
 	return name, content, piece_length, pieces, info_hash
 
 
-def load_metainfo(path: str | pathlib.Path) -> MetaInfo:
+@overload
+def load_metainfo(path: str | pathlib.Path, lazy: Literal[False] = False) -> MetaInfo: ...
+
+
+@overload
+def load_metainfo(path: str | pathlib.Path, lazy: Literal[True]) -> "LazyMetaInfo": ...
+
+
+def load_metainfo(path: str | pathlib.Path, lazy: bool = False) -> "MetaInfo | LazyMetaInfo":
+	"""Loads a metainfo file.
+
+	With ``lazy`` the file is memory mapped instead of read, and its entries are only decoded
+	when first accessed (see :class:`LazyMetaInfo`).
+	"""
+	if lazy:
+		return LazyMetaInfo.open(path)
+
 	with open(path, "rb") as file:
 		raw_bencode = file.read()
 
@@ -236,21 +487,168 @@ def load_metainfo(path: str | pathlib.Path) -> MetaInfo:
 
 
 def loads_metainfo(source: bytes) -> MetaInfo:
-	if not (source and source[0] == ord(b"d")):
+	"""Parses a metainfo file in a single pass, reading its entries straight into schema objects."""
+	if not (source and source[0] == DICTIONARY):
 		raise ValueError("invalid torrent file")
-	benval, _ = bencode.decode_dictionary(source[1:])
-
-	raw_trackers = benval.get("announce-list")
-	if raw_trackers is None:
-		tracker = benval.get("announce")
-		if tracker is None:
-			raise ValueError("missing tarcker entries")
-		raw_trackers = [[tracker]]
-	trackers = process_trackers(raw_trackers)
-
-	info = benval.get("info")
-	if info is None or not isinstance(info, dict):
-		raise ValueError("missing info entry")
-	name, content, piece_length, pieces, info_hash = process_info(info)
-
-	return MetaInfo(trackers, name, content, piece_length, pieces, info_hash)
+	spans: dict[str, bencode.Span] = {}
+	raw, _ = bencode.unmarshal(MetaInfoSchema, source, 0, spans)
+	info = raw.info
+
+	with bencode.phase("validate"):
+		trackers = process_announce(raw.announce_list, raw.announce)
+		name = process_name(info.name)
+		content = process_content(info.length, info.files)
+
+	info_start, info_end = spans["info"]
+	with memoryview(source)[info_start:info_end] as raw_info, bencode.phase("hash"):
+		info_hash = hashlib.sha1(raw_info).digest()
+
+	return MetaInfo(trackers, name, content, info.piece_length, info.pieces, info_hash)
+
+
+class LoadResult(NamedTuple):
+	path: str
+	metainfo: MetaInfo | None
+	error: str | None
+
+
+def load_many(
+	paths: Iterable[str | pathlib.Path],
+	workers: int | None = None,
+	batch_size: int = BATCH_SIZE,
+) -> Iterator[LoadResult]:
+	"""Loads many metainfo files on a pool of ``workers`` processes (defaults to the CPU count).
+
+	Results are yielded as soon as they are ready, so not in the order of ``paths``. A file that
+	fails to load is reported through the ``error`` of its result instead of raising. Paths are
+	handed to the workers ``batch_size`` at a time to amortize the inter-process overhead.
+	"""
+	if workers is None:
+		workers = os.cpu_count() or 1
+	if workers <= 1:
+		for path in paths:
+			yield _load_one(path)
+		return
+
+	path_iter = iter(paths)
+	with ProcessPoolExecutor(workers) as pool:
+		pending: set[Future[list[LoadResult]]] = set()
+		while True:
+			while len(pending) < 2 * workers:
+				batch = list(itertools.islice(path_iter, batch_size))
+				if not batch:
+					break
+				pending.add(pool.submit(_load_batch, batch))
+			if not pending:
+				break
+
+			done, pending = wait(pending, return_when=FIRST_COMPLETED)
+			for future in done:
+				yield from future.result()
+
+
+def _load_batch(paths: list[str | pathlib.Path]) -> list[LoadResult]:
+	return [_load_one(path) for path in paths]
+
+
+def _load_one(path: str | pathlib.Path) -> LoadResult:
+	try:
+		return LoadResult(str(path), load_metainfo(path), None)
+	except (OSError, ValueError) as err:
+		return LoadResult(str(path), None, str(err))
+
+
+class LazyMetaInfo:
+	"""A metainfo whose entries are decoded from the source buffer only when first accessed.
+
+	It has the same attributes as :class:`MetaInfo`, except that ``pieces`` is a view into the
+	source instead of a copy. Opened from a path, the source is a read-only memory map which
+	stays open until :meth:`close` is called or the ``with`` block exits; views handed out by
+	``pieces`` must be released before that.
+	"""
+
+	def __init__(self, source: bencode.Buffer):
+		self._source = source
+		self._view = memoryview(source)
+		self._map: mmap.mmap | None = None
+
+		try:
+			if not (self._view and self._view[0] == DICTIONARY):
+				raise ValueError("invalid torrent file")
+			info_span = bencode.query_span(self._view, "info")
+			if info_span is None or self._view[info_span[0]] != DICTIONARY:
+				raise ValueError("missing info entry")
+		except BaseException:
+			self._view.release()
+			raise
+		self._info_start, self._info_end = info_span
+
+	@classmethod
+	def open(cls, path: str | pathlib.Path) -> "LazyMetaInfo":
+		with open(path, "rb") as file:
+			try:
+				mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+			except ValueError as err:  # empty files cannot be mapped
+				raise ValueError("invalid torrent file") from err
+
+		try:
+			metainfo = cls(mapped)
+		except BaseException:
+			mapped.close()
+			raise
+		metainfo._map = mapped
+		return metainfo
+
+	def close(self):
+		table = self.__dict__.pop("piece_table", None)
+		if table is not None:
+			table.view.release()
+		pieces = self.__dict__.pop("pieces", None)
+		if pieces is not None:
+			pieces.release()
+		self._view.release()
+		if self._map is not None:
+			self._map.close()
+
+	def __enter__(self) -> "LazyMetaInfo":
+		return self
+
+	def __exit__(self, *_):
+		self.close()
+
+	__str__ = MetaInfo.__str__
+
+	def _info(self, key: str) -> bencode.Bencode | None:
+		return bencode.query(self._view, key, self._info_start)
+
+	@cached_property
+	def trackers(self) -> TrackerTier:
+		announce_list = bencode.query(self._view, "announce-list")
+		announce = None if announce_list is not None else bencode.query(self._view, "announce")
+		return process_announce(announce_list, announce)
+
+	@cached_property
+	def name(self) -> str | None:
+		return process_name(self._info("name"))
+
+	@cached_property
+	def content(self) -> FileList | int:
+		return process_content(self._info("length"), self._info("files"))
+
+	@cached_property
+	def piece_length(self) -> PieceLength:
+		return process_piece_length(self._info("piece length"))
+
+	@cached_property
+	def pieces(self) -> Pieces:
+		pieces = bencode.query_bytes(self._view, "pieces", self._info_start)
+		return process_pieces(pieces)
+
+	@cached_property
+	def piece_table(self) -> PieceTable:
+		return PieceTable(self.pieces)
+
+	@cached_property
+	def info_hash(self) -> InfoHash:
+		with self._view[self._info_start : self._info_end] as raw_info, bencode.phase("hash"):
+			return hashlib.sha1(raw_info).digest()
@@ -0,0 +1,148 @@
+"""Fast resume: remembering verified pieces across restarts.
+
+A resume file stores, for one torrent, the bitfield of its verified pieces along with the size
+and modification time of each of its files at the time of the check. On the next check, only
+the pieces touching files whose size or modification time changed are hashed again.
+"""
+
+import os
+import pathlib
+from dataclasses import dataclass
+from typing import TypeAlias
+
+from . import bencode
+from .bitfield import Bitfield
+from .meta_info import InfoHash, LazyMetaInfo, MetaInfo
+from .span_index import SpanIndex
+from .storage import FileSpec, content_files
+from .verify import Progress, verify
+
+RESUME_SUFFIX: str = ".resume"
+
+FileStat: TypeAlias = tuple[int, int]
+MISSING_FILE: FileStat = (-1, -1)
+
+
+@dataclass
+class ResumeData:
+	info_hash: InfoHash
+	bitfield: Bitfield
+	files: list[FileStat]
+
+
+def file_stats(files: list[FileSpec]) -> list[FileStat]:
+	"""Returns the ``(size, mtime_ns)`` of every file, or :data:`MISSING_FILE` if it cannot be read."""
+	stats = []
+	for path, _ in files:
+		try:
+			st = os.stat(path)
+		except OSError:
+			stats.append(MISSING_FILE)
+			continue
+		stats.append((st.st_size, st.st_mtime_ns))
+	return stats
+
+
+def encode_resume(data: ResumeData) -> bytes:
+	return bencode.encode(
+		{
+			"info hash": data.info_hash,
+			"piece count": len(data.bitfield),
+			"bitfield": bytes(data.bitfield),
+			"files": [list(stat) for stat in data.files],  # type: ignore[misc]
+		}
+	)
+
+
+def decode_resume(raw: bytes) -> ResumeData:
+	benval, _ = bencode.decode(raw)
+	if not isinstance(benval, dict):
+		raise ValueError("resume data is not a dictionary")
+
+	info_hash = benval.get("info hash")
+	if not isinstance(info_hash, bytes) or len(info_hash) != 20:
+		raise ValueError("info hash entry is not a sha1 digest")
+
+	piece_count = benval.get("piece count")
+	raw_bitfield = benval.get("bitfield")
+	if not isinstance(piece_count, int) or piece_count < 0:
+		raise ValueError("piece count entry is not a natural number")
+	if not isinstance(raw_bitfield, bytes):
+		raise ValueError("bitfield entry is not of type bytes")
+	bitfield = Bitfield(piece_count, raw_bitfield)
+
+	raw_files = benval.get("files")
+	if not isinstance(raw_files, list):
+		raise ValueError("files entry is not a list")
+	files: list[FileStat] = []
+	for i, stat in enumerate(raw_files):
+		if not (isinstance(stat, list) and len(stat) == 2 and all(isinstance(n, int) for n in stat)):
+			raise ValueError("stat of file %d at files entry is not a size and mtime pair" % i)
+		files.append((stat[0], stat[1]))  # type: ignore[arg-type]
+
+	return ResumeData(info_hash, bitfield, files)
+
+
+class ResumeStore:
+	"""A directory of resume files, one per torrent, named after the hex info hash."""
+
+	def __init__(self, directory: str | pathlib.Path):
+		self.directory = pathlib.Path(directory)
+
+	def path(self, info_hash: InfoHash) -> pathlib.Path:
+		return self.directory / (info_hash.hex() + RESUME_SUFFIX)
+
+	def load(self, info_hash: InfoHash) -> ResumeData | None:
+		"""Returns the stored resume data, or ``None`` if it is missing, corrupt or mismatched."""
+		try:
+			data = decode_resume(self.path(info_hash).read_bytes())
+		except (OSError, ValueError):
+			return None
+		return data if data.info_hash == info_hash else None
+
+	def save(self, data: ResumeData):
+		"""Writes ``data`` atomically, so a crash never leaves a truncated resume file."""
+		self.directory.mkdir(parents=True, exist_ok=True)
+		path = self.path(data.info_hash)
+		tmp_path = path.with_suffix(RESUME_SUFFIX + ".tmp")
+		tmp_path.write_bytes(encode_resume(data))
+		os.replace(tmp_path, path)
+
+	def discard(self, info_hash: InfoHash):
+		self.path(info_hash).unlink(missing_ok=True)
+
+
+def recheck(
+	metainfo: MetaInfo | LazyMetaInfo,
+	root_dir: str | pathlib.Path,
+	store: ResumeStore,
+	workers: int | None = None,
+	progress: Progress | None = None,
+) -> Bitfield:
+	"""Verifies the content of ``metainfo``, reusing the resume data of the previous check.
+
+	Pieces touching a file whose size or modification time differs from the stored one are
+	hashed again, everything else keeps its stored state. Without usable resume data this is a
+	full :func:`~bitphantom.verify.verify`. The new state is saved back to ``store``.
+	"""
+	files = content_files(metainfo, root_dir)
+	stats = file_stats(files)  # taken before hashing, so later changes are caught next time
+	resume = store.load(metainfo.info_hash)
+
+	if resume is None or len(resume.files) != len(files) or len(resume.bitfield) != len(metainfo.piece_table):
+		bitfield = verify(metainfo, root_dir, workers, progress)
+	else:
+		index = SpanIndex((size for _, size in files), metainfo.piece_length)
+		pieces: set[int] = set()
+		for f, (old, new) in enumerate(zip(resume.files, stats)):
+			if old != new:
+				pieces.update(index.file_pieces(f))
+
+		bitfield = resume.bitfield
+		if pieces:
+			checked = verify(metainfo, root_dir, workers, progress, pieces)
+			for piece in pieces:
+				bitfield[piece] = checked[piece]
+
+	store.save(ResumeData(metainfo.info_hash, bitfield, stats))
+	return bitfield
@@ -0,0 +1,86 @@
+"""Mapping between pieces and the byte ranges of the files they cover."""
+
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable
+from itertools import accumulate
+from typing import NamedTuple
+
+from .meta_info import LazyMetaInfo, MetaInfo
+
+
+class FileSpan(NamedTuple):
+	file: int
+	offset: int
+	length: int
+
+
+class SpanIndex:
+	"""Cumulative file offsets of a torrent's content, answering span queries by bisection.
+
+	The content is the concatenation of the files, so ``offsets[f]`` is where file ``f`` starts
+	in it and ``offsets[-1]`` is its total size.
+	"""
+
+	def __init__(self, sizes: Iterable[int], piece_length: int):
+		if piece_length <= 0:
+			raise ValueError("piece length is not a natural number")
+		self.piece_length = piece_length
+		self.offsets = array("q", accumulate(sizes, initial=0))
+
+	@classmethod
+	def from_metainfo(cls, metainfo: MetaInfo | LazyMetaInfo) -> "SpanIndex":
+		content = metainfo.content
+		sizes = [content] if isinstance(content, int) else content.sizes
+		return cls(sizes, metainfo.piece_length)
+
+	def __len__(self) -> int:
+		"""Number of pieces."""
+		return -(-self.total_size // self.piece_length)
+
+	@property
+	def file_count(self) -> int:
+		return len(self.offsets) - 1
+
+	@property
+	def total_size(self) -> int:
+		return self.offsets[-1]
+
+	def piece_range(self, piece: int) -> tuple[int, int]:
+		"""Returns the ``(start, end)`` offsets of ``piece`` within the content."""
+		if not 0 <= piece < len(self):
+			raise IndexError("piece index out of range")
+		start = piece * self.piece_length
+		return start, min(start + self.piece_length, self.total_size)
+
+	def file_at(self, offset: int) -> int:
+		"""Returns the file holding the byte at ``offset`` of the content."""
+		if not 0 <= offset < self.total_size:
+			raise IndexError("content offset out of range")
+		return bisect_right(self.offsets, offset) - 1
+
+	def piece_spans(self, piece: int) -> list[FileSpan]:
+		"""Returns the file byte ranges that make up ``piece``, in order."""
+		start, end = self.piece_range(piece)
+		offsets = self.offsets
+		spans: list[FileSpan] = []
+
+		f = self.file_at(start)
+		while start < end:
+			file_end = offsets[f + 1]
+			if file_end > start:
+				n = min(end, file_end) - start
+				spans.append(FileSpan(f, start - offsets[f], n))
+				start += n
+			f += 1
+
+		return spans
+
+	def file_pieces(self, file: int) -> range:
+		"""Returns the pieces that hold at least one byte of ``file``."""
+		if not 0 <= file < self.file_count:
+			raise IndexError("file index out of range")
+		start, end = self.offsets[file], self.offsets[file + 1]
+		if start == end:
+			return range(0)
+		return range(start // self.piece_length, (end - 1) // self.piece_length + 1)
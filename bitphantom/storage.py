@@ -0,0 +1,190 @@
+"""Reading and hashing the pieces of a torrent's content on disk."""
+
+import hashlib
+import os
+import pathlib
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, TypeAlias
+
+from .meta_info import LazyMetaInfo, MetaInfo
+from .span_index import SpanIndex
+
+MAX_OPEN_FILES: int = 64
+READ_SIZE: int = 2**22
+
+FileSpec: TypeAlias = tuple[pathlib.Path, int]
+Buffer: TypeAlias = bytes | bytearray | memoryview
+
+
+def content_files(metainfo: MetaInfo | LazyMetaInfo, root_dir: str | pathlib.Path) -> list[FileSpec]:
+	"""Returns the on-disk path and size of every file of ``metainfo``, in piece order.
+
+	A single-file torrent is stored as ``root_dir/name`` and a multi-file one under
+	``root_dir/name/``. Names and paths come from untrusted metainfo, so an absolute one or one
+	with a ``..`` component raises a :class:`ValueError` rather than leaving ``root_dir``.
+	"""
+	root = pathlib.Path(root_dir)
+	content = metainfo.content
+	if isinstance(content, int):
+		if metainfo.name is None:
+			raise ValueError("single file torrent has no name entry")
+		return [(_join(root, metainfo.name), content)]
+
+	base = _join(root, metainfo.name) if metainfo.name else root
+	return [(_join(base, file.path), file.size) for file in content]
+
+
+def _join(base: pathlib.Path, relative: str | pathlib.Path) -> pathlib.Path:
+	path = pathlib.PurePath(relative)
+	if path.is_absolute() or path.anchor or ".." in path.parts:
+		raise ValueError("content path %r escapes the content directory" % str(relative))
+	return base / path
+
+
+def piece_count(files: Iterable[FileSpec], piece_length: int) -> int:
+	total = sum(size for _, size in files)
+	return -(-total // piece_length)
+
+
+def read_pieces(
+	files: Iterable[FileSpec],
+	piece_length: int,
+	read_size: int = READ_SIZE,
+) -> Iterator[memoryview | None]:
+	"""Reads the content of ``files`` sequentially and yields it one piece at a time.
+
+	Files are read in blocks of about ``read_size`` bytes, straight into a fresh buffer that
+	the yielded pieces are views of, so small pieces do not cost a system call each and no
+	piece is copied. Pieces may span several files. A piece that cannot be read completely,
+	because a file is missing or shorter than its declared size, is yielded as ``None``. Every
+	block is a new buffer, so pieces may be kept or handed to another thread.
+	"""
+	block_size = max(1, read_size // piece_length) * piece_length
+	block = bytearray(block_size)
+	filled = 0
+	bad: set[int] = set()  # pieces of the block that could not be read
+
+	for path, size in files:
+		try:
+			file = open(path, "rb", buffering=0)
+		except OSError:
+			file = None
+
+		try:
+			remaining = size
+			while remaining:
+				n = min(remaining, block_size - filled)
+				if file is None or not _read_exactly(file, memoryview(block)[filled : filled + n]):
+					bad.update(range(filled // piece_length, (filled + n - 1) // piece_length + 1))
+					if file is not None:
+						file.close()
+						file = None
+				filled += n
+				remaining -= n
+
+				if filled == block_size:
+					yield from _block_pieces(block, filled, piece_length, bad)
+					block = bytearray(block_size)
+					filled = 0
+					bad = set()
+		finally:
+			if file is not None:
+				file.close()
+
+	if filled:
+		yield from _block_pieces(block, filled, piece_length, bad)
+
+
+def _block_pieces(block: bytearray, size: int, piece_length: int, bad: set[int]) -> Iterator[memoryview | None]:
+	view = memoryview(block)
+	for i, start in enumerate(range(0, size, piece_length)):
+		yield None if i in bad else view[start : min(start + piece_length, size)]
+
+
+def read_selected_pieces(
+	files: Sequence[FileSpec],
+	index: SpanIndex,
+	pieces: Iterable[int],
+) -> Iterator[bytearray | None]:
+	"""Reads only the given pieces, locating their file ranges through ``index``.
+
+	Like :func:`read_pieces`, a piece that cannot be read completely is yielded as ``None``.
+	Pieces are best given in ascending order, so that files are read front to back.
+	"""
+	handles: dict[int, BinaryIO | None] = {}
+	try:
+		for piece in pieces:
+			start, end = index.piece_range(piece)
+			buf = bytearray(end - start)
+			view = memoryview(buf)
+			complete = True
+
+			for span in index.piece_spans(piece):
+				if span.file not in handles:
+					if len(handles) >= MAX_OPEN_FILES:
+						_close_all(handles)
+					try:
+						handles[span.file] = open(files[span.file][0], "rb", buffering=0)
+					except OSError:
+						handles[span.file] = None
+
+				handle = handles[span.file]
+				if handle is None:
+					complete = False
+					break
+				handle.seek(span.offset)
+				if not _read_exactly(handle, view[: span.length]):
+					complete = False
+					break
+				view = view[span.length :]
+
+			view.release()
+			yield buf if complete else None
+	finally:
+		_close_all(handles)
+
+
+def _close_all(handles: dict[int, BinaryIO | None]):
+	for handle in handles.values():
+		if handle is not None:
+			handle.close()
+	handles.clear()
+
+
+def _read_exactly(file, buf: memoryview) -> bool:
+	with buf:
+		while buf:
+			n = file.readinto(buf)
+			if not n:
+				return False
+			buf = buf[n:]
+	return True
+
+
+def hash_pieces(pieces: Iterable[Buffer | None], workers: int | None = None) -> Iterator[bytes | None]:
+	"""Yields the SHA-1 digest of every piece, in order, hashing them on a thread pool.
+
+	Hashing releases the GIL for large buffers, so reading the next pieces overlaps with
+	hashing the previous ones. At most ``2 * workers`` pieces are held in memory at a time.
+	``None`` pieces are passed through.
+	"""
+	if workers is None:
+		workers = os.cpu_count() or 1
+
+	with ThreadPoolExecutor(workers) as pool:
+		window: deque[Future[bytes] | None] = deque()
+		for piece in pieces:
+			window.append(None if piece is None else pool.submit(_sha1, piece))
+			if len(window) >= 2 * workers:
+				future = window.popleft()
+				yield None if future is None else future.result()
+
+		while window:
+			future = window.popleft()
+			yield None if future is None else future.result()
+
+
+def _sha1(piece: Buffer) -> bytes:
+	return hashlib.sha1(piece).digest()
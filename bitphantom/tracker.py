@@ -0,0 +1,455 @@
+"""Announcing to and scraping HTTP trackers with asyncio.
+
+A :class:`TrackerClient` keeps idle HTTP/1.1 connections open per tracker host and reuses them
+for later requests, so announcing many torrents to the same few trackers costs one request
+per torrent rather than one TCP (and TLS) handshake. At most ``max_concurrency`` requests are
+in flight at a time, however many torrents are announced at once.
+
+Announces follow the tiers of BEP 12: the trackers of the first tier are tried in order,
+then those of the next tier and so on, and a tracker that answers is moved to the front of
+its tier. :func:`shuffle_tiers` prepares a torrent's tiers, as the BEP asks, before its first
+announce. Peers are requested in the compact form of BEP 23 (and BEP 7 for IPv6), which
+trackers may ignore, so both forms are read. UDP trackers are not supported and count as
+failed trackers.
+"""
+
+import asyncio
+import random
+import socket
+import urllib.parse
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any, NamedTuple, TypeAlias
+
+from . import __version__, bencode
+from .bencode import Bencode
+from .meta_info import InfoHash, TrackerTier
+
+MAX_CONCURRENCY: int = 512
+MAX_CONNECTIONS_PER_HOST: int = 16
+TIMEOUT: float = 30.0
+MAX_RESPONSE_SIZE: int = 2**20
+NUMWANT: int = 50
+USER_AGENT: bytes = b"bitphantom/" + __version__.encode()
+
+DEFAULT_PORTS: dict[bytes, int] = {b"http": 80, b"https": 443}
+
+Url: TypeAlias = urllib.parse.ParseResultBytes
+Origin: TypeAlias = tuple[bytes, str, int]
+
+
+class Peer(NamedTuple):
+	ip: str
+	port: int
+
+
+class AnnounceRequest(NamedTuple):
+	info_hash: InfoHash
+	peer_id: bytes
+	port: int
+	uploaded: int = 0
+	downloaded: int = 0
+	left: int = 0
+	event: str | None = None
+	numwant: int = NUMWANT
+
+
+@bencode.schema
+class AnnounceSchema:
+	failure_reason: bytes | None = bencode.field("failure reason", default=None)
+	warning_message: bytes | None = bencode.field("warning message", default=None)
+	interval: int | None = None
+	min_interval: int | None = bencode.field("min interval", default=None)
+	tracker_id: bytes | None = bencode.field("tracker id", default=None)
+	complete: int | None = None
+	incomplete: int | None = None
+	peers: Bencode | None = None
+	peers6: bytes | None = None
+
+
+@bencode.schema
+class ScrapeSchema:
+	complete: int = 0
+	downloaded: int = 0
+	incomplete: int = 0
+
+
+@dataclass
+class AnnounceResponse:
+	tracker: bytes
+	interval: int
+	min_interval: int | None
+	complete: int | None
+	incomplete: int | None
+	peers: list[Peer]
+	warning: str | None = None
+	tracker_id: bytes | None = None
+
+
+def shuffle_tiers(trackers: TrackerTier) -> TrackerTier:
+	"""Returns a copy of ``trackers`` with the trackers of every tier in random order."""
+	tiers = [list(tier) for tier in trackers]
+	for tier in tiers:
+		random.shuffle(tier)
+	return tiers
+
+
+def parse_compact_peers(peers: bytes) -> list[Peer]:
+	"""Reads the 6 byte ip and port entries of a compact ``peers`` string."""
+	if len(peers) % 6:
+		raise ValueError("compact peers are not a multiple of 6 bytes")
+	return [
+		Peer(socket.inet_ntoa(peers[i : i + 4]), int.from_bytes(peers[i + 4 : i + 6], "big"))
+		for i in range(0, len(peers), 6)
+	]
+
+
+def parse_compact_peers6(peers: bytes) -> list[Peer]:
+	"""Reads the 18 byte ip and port entries of a compact ``peers6`` string."""
+	if len(peers) % 18:
+		raise ValueError("compact peers6 are not a multiple of 18 bytes")
+	return [
+		Peer(socket.inet_ntop(socket.AF_INET6, peers[i : i + 16]), int.from_bytes(peers[i + 16 : i + 18], "big"))
+		for i in range(0, len(peers), 18)
+	]
+
+
+def parse_peers(peers: Any) -> list[Peer]:
+	"""Reads the ``peers`` entry of an announce response, either compact or a list of dictionaries."""
+	if peers is None:
+		return []
+	if isinstance(peers, bytes):
+		return parse_compact_peers(peers)
+	if not isinstance(peers, list):
+		raise ValueError("invalid peers type")
+
+	res = []
+	for peer in peers:
+		if not isinstance(peer, dict):
+			raise ValueError("invalid peer type")
+		ip, port = peer.get("ip"), peer.get("port")
+		if not isinstance(ip, bytes) or not isinstance(port, int):
+			raise ValueError("invalid peer entries")
+		res.append(Peer(ip.decode("utf-8", "replace"), port))
+	return res
+
+
+def parse_announce(tracker: bytes, body: bytes) -> AnnounceResponse:
+	"""Reads the bencoded announce response of ``tracker``."""
+	raw, _ = bencode.unmarshal(AnnounceSchema, body)
+	if raw.failure_reason is not None:
+		raise ValueError("tracker failure: " + raw.failure_reason.decode("utf-8", "replace"))
+	if raw.interval is None:
+		raise ValueError("missing interval entry")
+
+	peers = parse_peers(raw.peers)
+	if raw.peers6 is not None:
+		peers += parse_compact_peers6(raw.peers6)
+	warning = None if raw.warning_message is None else raw.warning_message.decode("utf-8", "replace")
+	return AnnounceResponse(
+		tracker, raw.interval, raw.min_interval, raw.complete, raw.incomplete, peers, warning, raw.tracker_id
+	)
+
+
+def parse_scrape(body: bytes, info_hashes: Iterable[InfoHash]) -> dict[InfoHash, ScrapeSchema]:
+	"""Reads the entries of ``info_hashes`` out of a bencoded scrape response.
+
+	The ``files`` dictionary is keyed by raw info hashes, which are not utf8, so the entries are
+	looked up by their bytes instead of decoding the dictionary. Missing torrents are left out.
+	"""
+	failure = bencode.query(body, "failure reason")
+	if isinstance(failure, bytes):
+		raise ValueError("tracker failure: " + failure.decode("utf-8", "replace"))
+
+	res = {}
+	for info_hash in info_hashes:
+		span = bencode.query_span(body, ("files", info_hash))
+		if span is not None:
+			res[info_hash], _ = bencode.unmarshal(ScrapeSchema, body, span[0])
+	return res
+
+
+def announce_query(request: AnnounceRequest, tracker_id: bytes | None = None) -> bytes:
+	quote = urllib.parse.quote_from_bytes
+	query = b"info_hash=%s&peer_id=%s&port=%d&uploaded=%d&downloaded=%d&left=%d&compact=1&numwant=%d" % (
+		quote(request.info_hash, safe="").encode(),
+		quote(request.peer_id, safe="").encode(),
+		request.port,
+		request.uploaded,
+		request.downloaded,
+		request.left,
+		request.numwant,
+	)
+	if request.event:
+		query += b"&event=" + request.event.encode()
+	if tracker_id is not None:
+		query += b"&trackerid=" + quote(tracker_id, safe="").encode()
+	return query
+
+
+def scrape_query(info_hashes: Iterable[InfoHash]) -> bytes:
+	return b"&".join(b"info_hash=" + urllib.parse.quote_from_bytes(h, safe="").encode() for h in info_hashes)
+
+
+def scrape_url(url: Url) -> Url | None:
+	"""Derives the scrape url of an announce url, or returns ``None`` if the tracker cannot scrape.
+
+	As BEP 48 specifies, only urls whose last path component starts with ``announce`` can.
+	"""
+	head, sep, last = url.path.rpartition(b"/")
+	if not last.startswith(b"announce"):
+		return None
+	return url._replace(path=head + sep + b"scrape" + last[len(b"announce") :])
+
+
+def url_origin(url: Url) -> Origin:
+	"""Returns the ``(scheme, host, port)`` that requests to ``url`` are sent to."""
+	scheme = url.scheme.lower()
+	if scheme not in DEFAULT_PORTS:
+		raise ValueError(f"unsupported tracker scheme {scheme.decode('ascii', 'replace')}")
+	if not url.hostname:
+		raise ValueError("tracker url without a host")
+	return scheme, url.hostname.decode("idna"), url.port or DEFAULT_PORTS[scheme]
+
+
+class Connection(NamedTuple):
+	reader: asyncio.StreamReader
+	writer: asyncio.StreamWriter
+
+	def close(self):
+		self.writer.close()
+
+
+class ConnectionPool:
+	"""Keep-alive connections, at most ``max_per_host`` open to an origin at a time.
+
+	A connection is either lent out by :meth:`acquire` or idle in the pool, and once an origin's
+	limit is reached :meth:`acquire` waits for one to be released, so many concurrent requests
+	to a tracker share a few busy connections instead of each opening its own. ``opened`` and
+	``reused`` count the connections handed out.
+	"""
+
+	def __init__(self, max_per_host: int = MAX_CONNECTIONS_PER_HOST):
+		self.max_per_host = max_per_host
+		self.opened = 0
+		self.reused = 0
+		self._idle: dict[Origin, list[Connection]] = {}
+		self._slots: dict[Origin, asyncio.Semaphore] = {}
+
+	async def acquire(self, origin: Origin, timeout: float | None = None) -> tuple[Connection, bool]:
+		"""Returns a connection to ``origin`` and whether it was reused, opening one if none is idle.
+
+		``timeout`` bounds the time to connect, not the wait for a free slot.
+		"""
+		slots = self._slots.get(origin)
+		if slots is None:
+			slots = self._slots[origin] = asyncio.Semaphore(self.max_per_host)
+		await slots.acquire()
+		try:
+			idle = self._idle.get(origin)
+			while idle:
+				conn = idle.pop()
+				if conn.writer.is_closing() or conn.reader.at_eof():
+					conn.close()
+					continue
+				self.reused += 1
+				return conn, True
+
+			scheme, host, port = origin
+			connecting = asyncio.open_connection(host, port, ssl=scheme == b"https")
+			reader, writer = await asyncio.wait_for(connecting, timeout)
+			self.opened += 1
+			return Connection(reader, writer), False
+		except BaseException:
+			slots.release()
+			raise
+
+	def release(self, origin: Origin, conn: Connection, keep_alive: bool):
+		"""Returns a connection given by :meth:`acquire`, keeping it idle if ``keep_alive`` is set."""
+		if keep_alive and not conn.writer.is_closing():
+			self._idle.setdefault(origin, []).append(conn)
+		else:
+			conn.close()
+		self._slots[origin].release()
+
+	def close(self):
+		for idle in self._idle.values():
+			for conn in idle:
+				conn.close()
+		self._idle.clear()
+
+
+class HttpResponse(NamedTuple):
+	status: int
+	body: bytes
+	keep_alive: bool
+
+
+async def http_get(conn: Connection, host: bytes, target: bytes, max_size: int = MAX_RESPONSE_SIZE) -> HttpResponse:
+	"""Sends a GET of ``target`` over ``conn`` and reads the whole response.
+
+	The body may be delimited by a content length, chunked or end with the connection, in which
+	case the connection cannot be kept alive.
+	"""
+	reader, writer = conn
+	writer.write(
+		b"GET %s HTTP/1.1\r\nHost: %s\r\nUser-Agent: %s\r\nAccept-Encoding: identity\r\nConnection: keep-alive\r\n\r\n"
+		% (target, host, USER_AGENT)
+	)
+	await writer.drain()
+
+	status_line = await _read_line(reader)
+	version, _, rest = status_line.partition(b" ")
+	if not version.startswith(b"HTTP/1.") or not rest[:3].isdigit():
+		raise ValueError("invalid http status line")
+	status = int(rest[:3])
+
+	headers = {}
+	while True:
+		line = await _read_line(reader)
+		if line == b"\r\n":
+			break
+		name, sep, value = line.partition(b":")
+		if not sep:
+			raise ValueError("invalid http header")
+		headers[name.strip().lower()] = value.strip().lower()
+
+	connection = headers.get(b"connection", b"keep-alive" if version == b"HTTP/1.1" else b"close")
+	keep_alive = connection == b"keep-alive"
+
+	if headers.get(b"transfer-encoding", b"identity") == b"chunked":
+		chunks = []
+		size = 0
+		while True:
+			chunk_size = int((await _read_line(reader)).partition(b";")[0], 16)
+			if chunk_size == 0:
+				break
+			size += chunk_size
+			if size > max_size:
+				raise ValueError("http response exceeds %d bytes" % max_size)
+			chunks.append((await reader.readexactly(chunk_size + 2))[:-2])
+		while await _read_line(reader) != b"\r\n":  # trailers
+			pass
+		body = b"".join(chunks)
+	elif b"content-length" in headers:
+		length = int(headers[b"content-length"])
+		if length > max_size:
+			raise ValueError("http response exceeds %d bytes" % max_size)
+		body = await reader.readexactly(length)
+	else:
+		body = await reader.read(max_size + 1)
+		while len(body) <= max_size and not reader.at_eof():
+			body += await reader.read(max_size + 1 - len(body))
+		if len(body) > max_size:
+			raise ValueError("http response exceeds %d bytes" % max_size)
+		keep_alive = False
+
+	return HttpResponse(status, body, keep_alive)
+
+
+async def _read_line(reader: asyncio.StreamReader) -> bytes:
+	"""Reads a CRLF terminated line, which must fit in the reader's buffer limit."""
+	try:
+		return await reader.readuntil(b"\r\n")
+	except asyncio.LimitOverrunError as err:
+		raise ValueError("http line exceeds the buffer limit") from err
+
+
+class TrackerClient:
+	"""Announces to and scrapes HTTP trackers over a shared pool of keep-alive connections.
+
+	At most ``max_concurrency`` requests are in flight at once, over at most ``max_per_host``
+	connections per tracker. Connecting and each exchange get ``timeout`` seconds, not counting
+	the time spent waiting for a turn. Close the client, or use it as an async context manager,
+	to close its idle connections.
+	"""
+
+	def __init__(
+		self,
+		max_concurrency: int = MAX_CONCURRENCY,
+		max_per_host: int = MAX_CONNECTIONS_PER_HOST,
+		timeout: float = TIMEOUT,
+	):
+		self.pool = ConnectionPool(max_per_host)
+		self.timeout = timeout
+		self._semaphore = asyncio.Semaphore(max_concurrency)
+		self._tracker_ids: dict[bytes, bytes] = {}
+
+	async def __aenter__(self) -> "TrackerClient":
+		return self
+
+	async def __aexit__(self, *_):
+		self.close()
+
+	def close(self):
+		self.pool.close()
+
+	async def get(self, url: Url, query: bytes) -> bytes:
+		"""Returns the body of a GET of ``url`` with ``query`` appended to its own query."""
+		origin = url_origin(url)
+		target = (url.path or b"/") + b"?" + (url.query + b"&" + query if url.query else query)
+		host = url.netloc.rpartition(b"@")[2]
+
+		async with self._semaphore:
+			response = await self._exchange(origin, host, target)
+		if response.status != 200:
+			raise ValueError("tracker responded with http status %d" % response.status)
+		return response.body
+
+	async def _exchange(self, origin: Origin, host: bytes, target: bytes) -> HttpResponse:
+		while True:
+			conn, reused = await self.pool.acquire(origin, self.timeout)
+			keep_alive = False
+			try:
+				response = await asyncio.wait_for(http_get(conn, host, target), self.timeout)
+				keep_alive = response.keep_alive
+			except (ConnectionError, asyncio.IncompleteReadError):
+				if reused:  # the tracker closed the idle connection, retry on a new one
+					continue
+				raise
+			finally:
+				self.pool.release(origin, conn, keep_alive)
+			return response
+
+	async def announce_to(self, url: Url, request: AnnounceRequest) -> AnnounceResponse:
+		"""Announces to the single tracker at ``url``."""
+		tracker = url.geturl()
+		body = await self.get(url, announce_query(request, self._tracker_ids.get(tracker)))
+		response = parse_announce(tracker, body)
+		if response.tracker_id is not None:
+			self._tracker_ids[tracker] = response.tracker_id
+		return response
+
+	async def announce(self, tiers: TrackerTier, request: AnnounceRequest) -> AnnounceResponse:
+		"""Announces to the first tracker of ``tiers`` that answers, in BEP 12 order.
+
+		The tracker that answered is moved to the front of its tier in place, so the same
+		``tiers`` should be given to every announce of a torrent.
+		"""
+		errors = []
+		for tier in tiers:
+			for i, url in enumerate(tier):
+				try:
+					response = await self.announce_to(url, request)
+				except (OSError, EOFError, ValueError, asyncio.TimeoutError) as e:
+					errors.append("%s: %s" % (url.geturl().decode("utf-8", "replace"), str(e) or type(e).__name__))
+					continue
+				tier.insert(0, tier.pop(i))
+				return response
+		raise ConnectionError("no tracker answered the announce\n" + "\n".join(errors))
+
+	async def announce_many(
+		self,
+		torrents: Iterable[tuple[TrackerTier, AnnounceRequest]],
+	) -> list[AnnounceResponse | BaseException]:
+		"""Announces all ``torrents`` concurrently, returning a response or an error for each."""
+		announces = (self.announce(tiers, request) for tiers, request in torrents)
+		return await asyncio.gather(*announces, return_exceptions=True)
+
+	async def scrape(self, url: Url, info_hashes: Sequence[InfoHash]) -> dict[InfoHash, ScrapeSchema]:
+		"""Scrapes the tracker at announce ``url`` for the given torrents."""
+		target = scrape_url(url)
+		if target is None:
+			raise ValueError("tracker does not support scraping")
+		body = await self.get(target, scrape_query(info_hashes))
+		return parse_scrape(body, info_hashes)
@@ -0,0 +1,52 @@
+"""Rechecking a torrent's content on disk against its metainfo."""
+
+import pathlib
+from collections.abc import Callable, Iterable, Sequence
+from typing import TypeAlias
+
+from .bitfield import Bitfield
+from .meta_info import LazyMetaInfo, MetaInfo
+from .span_index import SpanIndex
+from .storage import content_files, hash_pieces, piece_count, read_pieces, read_selected_pieces
+
+Progress: TypeAlias = Callable[[int, int], object]
+
+
+def verify(
+	metainfo: MetaInfo | LazyMetaInfo,
+	root_dir: str | pathlib.Path,
+	workers: int | None = None,
+	progress: Progress | None = None,
+	pieces: Iterable[int] | None = None,
+) -> Bitfield:
+	"""Hashes the content of ``metainfo`` found under ``root_dir`` and returns the good pieces.
+
+	Files are read sequentially and their pieces hashed on ``workers`` threads (defaults to the
+	CPU count). Missing or truncated files only fail the pieces they cover. ``progress`` is
+	called with the number of checked pieces and the total after every piece.
+
+	If ``pieces`` is given, only those pieces are read and checked, and all others are left
+	unset in the returned bitfield.
+	"""
+	files = content_files(metainfo, root_dir)
+	table = metainfo.piece_table
+	if piece_count(files, metainfo.piece_length) != len(table):
+		raise ValueError("pieces entry does not match the content size")
+
+	if pieces is None:
+		selected: Sequence[int] = range(len(table))
+		data = read_pieces(files, metainfo.piece_length)
+	else:
+		selected = sorted(set(pieces))
+		index = SpanIndex((size for _, size in files), metainfo.piece_length)
+		data = read_selected_pieces(files, index, selected)
+
+	bitfield = Bitfield(len(table))
+	total = len(selected)
+	for done, (i, digest) in enumerate(zip(selected, hash_pieces(data, workers)), 1):
+		if digest is not None and table[i] == digest:
+			bitfield[i] = True
+		if progress is not None:
+			progress(done, total)
+
+	return bitfield
@@ -13,7 +13,8 @@ setuptools.setup(
 	description=__description__,
 	long_description=long_description,
 	long_description_content_type="text/x-rst",
-	packages=["bitphantom"],
+	packages=["bitphantom", "bitphantom.bencode", "bitphantom.benchmarks"],
+	package_data={"bitphantom.benchmarks": ["baseline.json"]},
 	python_requires=">=3.10",
 	include_package_data=True,
 	install_requires=[],
@@ -21,7 +22,9 @@ setuptools.setup(
 	entry_points={
 		"console_scripts": [
 			"bencode2json = bitphantom.bencode2json:main",
+			"json2bencode = bitphantom.json2bencode:main",
 			"display_metainfo = bitphantom.display_metainfo:main",
+			"make_torrent = bitphantom.make_torrent:main",
 		]
 	},
 )
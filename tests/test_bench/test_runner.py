@@ -0,0 +1,37 @@
+from bitphantom.bench import REGISTRY, benchmark, compare, load_suite, run
+from tests import assert_equal, assert_in, assert_not_in, find_tests
+
+
+def test_if_run_times_the_selected_benchmarks():
+	@benchmark("test.sum", sizes=("10KB",))
+	def bench_sum(size: int):
+		data = bytes(size)
+		return lambda: sum(data)
+
+	try:
+		results = run(selected="test.sum", rounds=1)
+	finally:
+		del REGISTRY["test.sum"]
+	assert_equal(list(results["results"]), ["test.sum/10KB"])
+	assert_in("python", results)
+	assert_not_in("test.sum", REGISTRY)
+
+
+def test_if_the_default_suite_is_importable():
+	load_suite()
+	assert_in("decode.torrent", REGISTRY)
+	assert_in("loads_metainfo.torrent", REGISTRY)
+
+
+def test_if_compare_reports_slowdowns_beyond_the_threshold():
+	baseline = {"results": {"a/1MB": {"seconds": 1.0}, "b/1MB": {"seconds": 1.0}}}
+	results = {"results": {"a/1MB": {"seconds": 1.05}, "b/1MB": {"seconds": 1.5}, "c/1MB": {"seconds": 9.0}}}
+	regressions = compare(results, baseline, 0.1)
+	assert_equal(len(regressions), 1)
+	assert_in("b/1MB", regressions[0])
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
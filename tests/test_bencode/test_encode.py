@@ -0,0 +1,47 @@
+import collections
+
+from bitphantom.bencode import encode, iter_encode
+from bitphantom.bencode.encode import KEY_CACHE_SIZE
+from tests import assert_equal, assert_raises, find_tests
+
+
+def test_if_booleans_encode_as_integers():
+	assert_equal(encode([True, False]), b"li1ei0ee")
+
+
+def test_if_subclasses_encode_like_their_base():
+	ordered = collections.OrderedDict([("b", 1), ("a", bytearray(b"x"))])
+	assert_equal(encode(ordered), b"d1:a1:x1:bi1ee")
+
+
+def test_if_dictionary_keys_sort_by_their_utf8_bytes():
+	assert_equal(encode({"é": 1, "z": 2, "a": 3}), "d1:ai3e1:zi2e2:éi1ee".encode())
+
+
+def test_if_bytes_keys_encode_like_str_keys():
+	assert_equal(encode({b"b": 1, b"a": [b"x"]}), b"d1:al1:xe1:bi1ee")
+	assert_equal(encode({b"a": 1}), encode({"a": 1}))
+
+
+def test_if_keys_encode_alike_once_the_key_cache_is_full():
+	keys = ["key%d" % i for i in range(2 * KEY_CACHE_SIZE)]
+	first = [encode({key: 1}) for key in keys]
+	assert_equal([encode({key: 1}) for key in keys], first)
+	assert_equal(first[-1], b"d%d:%si1ee" % (len(keys[-1]), keys[-1].encode()))
+
+
+def test_if_chunked_encoding_matches_whole_encoding():
+	value = collections.OrderedDict([("b", [True, bytearray(b"x" * 100)]), ("a", {b"k": "v" * 50})])
+	assert_equal(b"".join(iter_encode(value, chunk_size=16)), encode(value))
+	assert_raises(TypeError, lambda: list(iter_encode([1.5])))
+
+
+def test_if_unsupported_types_are_rejected():
+	assert_raises(TypeError, encode, {"a": 1.5})
+	assert_raises(TypeError, encode, [None])
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
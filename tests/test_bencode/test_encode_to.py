@@ -0,0 +1,41 @@
+import io
+
+from bitphantom.bencode import encode, encode_to, iter_encode
+from tests import assert_equal, assert_is_instance, find_tests, generate_obj
+
+MIN_DEPTH: int = 1
+MAX_DEPTH: int = 3  # NOTE: beware of the exponential growth
+
+
+def test_if_streamed_encoding_matches_encode():
+	iterations = 100
+	for _ in range(iterations):
+		obj = generate_obj(MIN_DEPTH, MAX_DEPTH)
+		out = io.BytesIO()
+		written = encode_to(obj, out, chunk_size=64)
+		assert_equal(out.getvalue(), encode(obj))
+		assert_equal(written, len(out.getvalue()))
+
+
+def test_if_large_bytestrings_are_passed_through_as_views():
+	pieces = bytes(1024)
+	chunks = list(iter_encode({"pieces": pieces}, chunk_size=256))
+	views = [chunk for chunk in chunks if isinstance(chunk, memoryview)]
+	assert_equal(len(views), 1)
+	assert_is_instance(views[0].obj, bytes)
+	assert_equal(b"".join(chunks), encode({"pieces": pieces}))
+
+
+def test_if_encode_appends_to_the_given_buffer():
+	buf = bytearray(b"prefix")
+	assert_equal(encode([1, b"a"], buf), b"prefixli1e1:ae")
+
+
+def test_if_non_ascii_strings_are_encoded_with_their_byte_length():
+	assert_equal(encode("é"), b"2:\xc3\xa9")
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
@@ -0,0 +1,55 @@
+from bitphantom.bencode import decode, encode, scan
+from bitphantom.bencode.index import BYTESTRING, DICTIONARY
+from tests import assert_equal, assert_is_none, assert_raises, find_tests, generate_dictionary, generate_obj
+
+MISMATCH_DECODE: str = "produced different object than the original"
+
+MIN_DEPTH: int = 1
+MAX_DEPTH: int = 3  # NOTE: beware of the exponential growth
+
+
+def test_if_decoding_from_the_index_matches_decode():
+	iterations = 100
+	for _ in range(iterations):
+		obj = generate_obj(MIN_DEPTH, MAX_DEPTH)
+		bencode = encode(obj)
+		index = scan(bencode)
+		assert_equal(index.decode(), obj, MISMATCH_DECODE)
+		assert_equal(index.end, len(bencode))
+
+
+def test_if_every_token_span_decodes_to_the_same_value():
+	obj = generate_obj(MAX_DEPTH, MAX_DEPTH)
+	bencode = encode(obj)
+	index = scan(bencode)
+	for token in range(len(index)):
+		start, end = index.span(token)
+		assert_equal(decode(bencode, start), (index.decode(token), end))
+
+
+def test_if_keys_are_looked_up_without_decoding_the_dictionary():
+	obj = generate_dictionary(MAX_DEPTH)
+	index = scan(encode(obj))
+	assert_equal(index.kinds[0], DICTIONARY)
+	for key, value in obj.items():
+		token = index.get(key)
+		assert_equal(index.decode(token), value)
+	assert_is_none(index.get("\0missing"))
+
+
+def test_if_children_skip_over_nested_values():
+	index = scan(b"l3:abcld1:xleeei7ee")
+	children = list(index.children())
+	assert_equal([index.decode(child) for child in children], [b"abc", [{"x": []}], 7])
+	assert_equal(index.kinds[children[0]], BYTESTRING)
+
+
+def test_if_malformed_input_is_rejected():
+	for bencode in (b"", b"l", b"d1:ae", b"di1ei2ee", b"i12", b"5:abc", b"d1:\xffi0ee", b"x"):
+		assert_raises(ValueError, scan, bencode)
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
@@ -0,0 +1,51 @@
+from bitphantom import bencode
+from bitphantom.bencode import instrument
+from bitphantom.meta_info import loads_metainfo
+from tests import assert_equal, assert_greater, assert_in, assert_is_none, find_tests
+from tests.test_meta_info import generate_torrent
+
+
+def test_if_decoding_counts_values_and_depth():
+	buf = b"d3:cowl3:mooi4ed1:xi1eeee"
+	with bencode.collect_stats() as stats:
+		bencode.decode(buf)
+		bencode.encode([1, b"a"])
+	assert_equal(stats.bytes_decoded, len(buf))
+	assert_equal(stats.bytes_encoded, len(b"li1e1:ae"))
+	assert_equal(stats.max_depth, 3)
+	assert_equal(dict(stats.values), {"dictionary": 2, "list": 1, "bytestring": 3, "integer": 2})
+	assert_is_none(instrument.active)
+
+
+def test_if_loading_metainfo_records_its_phases():
+	source = generate_torrent()
+	with bencode.collect_stats() as stats:
+		loads_metainfo(source)
+	assert_equal(stats.bytes_decoded, len(source))
+	for name in ("decode", "validate", "hash"):
+		assert_in(name, stats.phases)
+		assert_greater(stats.phases[name], 0.0)
+
+
+def test_if_loading_metainfo_counts_values_like_decoding():
+	source = generate_torrent()
+	with bencode.collect_stats() as loaded:
+		loads_metainfo(source)
+	with bencode.collect_stats() as decoded:
+		bencode.decode(source)
+	assert_equal(loaded.values, decoded.values)
+	assert_equal(loaded.max_depth, decoded.max_depth)
+	assert_in("max depth: %d" % decoded.max_depth, str(loaded).splitlines())
+
+
+def test_if_nothing_is_recorded_outside_of_a_block():
+	with bencode.collect_stats() as stats:
+		pass
+	bencode.decode(b"li1ee")
+	assert_equal(stats.bytes_decoded, 0)
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
@@ -0,0 +1,55 @@
+import copy
+import io
+import json
+import random
+
+from bitphantom.bencode import encode
+from bitphantom.bencode2json import BYTES_POLICIES, handle_bytes, stream_json
+from tests import assert_equal, assert_not_in, assert_raises, find_tests, generate_obj
+from tests.test_bencode.test_stream import split_randomly
+
+MIN_DEPTH: int = 1
+MAX_DEPTH: int = 3
+
+
+def test_if_streaming_matches_the_whole_tree_translation():
+	iterations = 50
+	for _ in range(iterations):
+		obj = generate_obj(MIN_DEPTH, MAX_DEPTH)
+		policy = random.choice(tuple(BYTES_POLICIES))
+		out = io.StringIO()
+		stream_json(split_randomly(encode(obj)), out, policy)
+		assert_equal(json.loads(out.getvalue()), handle_bytes(copy.deepcopy(obj), policy))
+
+
+def test_if_bytestrings_split_across_chunks_translate_whole():
+	values = [random.randbytes(random.randint(1, 64)) for _ in range(20)] + ["é€😀".encode() * 5, b"\xff" * 9]
+	bencode = encode({"info": {"name": b"x", "values": values}, "top": values[-2]}) + encode(values[-1])
+	for policy in BYTES_POLICIES:
+		for size in (1, 2, 7):
+			out = io.StringIO()
+			stream_json([bencode[i : i + size] for i in range(0, len(bencode), size)], out, policy, {"name"})
+			expected = handle_bytes({"info": {"values": list(values)}, "top": values[-2]}, policy)
+			first, second = out.getvalue().splitlines()
+			assert_equal(json.loads(first), expected)
+			assert_equal(json.loads(second), BYTES_POLICIES[policy](values[-1]))
+
+
+def test_if_skipped_keys_are_dropped_at_any_depth():
+	obj = {"info": {"name": b"x", "pieces": [b"a", {"pieces": 1}], "length": 3}, "pieces": b"b"}
+	out = io.StringIO()
+	stream_json([encode(obj)], out, "hex", {"pieces"})
+	result = json.loads(out.getvalue())
+	assert_equal(result, {"info": {"name": "78", "length": 3}})
+	assert_equal(result, handle_bytes(obj, "hex", {"pieces"}))
+	assert_not_in("pieces", out.getvalue())
+
+
+def test_if_truncated_input_is_an_error():
+	assert_raises(ValueError, stream_json, [b"d3:keyl"], io.StringIO())
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
@@ -0,0 +1,107 @@
+import contextlib
+import copy
+import io
+import pathlib
+import random
+import tempfile
+
+from bitphantom.bencode import encode
+from bitphantom.bencode2json import handle_bytes, stream_json
+from bitphantom.json2bencode import convert, json_to_bencode, main
+from tests import assert_equal, assert_false, assert_in, assert_raises, assert_true, find_tests, generate_obj
+
+MIN_DEPTH: int = 1
+MAX_DEPTH: int = 3
+
+
+def test_if_json_round_trips_to_the_original_bencode():
+	iterations = 50
+	for _ in range(iterations):
+		objs = [generate_obj(MIN_DEPTH, MAX_DEPTH) for _ in range(random.randint(1, 3))]
+		policy = random.choice(("hex", "base64"))
+		text = io.StringIO()
+		stream_json([b"".join(encode(obj) for obj in objs)], text, policy)
+		out = io.BytesIO()
+		convert(text.getvalue(), out, policy)
+		assert_equal(out.getvalue(), b"".join(encode(obj) for obj in objs))
+
+
+def test_if_utf8_escape_inverts_backslash_replace():
+	obj = [b"plain", "café".encode(), b"\xff\xfe\x00 tail"]
+	assert_equal(json_to_bencode(handle_bytes(copy.deepcopy(obj))), obj)
+
+
+def test_if_literal_backslashes_round_trip():
+	obj = {"path": [b"C:\\dir\\x", b"\\xff", b"\\\xff\\", b"\\\\xab"]}
+	assert_equal(handle_bytes(copy.deepcopy(obj))["path"][1], "\\\\xff")
+	assert_equal(json_to_bencode(handle_bytes(copy.deepcopy(obj))), obj)
+
+	text = io.StringIO()
+	stream_json([encode(obj)[i : i + 3] for i in range(0, len(encode(obj)), 3)], text)
+	out = io.BytesIO()
+	convert(text.getvalue(), out)
+	assert_equal(out.getvalue(), encode(obj))
+
+
+def test_if_values_without_bencode_form_are_rejected():
+	assert_equal(json_to_bencode({"private": True}), {"private": 1})
+	assert_raises(ValueError, json_to_bencode, [1.5])
+	assert_raises(ValueError, json_to_bencode, {"a": None})
+	assert_raises(ValueError, json_to_bencode, "zz", "hex")
+
+
+def run_batch(*paths: pathlib.Path) -> tuple[int, str]:
+	stderr = io.StringIO()
+	with contextlib.redirect_stderr(stderr):
+		code = main(["--batch", *map(str, paths)])
+	return code, stderr.getvalue()
+
+
+def test_if_batch_converts_every_file_to_its_sibling():
+	with tempfile.TemporaryDirectory() as directory:
+		a = pathlib.Path(directory, "a.torrent.json")
+		b = pathlib.Path(directory, "b")
+		a.write_text('{"a": 1}', encoding="utf-8")
+		b.write_text('["x"]', encoding="utf-8")
+
+		assert_equal(run_batch(a, b), (0, ""))
+		assert_equal(pathlib.Path(directory, "a.torrent").read_bytes(), b"d1:ai1ee")
+		assert_equal(pathlib.Path(directory, "b.torrent").read_bytes(), b"l1:xe")
+
+
+def test_if_batch_skips_invalid_files():
+	with tempfile.TemporaryDirectory() as directory:
+		good = pathlib.Path(directory, "good.json")
+		bad = pathlib.Path(directory, "bad.json")
+		good.write_text("[1]", encoding="utf-8")
+		bad.write_text("[1.5]", encoding="utf-8")
+
+		code, stderr = run_batch(bad, good)
+		assert_equal(code, 1)
+		assert_true(stderr.startswith(str(bad)))
+		assert_false(pathlib.Path(directory, "bad").exists())
+		assert_equal(pathlib.Path(directory, "good").read_bytes(), b"li1ee")
+
+
+def test_if_batch_never_overwrites_an_input():
+	with tempfile.TemporaryDirectory() as directory:
+		json_input = pathlib.Path(directory, "x.torrent.json")
+		other_input = pathlib.Path(directory, "x.torrent")
+		json_input.write_text('{"b": 2}', encoding="utf-8")
+		other_input.write_text('{"c": 3}', encoding="utf-8")
+
+		code, stderr = run_batch(json_input, other_input)
+		assert_equal(code, 1)
+		assert_in("would overwrite an input", stderr)
+		assert_equal(other_input.read_text(encoding="utf-8"), '{"c": 3}')
+		assert_equal(pathlib.Path(directory, "x.torrent.torrent").read_bytes(), b"d1:ci3ee")
+
+		code, stderr = run_batch(other_input, "--suffix", "")
+		assert_equal(code, 1)
+		assert_equal(other_input.read_text(encoding="utf-8"), '{"c": 3}')
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
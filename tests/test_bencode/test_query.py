@@ -0,0 +1,78 @@
+import random
+
+from bitphantom.bencode import decode, encode, query, query_bytes, query_span, scan, skip
+from tests import assert_equal, assert_is_none, assert_raises, find_tests, generate_dictionary, generate_obj
+
+MIN_DEPTH: int = 1
+MAX_DEPTH: int = 3  # NOTE: beware of the exponential growth
+
+
+def random_path(obj) -> tuple[list, object]:
+	path = []
+	while isinstance(obj, (list, dict)) and obj and random.random() < 0.8:
+		if isinstance(obj, list):
+			i = random.randrange(len(obj))
+			path.append(i)
+			obj = obj[i]
+		else:
+			key = random.choice(list(obj))
+			path.append(key)
+			obj = obj[key]
+	return path, obj
+
+
+def test_if_skipping_ends_where_decoding_ends():
+	iterations = 100
+	for _ in range(iterations):
+		bencode = encode(generate_obj(MIN_DEPTH, MAX_DEPTH))
+		assert_equal(skip(bencode), decode(bencode)[1])
+
+
+def test_if_querying_a_path_returns_the_nested_value():
+	iterations = 100
+	for _ in range(iterations):
+		obj = generate_dictionary(MAX_DEPTH)
+		bencode = encode(obj)
+		path, expected = random_path(obj)
+		assert_equal(query(bencode, path), expected)
+		start, end = query_span(bencode, path)
+		assert_equal(bencode[start:end], encode(expected))
+
+
+def test_if_querying_a_missing_path_returns_none():
+	bencode = encode({"info": {"name": b"foo", "files": [{"length": 3}]}})
+	assert_is_none(query(bencode, ("info", "length")))
+	assert_is_none(query(bencode, ("info", "files", 1)))
+	assert_is_none(query(bencode, ("info", "name", "x")))
+	assert_equal(query(bencode, ("info", "files", 0, "length")), 3)
+
+
+def test_if_indexed_queries_match_scanning_ones():
+	iterations = 100
+	for _ in range(iterations):
+		obj = generate_dictionary(MAX_DEPTH)
+		bencode = encode(obj)
+		index = scan(bencode)
+		path, expected = random_path(obj)
+		span = query_span(bencode, path)
+		assert_equal(query_span(bencode, path, index=index), span)
+		assert_equal(query(bencode, path, index=index), expected)
+		assert_equal(skip(bencode, span[0], index), span[1])
+		if isinstance(expected, bytes):
+			assert_equal(query_bytes(bencode, path, index=index), expected)
+	assert_is_none(query(bencode, ("\0missing",), index=index))
+	assert_raises(ValueError, skip, bencode, len(bencode), index)
+
+
+def test_if_negative_list_indices_are_rejected():
+	bencode = b"d1:xli1ei2ei3eee"
+	assert_equal(query(bencode, ("x", 2)), 3)
+	assert_raises(ValueError, query, bencode, ("x", -1))
+	assert_raises(ValueError, query_span, bencode, -1)
+	assert_raises(ValueError, query, bencode, ("x", -1), index=scan(bencode))
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
@@ -0,0 +1,74 @@
+from bitphantom.bencode import Bencode, decode, encode, field, marshal, schema, unmarshal
+from tests import assert_equal, assert_false, assert_raises_regex, find_tests
+
+
+def natural(value: int):
+	if value <= 0:
+		raise ValueError("port entry is not a natural number")
+
+
+@schema
+class Peer:
+	ip: bytes
+	port: int = field(check=natural)
+	peer_id: bytes | None = field("peer id", default=None)
+
+
+@schema
+class Response:
+	interval: int
+	peers: list[Peer]
+	extra: dict[str, Bencode] | None = None
+	tracker_id: str | None = field("tracker id", default=None)
+
+
+RESPONSE: dict[str, Bencode] = {
+	"interval": 1800,
+	"peers": [{"ip": b"10.0.0.1", "port": 6881, "peer id": b"x" * 20}, {"ip": b"::1", "port": 1}],
+	"extra": {"a": [1, {"b": b"c"}]},
+	"tracker id": "tré",
+	"unknown": {"skipped": [b"entirely"]},
+}
+
+
+def test_if_unmarshal_reads_typed_objects_and_skips_unknown_entries():
+	buf = encode(RESPONSE)
+	response, end = unmarshal(Response, bytearray(buf))
+	assert_equal(end, len(buf))
+	assert_equal(response.interval, 1800)
+	assert_equal(response.peers[0], Peer(b"10.0.0.1", 6881, b"x" * 20))
+	assert_equal(response.peers[1].peer_id, None)
+	assert_equal(response.extra, {"a": [1, {"b": b"c"}]})
+	assert_equal(response.tracker_id, "tré")
+	assert_false(hasattr(response, "__dict__"))
+
+
+def test_if_marshal_writes_the_canonical_encoding():
+	expected = dict(RESPONSE)
+	del expected["unknown"]
+	response, _ = unmarshal(Response, encode(RESPONSE))
+	assert_equal(marshal(response), encode(expected))
+	assert_equal(decode(marshal(response))[0], decode(encode(expected))[0])
+
+
+def test_if_entry_spans_are_recorded():
+	buf = encode(RESPONSE)
+	spans: dict = {}
+	unmarshal(Response, buf, 0, spans)
+	start, end = spans["peers"]
+	assert_equal(decode(buf[start:end])[0], RESPONSE["peers"])
+
+
+def test_if_invalid_entries_are_reported():
+	assert_raises_regex(ValueError, "missing interval entry", unmarshal, Response, b"d5:peerslee")
+	invalid_peer = b"d8:intervali1e5:peersli1eee"
+	assert_raises_regex(ValueError, "Peer at offset 22 is not a dictionary", unmarshal, Response, invalid_peer)
+	invalid_port = b"d2:ip1:x4:port1:xe"
+	assert_raises_regex(ValueError, "port entry at offset 14 is not of type int", unmarshal, Peer, invalid_port)
+	assert_raises_regex(ValueError, "not a natural number", unmarshal, Peer, b"d2:ip1:x4:porti0ee")
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
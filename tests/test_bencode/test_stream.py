@@ -0,0 +1,86 @@
+import random
+
+from bitphantom.bencode import StreamDecoder, Token, Tokenizer, encode
+from tests import assert_equal, assert_false, assert_raises, assert_true, find_tests, generate_obj
+
+MISMATCH_DECODE: str = "produced different object than the original"
+
+MIN_DEPTH: int = 1
+MAX_DEPTH: int = 3  # NOTE: beware of the exponential growth
+
+
+def split_randomly(buf: bytes, max_chunk: int = 64) -> list[bytes]:
+	chunks = []
+	i = 0
+	while i < len(buf):
+		j = i + random.randint(1, max_chunk)
+		chunks.append(buf[i:j])
+		i = j
+	return chunks
+
+
+def test_if_stream_decoding_random_chunks_matches_the_original():
+	iterations = 100
+	for _ in range(iterations):
+		obj = generate_obj(MIN_DEPTH, MAX_DEPTH)
+		decoder = StreamDecoder()
+		values = []
+		for chunk in split_randomly(encode(obj)):
+			values += decoder.feed(chunk)
+		assert_equal(values, [obj], MISMATCH_DECODE)
+		assert_false(decoder.pending)
+		decoder.close()
+
+
+def test_if_stream_decoding_one_byte_at_a_time_matches_the_original():
+	iterations = 20
+	for _ in range(iterations):
+		obj = generate_obj(MIN_DEPTH, MAX_DEPTH)
+		decoder = StreamDecoder()
+		values = []
+		for b in encode(obj):
+			values += decoder.feed(bytes((b,)))
+		assert_equal(values, [obj], MISMATCH_DECODE)
+
+
+def test_if_stream_decoding_yields_concatenated_values_in_order():
+	objs = [generate_obj(MIN_DEPTH, MAX_DEPTH) for _ in range(10)]
+	decoder = StreamDecoder()
+	values = []
+	for chunk in split_randomly(b"".join(encode(obj) for obj in objs)):
+		values += decoder.feed(chunk)
+	assert_equal(values, objs, MISMATCH_DECODE)
+
+
+def test_if_stream_decoding_reports_incomplete_values():
+	decoder = StreamDecoder()
+	assert_equal(decoder.feed(b"d3:cow3:m"), [])
+	assert_true(decoder.pending)
+	assert_raises(ValueError, decoder.close)
+
+
+def test_if_stream_decoding_rejects_non_bytestring_keys():
+	decoder = StreamDecoder()
+	assert_raises(ValueError, decoder.feed, b"di1ei2ee")
+
+
+def test_if_partial_strings_are_reported_chunk_by_chunk():
+	pieces = random.randbytes(2**20)
+	bencode = encode({"pieces": pieces, "x": 1})
+	chunk_size = 2**16
+	tokenizer = Tokenizer(partial_strings=True)
+	events = []
+	for i in range(0, len(bencode), chunk_size):
+		events += tokenizer.feed(bencode[i : i + chunk_size])
+
+	assert_equal(events[:2], [(Token.DICTIONARY, None), (Token.KEY, "pieces")])
+	parts = events[2 : events.index((Token.KEY, "x"))]
+	assert_true(all(len(value) <= chunk_size for _, value in parts))
+	assert_equal([token for token, _ in parts[-2:]], [Token.BYTESTRING_PART, Token.BYTESTRING])
+	assert_equal(b"".join(value for _, value in parts), pieces)
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
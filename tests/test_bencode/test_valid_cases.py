@@ -3,6 +3,7 @@ import random
 from bitphantom.bencode import decode, encode
 from tests import (
 	assert_equal,
+	assert_raises_regex,
 	find_tests,
 	generate_bytestring,
 	generate_dictionary,
@@ -70,6 +71,42 @@ def test_if_decoding_is_the_opposite_of_encoding_a_dictionary():
 		assert_equal(len(bencode[offset:]), 0, DID_NOT_CONSUME_ERROR)
 
 
+def test_if_decoding_at_an_offset_returns_the_absolute_end_offset():
+	iterations = 100
+	for _ in range(iterations):
+		obj = generate_obj(MIN_DEPTH, MAX_DEPTH)
+		padding = generate_bytestring(MIN_DEPTH)
+		bencode = padding + encode(obj) + padding
+		benval, offset = decode(bencode, len(padding))
+		assert_equal(benval, obj, MISMATCH_DECODE)
+		assert_equal(offset, len(bencode) - len(padding), DID_NOT_CONSUME_ERROR)
+
+
+def test_if_decoding_a_memoryview_matches_decoding_bytes():
+	iterations = 100
+	for _ in range(iterations):
+		obj = generate_obj(MIN_DEPTH, MAX_DEPTH)
+		bencode = encode(obj)
+		benval, offset = decode(memoryview(bencode))
+		assert_equal(benval, obj, MISMATCH_DECODE)
+		assert_equal(offset, len(bencode), DID_NOT_CONSUME_ERROR)
+
+
+def test_if_decoding_deep_nesting_does_not_recurse():
+	depth = 100_000
+	benval, offset = decode(b"l" * depth + b"i7e" + b"e" * depth)
+	assert_equal(offset, 2 * depth + 3, DID_NOT_CONSUME_ERROR)
+	for _ in range(depth):
+		(benval,) = benval  # type: ignore[misc]
+	assert_equal(benval, 7, MISMATCH_DECODE)
+
+
+def test_if_decoding_beyond_max_depth_fails_cleanly():
+	bencode = b"d1:ald1:bleeee"
+	assert_equal(decode(bencode, max_depth=4)[0], {"a": [{"b": []}]})
+	assert_raises_regex(ValueError, "nesting deeper than 3 at offset 9", decode, bencode, 0, 3)
+
+
 def load_tests(_loader, suite, _pattern):
 	tests = find_tests(__name__)
 	suite.addTests(tests)
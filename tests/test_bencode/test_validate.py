@@ -0,0 +1,47 @@
+import random
+
+from bitphantom.bencode import Invalid, decode, encode, validate
+from tests import assert_equal, assert_is_instance, assert_is_none, find_tests, generate_obj
+
+MIN_DEPTH: int = 1
+MAX_DEPTH: int = 3
+
+
+def decodes_whole(buf: bytes) -> bool:
+	try:
+		_, end = decode(buf)
+	except (ValueError, IndexError):
+		return False
+	return end == len(buf)
+
+
+def test_if_valid_bencode_passes():
+	iterations = 50
+	for _ in range(iterations):
+		assert_is_none(validate(encode(generate_obj(MIN_DEPTH, MAX_DEPTH))))
+
+
+def test_if_validation_agrees_with_decoding_on_damaged_input():
+	iterations = 200
+	for _ in range(iterations):
+		buf = bytearray(encode(generate_obj(MIN_DEPTH, MAX_DEPTH)))
+		if random.random() < 0.5:
+			del buf[random.randrange(len(buf)) :]
+		else:
+			buf[random.randrange(len(buf))] = random.choice(b"ilde0123456789:x")
+		result = validate(buf)
+		assert_equal(result is None, decodes_whole(bytes(buf)), result)
+
+
+def test_if_limits_are_reported_with_their_offset():
+	assert_equal(validate(b"lli1eee", max_depth=1), Invalid(1, "nesting deeper than 1"))
+	assert_equal(validate(b"l5:abcdee", max_string=4), Invalid(1, "bytestring of size 5 exceeds the limit of 4"))
+	assert_equal(validate(b"li1ei2ee", max_elements=2), Invalid(4, "more than 2 elements"))
+	assert_equal(validate(b"i1ei2e"), Invalid(3, "trailing data after the value"))
+	assert_is_instance(validate(b"d1:\xffi1ee"), Invalid)
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
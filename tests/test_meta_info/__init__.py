@@ -0,0 +1,43 @@
+import random
+
+from bitphantom.bencode import Bencode, encode
+from bitphantom.meta_info import CHUNK_SIZE
+from tests import generate_string
+
+PIECE_LENGTH: int = 2**14
+
+
+def generate_files(min_size: int = 1, max_size: int = 20, max_depth: int = 3) -> list[Bencode]:
+	files = []
+	for _ in range(random.randint(min_size, max_size)):
+		depth = random.randint(1, max_depth)
+		path = [generate_string(0, 1, 8).replace("/", "_").encode() for _ in range(depth)]
+		files.append({"length": random.randint(1, 3 * PIECE_LENGTH), "path": path})
+	return files
+
+
+def generate_metainfo(multi_file: bool | None = None, piece_length: int = PIECE_LENGTH) -> dict[str, Bencode]:
+	if multi_file is None:
+		multi_file = random.random() < 0.5
+
+	info: dict[str, Bencode] = {"name": b"phantom", "piece length": piece_length}
+	if multi_file:
+		files = generate_files()
+		info["files"] = files
+		total = sum(file["length"] for file in files)  # type: ignore[index]
+	else:
+		total = random.randint(1, 8 * piece_length)
+		info["length"] = total
+
+	piece_count = -(-total // piece_length)
+	info["pieces"] = random.randbytes(CHUNK_SIZE * piece_count)
+
+	return {
+		"announce": b"http://tracker.example/announce",
+		"announce-list": [[b"http://tracker.example/announce"], [b"udp://backup.example:6969"]],
+		"info": info,
+	}
+
+
+def generate_torrent(multi_file: bool | None = None, piece_length: int = PIECE_LENGTH) -> bytes:
+	return encode(generate_metainfo(multi_file, piece_length))
@@ -0,0 +1,96 @@
+import os
+import pathlib
+import tempfile
+
+from bitphantom.bencode import decode, encode
+from bitphantom.cache import MetaInfoCache
+from bitphantom.meta_info import load_metainfo
+from tests import assert_equal, assert_less_equal, find_tests
+from tests.test_meta_info import generate_torrent
+
+
+def write_torrent(path: pathlib.Path, multi_file: bool | None = None) -> pathlib.Path:
+	path.write_bytes(generate_torrent(multi_file))
+	return path
+
+
+def test_if_cached_loads_match_uncached_loads():
+	with tempfile.TemporaryDirectory() as directory:
+		cache = MetaInfoCache()
+		for i, multi_file in enumerate((False, True)):
+			path = write_torrent(pathlib.Path(directory) / ("%d.torrent" % i), multi_file)
+			expected = load_metainfo(path)
+			assert_equal(cache.load(path), expected)
+			assert_equal(cache.load(path), expected)
+		assert_equal((cache.misses, cache.hits), (2, 2))
+
+
+def test_if_modified_files_miss_the_cache():
+	with tempfile.TemporaryDirectory() as directory:
+		path = write_torrent(pathlib.Path(directory) / "a.torrent")
+		cache = MetaInfoCache()
+		cache.load(path)
+
+		write_torrent(path)
+		st = path.stat()
+		os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+		assert_equal(cache.load(path), load_metainfo(path))
+		assert_equal(cache.misses, 2)
+
+
+def test_if_the_memory_tier_stays_within_its_budget():
+	with tempfile.TemporaryDirectory() as directory:
+		paths = [write_torrent(pathlib.Path(directory) / ("%d.torrent" % i), True) for i in range(10)]
+		cache = MetaInfoCache(max_bytes=2048)
+		for path in paths:
+			cache.load(path)
+		assert_less_equal(cache.size, 2048)
+		assert_equal(cache.evictions + len(cache), len(paths))
+
+
+def test_if_the_disk_tier_survives_a_new_cache():
+	with tempfile.TemporaryDirectory() as directory:
+		root = pathlib.Path(directory)
+		path = write_torrent(root / "a.torrent")
+		MetaInfoCache(directory=root / "cache").load(path)
+
+		cache = MetaInfoCache(directory=root / "cache")
+		assert_equal(cache.load(path), load_metainfo(path))
+		assert_equal((cache.disk_hits, cache.misses), (1, 0))
+
+
+def test_if_corrupt_disk_entries_are_discarded():
+	with tempfile.TemporaryDirectory() as directory:
+		root = pathlib.Path(directory)
+		path = write_torrent(root / "a.torrent", True)
+		MetaInfoCache(directory=root / "cache").load(path)
+		(entry,) = (root / "cache").iterdir()
+
+		for corrupt in (entry.read_bytes()[:-7], b"d4:name3:fooe", b"le", b"garbage"):
+			entry.write_bytes(corrupt)
+			cache = MetaInfoCache(directory=root / "cache")
+			assert_equal(cache.load(path), load_metainfo(path))
+			assert_equal((cache.disk_hits, cache.misses), (0, 1))
+			assert_equal(cache.disk_size, entry.stat().st_size)
+
+
+def test_if_entries_pointing_outside_the_file_are_discarded():
+	with tempfile.TemporaryDirectory() as directory:
+		root = pathlib.Path(directory)
+		path = write_torrent(root / "a.torrent")
+		MetaInfoCache(directory=root / "cache").load(path)
+		(entry,) = (root / "cache").iterdir()
+		compact, _ = decode(entry.read_bytes())
+
+		for offset in (-1, path.stat().st_size):
+			entry.write_bytes(encode({**compact, "pieces offset": offset}))
+			cache = MetaInfoCache(directory=root / "cache")
+			assert_equal(cache.load(path), load_metainfo(path))
+			assert_equal((cache.disk_hits, cache.misses), (0, 1))
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
+
@@ -0,0 +1,31 @@
+import pathlib
+import subprocess
+import sys
+import tempfile
+
+from tests import assert_equal, find_tests
+
+
+def display_metainfo(*args: str) -> subprocess.CompletedProcess:
+	command = (sys.executable, "-m", "bitphantom.display_metainfo", *args)
+	return subprocess.run(command, capture_output=True, text=True)
+
+
+def test_if_invalid_metainfo_is_reported():
+	with tempfile.TemporaryDirectory() as directory:
+		path = pathlib.Path(directory, "broken.torrent")
+		path.write_bytes(b"d8:announce")
+
+		result = display_metainfo("-i", str(path))
+		assert_equal(result.returncode, 1)
+		assert_equal(result.stderr.splitlines()[0], "invalid bencode")
+
+		result = display_metainfo("--batch", str(path))
+		assert_equal(result.returncode, 1)
+		assert_equal(result.stderr, "%s is not a directory\n" % path)
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
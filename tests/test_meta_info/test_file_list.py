@@ -0,0 +1,33 @@
+import pathlib
+
+from bitphantom.meta_info import Content, FileList, process_files
+from tests import assert_equal, assert_raises_regex, find_tests
+from tests.test_meta_info import generate_files
+
+
+def test_if_file_list_iterates_as_content():
+	iterations = 20
+	for _ in range(iterations):
+		raw_files = generate_files()
+		files = process_files(raw_files)
+		expected = [Content(pathlib.Path(b"/".join(file["path"]).decode()), file["length"]) for file in raw_files]
+		assert_equal(len(files), len(expected))
+		assert_equal(list(files), expected)
+		assert_equal(files[-1], expected[-1])
+		assert_equal(files[1:3], expected[1:3])
+		assert_equal(files.total_size, sum(content.size for content in expected))
+		assert_equal(list(FileList.from_contents(expected)), expected)
+
+
+def test_if_non_utf8_paths_are_reported_with_their_file():
+	raw_files = [
+		{"length": 1, "path": [b"ok"]},
+		{"length": 1, "path": [b"\xc3", b"\xa9"]},
+	]
+	assert_raises_regex(ValueError, "path of file 1", process_files, raw_files)
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
@@ -0,0 +1,46 @@
+import hashlib
+import random
+
+from bitphantom.bencode import encode
+from bitphantom.meta_info import CHUNK_SIZE, loads_metainfo
+from tests import assert_equal, find_tests
+
+PIECE_COUNT: int = 8
+
+
+def generate_info() -> dict:
+	return {
+		"name": b"phantom",
+		"piece length": 2**14,
+		"length": 2**14 * PIECE_COUNT,
+		"pieces": random.randbytes(CHUNK_SIZE * PIECE_COUNT),
+	}
+
+
+def test_if_info_hash_is_the_sha1_of_the_info_entry():
+	raw_info = encode(generate_info())
+	source = b"d8:announce15:http://tracker/4:info" + raw_info + b"e"
+	metainfo = loads_metainfo(source)
+	assert_equal(metainfo.info_hash, hashlib.sha1(raw_info).digest())
+
+
+def test_if_info_hash_is_taken_from_the_source_bytes_of_non_canonical_info():
+	info = generate_info()
+	canonical = encode(info)
+	# same entries as ``canonical`` but with the keys out of order
+	raw_info = b"d6:lengthi%de4:name7:phantom12:piece lengthi%de6:pieces%d:%se" % (
+		info["length"],
+		info["piece length"],
+		len(info["pieces"]),
+		info["pieces"],
+	)
+	source = b"d8:announce15:http://tracker/4:info" + raw_info + b"e"
+	metainfo = loads_metainfo(source)
+	assert_equal(metainfo.info_hash, hashlib.sha1(raw_info).digest())
+	assert_equal(len(raw_info), len(canonical))
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
@@ -0,0 +1,39 @@
+import tempfile
+
+from bitphantom.meta_info import load_metainfo, loads_metainfo
+from tests import assert_equal, assert_is_instance, assert_raises, find_tests
+from tests.test_meta_info import generate_torrent
+
+ATTRIBUTES: tuple[str, ...] = ("trackers", "name", "content", "piece_length", "pieces", "info_hash")
+
+
+def test_if_lazy_loading_matches_eager_loading():
+	iterations = 20
+	for _ in range(iterations):
+		source = generate_torrent()
+		with tempfile.NamedTemporaryFile(suffix=".torrent") as file:
+			file.write(source)
+			file.flush()
+			eager = loads_metainfo(source)
+			with load_metainfo(file.name, lazy=True) as lazy:
+				for attr in ATTRIBUTES:
+					assert_equal(getattr(lazy, attr), getattr(eager, attr), attr)
+				assert_equal(str(lazy), str(eager))
+				assert_is_instance(lazy.pieces, memoryview)
+				assert_equal(list(lazy.piece_table), list(eager.piece_table))
+
+
+def test_if_lazy_loading_rejects_files_without_info():
+	with tempfile.NamedTemporaryFile(suffix=".torrent") as file:
+		file.write(b"d8:announce3:urle")
+		file.flush()
+		assert_raises(ValueError, load_metainfo, file.name, True)
+
+	with tempfile.NamedTemporaryFile(suffix=".torrent") as file:
+		assert_raises(ValueError, load_metainfo, file.name, True)
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
@@ -0,0 +1,49 @@
+import pathlib
+import tempfile
+
+from bitphantom.meta_info import load_many, loads_metainfo
+from tests import assert_equal, assert_is_none, assert_is_not_none, find_tests
+from tests.test_meta_info import generate_torrent
+
+
+def write_torrents(directory: pathlib.Path, count: int) -> dict[str, bytes]:
+	sources = {}
+	for i in range(count):
+		path = directory / ("%d.torrent" % i)
+		source = generate_torrent()
+		path.write_bytes(source)
+		sources[str(path)] = source
+	return sources
+
+
+def test_if_batch_loading_matches_loading_one_at_a_time():
+	with tempfile.TemporaryDirectory() as directory:
+		sources = write_torrents(pathlib.Path(directory), 10)
+		for workers in (1, 2):
+			results = list(load_many(sources, workers=workers, batch_size=3))
+			assert_equal(sorted(result.path for result in results), sorted(sources))
+			for result in results:
+				assert_is_none(result.error)
+				assert_equal(result.metainfo, loads_metainfo(sources[result.path]))
+
+
+def test_if_batch_loading_reports_failures_per_file():
+	with tempfile.TemporaryDirectory() as directory:
+		root = pathlib.Path(directory)
+		sources = write_torrents(root, 2)
+		broken = root / "broken.torrent"
+		broken.write_bytes(b"d4:infoi1ee")
+		missing = root / "missing.torrent"
+
+		results = {result.path: result for result in load_many([*sources, broken, missing], workers=2)}
+		assert_equal(len(results), 4)
+		assert_is_not_none(results[str(broken)].error)
+		assert_is_not_none(results[str(missing)].error)
+		for path in sources:
+			assert_is_none(results[path].error)
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
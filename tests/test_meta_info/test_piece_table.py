@@ -0,0 +1,50 @@
+import hashlib
+import random
+
+from bitphantom.meta_info import CHUNK_SIZE, PieceTable, get_piece, iterate_pieces
+from tests import assert_equal, assert_is_none, assert_raises, find_tests
+
+
+def generate_pieces(count: int) -> list[bytes]:
+	return [hashlib.sha1(random.randbytes(8)).digest() for _ in range(count)]
+
+
+def test_if_piece_table_indexes_and_slices_like_a_list():
+	digests = generate_pieces(50)
+	table = PieceTable(b"".join(digests))
+	assert_equal(len(table), len(digests))
+	assert_equal([bytes(piece) for piece in table], digests)
+	for i in (0, 7, 49, -1, -50):
+		assert_equal(bytes(table[i]), digests[i])
+	for s in (slice(3, 9), slice(None, None, -1), slice(40, 80), slice(10, 2)):
+		assert_equal([bytes(piece) for piece in table[s]], digests[s])
+	assert_raises(IndexError, table.__getitem__, 50)
+
+
+def test_if_compare_returns_the_failing_indices():
+	digests = generate_pieces(100)
+	table = PieceTable(b"".join(digests))
+	assert_equal(table.compare(digests), [])
+
+	computed = list(digests)
+	failing = sorted(random.sample(range(len(digests)), 7))
+	for i in failing:
+		computed[i] = bytes(CHUNK_SIZE)
+	assert_equal(table.compare(computed), failing)
+	assert_equal(table.compare(computed[20:60], start=20), [i for i in failing if 20 <= i < 60])
+
+
+def test_if_legacy_piece_helpers_still_work():
+	digests = generate_pieces(5)
+	pieces = b"".join(digests)
+	assert_equal(get_piece(pieces, 2), digests[2])
+	assert_equal(get_piece(pieces, -1), digests[-1])
+	assert_is_none(get_piece(pieces, 5))
+	assert_equal(list(iterate_pieces(pieces)), digests)
+	assert_equal(list(iterate_pieces(pieces, reverse=True)), digests[::-1])
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
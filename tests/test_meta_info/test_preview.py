@@ -0,0 +1,36 @@
+import pathlib
+
+from bitphantom.meta_info import Content, FileList, iter_preview
+from tests import assert_equal, find_tests
+
+FILES = FileList.from_contents(
+	[
+		Content(pathlib.Path("b/y"), 2),
+		Content(pathlib.Path("a"), 1),
+		Content(pathlib.Path("b/c/z"), 3),
+		Content(pathlib.Path("b/x"), 4),
+	]
+)
+
+
+def test_if_preview_draws_sorted_tree():
+	expected = [
+		"├─ a (1)",
+		"└─ b/",
+		"   ├─ c/",
+		"   │  └─ z (3)",
+		"   ├─ x (4)",
+		"   └─ y (2)",
+	]
+	assert_equal(list(iter_preview(FILES)), expected)
+
+
+def test_if_preview_respects_max_depth_and_limit():
+	assert_equal(list(iter_preview(FILES, max_depth=1)), ["├─ a (1)", "└─ b/"])
+	assert_equal(list(iter_preview(FILES, "\t", limit=2)), ["\t├─ a (1)", "\t└─ b/", "\t..."])
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
@@ -0,0 +1,38 @@
+import hashlib
+import pathlib
+import random
+
+from bitphantom.bencode import Bencode, encode
+from bitphantom.meta_info import MetaInfo, loads_metainfo
+
+PIECE_LENGTH: int = 2**12
+
+
+def write_content(root: pathlib.Path, multi_file: bool, piece_length: int = PIECE_LENGTH) -> MetaInfo:
+	"""Writes random content under ``root`` and returns the metainfo describing it."""
+	info: dict[str, Bencode] = {"name": b"phantom", "piece length": piece_length}
+	if multi_file:
+		files = []
+		for i in range(random.randint(2, 8)):
+			path = [b"dir%d" % (i % 3), b"file%d" % i]
+			files.append((path, random.randbytes(random.randint(1, 3 * piece_length))))
+		info["files"] = [{"length": len(data), "path": path} for path, data in files]
+		for path, data in files:
+			file_path = root.joinpath("phantom", *(part.decode() for part in path))
+			file_path.parent.mkdir(parents=True, exist_ok=True)
+			file_path.write_bytes(data)
+		content = b"".join(data for _, data in files)
+	else:
+		content = random.randbytes(random.randint(1, 8 * piece_length))
+		info["length"] = len(content)
+		(root / "phantom").write_bytes(content)
+
+	pieces = (content[i : i + piece_length] for i in range(0, len(content), piece_length))
+	info["pieces"] = b"".join(hashlib.sha1(piece).digest() for piece in pieces)
+	return loads_metainfo(encode({"announce": b"http://tracker.example/announce", "info": info}))
+
+
+def content_paths(root: pathlib.Path, metainfo: MetaInfo) -> list[pathlib.Path]:
+	if isinstance(metainfo.content, int):
+		return [root / "phantom"]
+	return [root / "phantom" / file.path for file in metainfo.content]
@@ -0,0 +1,76 @@
+import pathlib
+import random
+import tempfile
+
+from bitphantom.bencode import encode
+from bitphantom.make_torrent import auto_piece_length, make_metainfo
+from bitphantom.meta_info import loads_metainfo
+from bitphantom.verify import verify
+from tests import assert_equal, assert_raises, assert_true, find_tests
+
+TRACKERS: list[list[str]] = [["http://tracker.example/announce", "http://backup.example/announce"]]
+
+
+def write_tree(root: pathlib.Path) -> dict[str, bytes]:
+	files = {}
+	for i in range(random.randint(2, 10)):
+		relative = "dir%d/file%d" % (i % 3, i) if i % 2 else "file%d" % i
+		data = random.randbytes(random.randint(1, 40_000))
+		(root / relative).parent.mkdir(parents=True, exist_ok=True)
+		(root / relative).write_bytes(data)
+		files[relative] = data
+	(root / "empty").touch()
+	return files
+
+
+def test_if_created_multi_file_metainfo_verifies_against_its_content():
+	with tempfile.TemporaryDirectory() as directory:
+		root = pathlib.Path(directory) / "phantom"
+		root.mkdir()
+		files = write_tree(root)
+
+		raw = make_metainfo(root, piece_length=2**12, trackers=TRACKERS, workers=3)
+		metainfo = loads_metainfo(encode(raw))
+		assert_equal(metainfo.name, "phantom")
+		assert_equal(sorted(str(file.path) for file in metainfo.content), sorted(files))
+		assert_equal([[url.geturl().decode() for url in tier] for tier in metainfo.trackers], TRACKERS)
+		assert_true(verify(metainfo, directory).all())
+
+
+def test_if_created_single_file_metainfo_verifies_against_its_content():
+	with tempfile.TemporaryDirectory() as directory:
+		path = pathlib.Path(directory) / "phantom.bin"
+		path.write_bytes(random.randbytes(100_000))
+
+		metainfo = loads_metainfo(encode(make_metainfo(path, trackers=[TRACKERS[0][:1]])))
+		assert_equal(metainfo.content, 100_000)
+		assert_equal(metainfo.piece_length, auto_piece_length(100_000))
+		assert_true(verify(metainfo, directory).all())
+
+
+def test_if_several_paths_require_a_name():
+	with tempfile.TemporaryDirectory() as directory:
+		root = pathlib.Path(directory)
+		(root / "a").write_bytes(b"a")
+		(root / "b").write_bytes(b"b")
+		assert_raises(ValueError, make_metainfo, [root / "a", root / "b"])
+		metainfo = loads_metainfo(encode(make_metainfo([root / "a", root / "b"], name="ab", trackers=TRACKERS)))
+		assert_equal([str(file.path) for file in metainfo.content], ["a", "b"])
+
+
+def test_if_trackerless_metainfo_loads():
+	with tempfile.TemporaryDirectory() as directory:
+		path = pathlib.Path(directory) / "phantom.bin"
+		path.write_bytes(random.randbytes(1000))
+
+		raw = make_metainfo(path)
+		assert_true("announce" not in raw and "announce-list" not in raw)
+		metainfo = loads_metainfo(encode(raw))
+		assert_equal(metainfo.trackers, [])
+		assert_equal(metainfo.content, 1000)
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
@@ -0,0 +1,53 @@
+import pathlib
+import random
+import tempfile
+
+from bitphantom.bencode import encode
+from bitphantom.meta_info import loads_metainfo
+from bitphantom.storage import content_files, read_pieces
+from tests import assert_equal, assert_is_none, assert_raises, find_tests
+
+
+def test_if_block_reads_yield_the_same_pieces():
+	with tempfile.TemporaryDirectory() as directory:
+		root = pathlib.Path(directory)
+		files = []
+		for i in range(5):
+			path = root / ("file%d" % i)
+			path.write_bytes(random.randbytes(random.randint(0, 5000)))
+			files.append((path, path.stat().st_size))
+		content = b"".join(path.read_bytes() for path, _ in files)
+
+		for piece_length, read_size in ((1000, 1), (1000, 3500), (4096, 2**22)):
+			pieces = [bytes(piece) for piece in read_pieces(files, piece_length, read_size)]
+			assert_equal(pieces, [content[i : i + piece_length] for i in range(0, len(content), piece_length)])
+
+
+def test_if_missing_bytes_fail_only_their_pieces():
+	with tempfile.TemporaryDirectory() as directory:
+		root = pathlib.Path(directory)
+		(root / "a").write_bytes(bytes(2500))
+		(root / "c").write_bytes(bytes(1000))
+		files = [(root / "a", 3000), (root / "b", 1000), (root / "c", 1000)]
+		pieces = list(read_pieces(files, 1000, 2000))
+		assert_equal([piece is None for piece in pieces], [False, False, True, True, False])
+		assert_is_none(pieces[2])
+
+
+def test_if_paths_escaping_the_root_are_rejected():
+	announce = b"http://tracker.example/announce"
+	info = {"name": b"phantom", "piece length": 2**14, "pieces": bytes(20)}
+	for path in ([b"..", b"etc", b"passwd"], [b"", b"etc", b"passwd"], [b"a", b"..", b"..", b"b"]):
+		files = [{"length": 1, "path": path}]
+		metainfo = loads_metainfo(encode({"announce": announce, "info": {**info, "files": files}}))
+		assert_raises(ValueError, content_files, metainfo, "/tmp/root")
+
+	metainfo = loads_metainfo(encode({"announce": announce, "info": {**info, "length": 1}}))
+	metainfo.name = "../phantom"
+	assert_raises(ValueError, content_files, metainfo, "/tmp/root")
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
@@ -0,0 +1,55 @@
+import os
+import pathlib
+import tempfile
+
+from bitphantom.resume import ResumeStore, decode_resume, encode_resume, recheck
+from bitphantom.span_index import SpanIndex
+from tests import assert_equal, assert_false, assert_is_none, assert_true, find_tests
+from tests.test_storage import content_paths, write_content
+
+
+def test_if_resume_data_round_trips():
+	with tempfile.TemporaryDirectory() as directory:
+		root = pathlib.Path(directory)
+		metainfo = write_content(root / "content", True)
+		store = ResumeStore(root / "resume")
+		assert_is_none(store.load(metainfo.info_hash))
+
+		bitfield = recheck(metainfo, root / "content", store, workers=2)
+		assert_true(bitfield.all())
+		data = store.load(metainfo.info_hash)
+		assert_equal(decode_resume(encode_resume(data)), data)
+		assert_equal(data.bitfield, bitfield)
+
+
+def test_if_only_changed_files_are_rehashed():
+	with tempfile.TemporaryDirectory() as directory:
+		root = pathlib.Path(directory)
+		metainfo = write_content(root / "content", True)
+		store = ResumeStore(root / "resume")
+		recheck(metainfo, root / "content", store, workers=2)
+
+		calls = []
+		bitfield = recheck(metainfo, root / "content", store, progress=lambda done, total: calls.append(total))
+		assert_true(bitfield.all())
+		assert_equal(calls, [])
+
+		path = content_paths(root / "content", metainfo)[-1]
+		data = bytearray(path.read_bytes())
+		data[0] ^= 0xFF
+		path.write_bytes(data)
+		stat = path.stat()
+		os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+		bitfield = recheck(metainfo, root / "content", store, progress=lambda done, total: calls.append(total))
+		assert_false(bitfield.all())
+		assert_equal(calls[-1], len(SpanIndex.from_metainfo(metainfo).file_pieces(len(metainfo.content) - 1)))
+		failed = list(bitfield.indices(False))
+		assert_equal(len(failed), 1)
+		assert_equal(store.load(metainfo.info_hash).bitfield, bitfield)
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
@@ -0,0 +1,47 @@
+import random
+
+from bitphantom.span_index import FileSpan, SpanIndex
+from tests import assert_equal, assert_raises, find_tests
+
+
+def naive_spans(sizes: list[int], piece_length: int, piece: int) -> list[FileSpan]:
+	spans = []
+	start, end = piece * piece_length, min((piece + 1) * piece_length, sum(sizes))
+	offset = 0
+	for f, size in enumerate(sizes):
+		lo, hi = max(start, offset), min(end, offset + size)
+		if lo < hi:
+			spans.append(FileSpan(f, lo - offset, hi - lo))
+		offset += size
+	return spans
+
+
+def test_if_piece_spans_cover_exactly_the_piece_bytes():
+	iterations = 50
+	for _ in range(iterations):
+		sizes = [random.choice((0, random.randint(1, 100), random.randint(1, 5000))) for _ in range(30)]
+		sizes.append(1)
+		piece_length = random.choice((16, 256, 1024))
+		index = SpanIndex(sizes, piece_length)
+		assert_equal(len(index), -(-sum(sizes) // piece_length))
+		for piece in range(len(index)):
+			assert_equal(index.piece_spans(piece), naive_spans(sizes, piece_length, piece))
+
+
+def test_if_file_pieces_are_the_pieces_whose_spans_touch_the_file():
+	sizes = [random.randint(0, 3000) for _ in range(40)] + [1]
+	index = SpanIndex(sizes, 512)
+	touching: dict[int, set[int]] = {f: set() for f in range(len(sizes))}
+	for piece in range(len(index)):
+		for span in index.piece_spans(piece):
+			touching[span.file].add(piece)
+	for f in range(len(sizes)):
+		assert_equal(set(index.file_pieces(f)), touching[f])
+	assert_raises(IndexError, index.file_pieces, len(sizes))
+	assert_raises(IndexError, index.piece_spans, len(index))
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
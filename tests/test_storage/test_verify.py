@@ -0,0 +1,50 @@
+import pathlib
+import tempfile
+
+from bitphantom.verify import verify
+from tests import assert_equal, assert_true, find_tests
+from tests.test_storage import PIECE_LENGTH, content_paths, write_content
+
+
+def test_if_intact_content_verifies_completely():
+	for multi_file in (False, True):
+		with tempfile.TemporaryDirectory() as directory:
+			root = pathlib.Path(directory)
+			metainfo = write_content(root, multi_file)
+			calls = []
+			bitfield = verify(metainfo, root, workers=2, progress=lambda done, total: calls.append((done, total)))
+			assert_true(bitfield.all())
+			assert_equal(len(calls), len(metainfo.piece_table))
+			assert_equal(calls[-1], (len(bitfield), len(bitfield)))
+
+
+def test_if_corrupted_bytes_fail_only_their_piece():
+	with tempfile.TemporaryDirectory() as directory:
+		root = pathlib.Path(directory)
+		metainfo = write_content(root, False)
+		path = content_paths(root, metainfo)[0]
+		data = bytearray(path.read_bytes())
+		offset = len(data) - 1
+		data[offset] ^= 0xFF
+		path.write_bytes(data)
+
+		bitfield = verify(metainfo, root, workers=2)
+		assert_equal(list(bitfield.indices(False)), [offset // PIECE_LENGTH])
+
+
+def test_if_missing_files_fail_the_pieces_they_cover():
+	with tempfile.TemporaryDirectory() as directory:
+		root = pathlib.Path(directory)
+		metainfo = write_content(root, True)
+		paths = content_paths(root, metainfo)
+		paths[0].unlink()
+
+		bitfield = verify(metainfo, root, workers=2)
+		size = metainfo.content[0].size
+		assert_equal(list(bitfield.indices(False)), [i for i in range(len(bitfield)) if i * PIECE_LENGTH < size])
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite
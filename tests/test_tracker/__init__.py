@@ -0,0 +1,111 @@
+import asyncio
+import socket
+import urllib.parse
+from collections.abc import Callable
+
+from bitphantom.bencode import encode
+
+PEERS: bytes = socket.inet_aton("10.0.0.1") + (6881).to_bytes(2, "big") + socket.inet_aton("10.0.0.2") + b"\x1a\xe2"
+
+Query = dict[bytes, list[bytes]]
+
+
+def parse_query(query: bytes) -> Query:
+	"""Parses a query string into raw bytes, as info hashes are not text."""
+	res: Query = {}
+	for pair in query.split(b"&"):
+		name, _, value = pair.partition(b"=")
+		res.setdefault(name, []).append(urllib.parse.unquote_to_bytes(value))
+	return res
+
+
+def announce_reply(path: bytes, query: Query) -> bytes:
+	if path.endswith(b"/scrape"):
+		stats = encode({"complete": 3, "downloaded": 7, "incomplete": 1})
+		return b"d5:filesd" + b"".join(b"20:" + h + stats for h in query[b"info_hash"]) + b"ee"
+	return encode({"interval": 1800, "peers": PEERS, "tracker id": b"stand-in"})
+
+
+def failure_reply(_path: bytes, _query: Query) -> bytes:
+	return encode({"failure reason": b"unregistered torrent"})
+
+
+class StandInTracker:
+	"""A local HTTP tracker answering every request with ``reply(path, query)``.
+
+	``keep_alive=False`` closes every connection after its response without saying so, as a
+	tracker timing out idle connections would. ``delay`` holds each request for that many seconds.
+	``header`` is an extra header line sent with every response.
+	"""
+
+	def __init__(
+		self,
+		reply: Callable[[bytes, Query], bytes] = announce_reply,
+		keep_alive: bool = True,
+		chunked: bool = False,
+		delay: float = 0.0,
+		header: bytes = b"",
+	):
+		self.reply = reply
+		self.keep_alive = keep_alive
+		self.chunked = chunked
+		self.delay = delay
+		self.header = header
+		self.requests: list[tuple[bytes, Query]] = []
+		self.connections = 0
+		self.in_flight = 0
+		self.max_in_flight = 0
+		self._handlers: list[tuple[asyncio.Task, asyncio.StreamWriter]] = []
+
+	async def __aenter__(self) -> "StandInTracker":
+		self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+		port = self.server.sockets[0].getsockname()[1]
+		self.url = urllib.parse.urlparse(b"http://127.0.0.1:%d/announce" % port)
+		return self
+
+	async def __aexit__(self, *_):
+		self.server.close()
+		for _, writer in self._handlers:
+			writer.close()
+		await asyncio.gather(*(task for task, _ in self._handlers))
+		await self.server.wait_closed()
+
+	async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+		self.connections += 1
+		self._handlers.append((asyncio.current_task(), writer))
+		try:
+			while True:
+				request_line = await reader.readuntil(b"\r\n")
+				while await reader.readuntil(b"\r\n") != b"\r\n":
+					pass
+				path, _, query = request_line.split()[1].partition(b"?")
+				self.requests.append((path, parse_query(query)))
+
+				self.in_flight += 1
+				self.max_in_flight = max(self.max_in_flight, self.in_flight)
+				await asyncio.sleep(self.delay)
+				self.in_flight -= 1
+
+				body = self.reply(path, self.requests[-1][1])
+				if self.chunked:
+					middle = len(body) // 2
+					chunks = b"".join(b"%x\r\n%s\r\n" % (len(c), c) for c in (body[:middle], body[middle:]) if c)
+					head = b"HTTP/1.1 200 OK\r\n%sTransfer-Encoding: chunked\r\n\r\n" % self.header
+					writer.write(head + chunks + b"0\r\n\r\n")
+				else:
+					writer.write(b"HTTP/1.1 200 OK\r\n%sContent-Length: %d\r\n\r\n" % (self.header, len(body)) + body)
+				await writer.drain()
+				if not self.keep_alive:
+					break
+		except (asyncio.IncompleteReadError, ConnectionError):
+			pass
+		finally:
+			writer.close()
+
+
+def unused_url() -> urllib.parse.ParseResultBytes:
+	"""An announce url on a local port nothing listens on."""
+	with socket.socket() as sock:
+		sock.bind(("127.0.0.1", 0))
+		port = sock.getsockname()[1]
+	return urllib.parse.urlparse(b"http://127.0.0.1:%d/announce" % port)
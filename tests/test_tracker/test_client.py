@@ -0,0 +1,149 @@
+import asyncio
+import socket
+
+from bitphantom.tracker import (
+	AnnounceRequest,
+	AnnounceResponse,
+	Peer,
+	TrackerClient,
+	parse_compact_peers,
+	parse_compact_peers6,
+	parse_peers,
+	scrape_url,
+)
+from tests import assert_equal, assert_is_instance, assert_less_equal, assert_raises, assert_true, find_tests
+from tests.test_tracker import StandInTracker, failure_reply, unused_url
+
+INFO_HASH: bytes = bytes(range(236, 256))
+REQUEST = AnnounceRequest(INFO_HASH, b"-BP0100-\x00\xff" + bytes(10), 6881, left=1024, event="started")
+
+
+def test_if_peers_are_parsed_in_every_form():
+	peers = [Peer("10.0.0.1", 6881), Peer("10.0.0.2", 6882)]
+	compact = b"".join(socket.inet_aton(ip) + port.to_bytes(2, "big") for ip, port in peers)
+	assert_equal(parse_compact_peers(compact), peers)
+	assert_equal(parse_peers([{"ip": b"10.0.0.1", "port": 6881, "peer id": b"x"}]), peers[:1])
+	assert_equal(parse_compact_peers6(socket.inet_pton(socket.AF_INET6, "::1") + b"\x1a\xe1"), [Peer("::1", 6881)])
+	with assert_raises(ValueError):
+		parse_compact_peers(compact[:-1])
+
+
+def test_if_announces_reuse_the_connection():
+	async def announce():
+		async with StandInTracker() as tracker, TrackerClient() as client:
+			responses = [await client.announce_to(tracker.url, REQUEST) for _ in range(3)]
+			return tracker, client, responses
+
+	tracker, client, responses = asyncio.run(announce())
+	assert_equal(tracker.connections, 1)
+	assert_equal((client.pool.opened, client.pool.reused), (1, 2))
+	assert_equal(responses[0].interval, 1800)
+	assert_equal(responses[0].peers, [Peer("10.0.0.1", 6881), Peer("10.0.0.2", 6882)])
+
+	path, query = tracker.requests[0]
+	assert_equal(path, b"/announce")
+	assert_equal(query[b"info_hash"], [INFO_HASH])
+	assert_equal(query[b"peer_id"], [REQUEST.peer_id])
+	assert_equal(query[b"event"], [b"started"])
+	assert_equal(query[b"compact"], [b"1"])
+	assert_equal(tracker.requests[1][1][b"trackerid"], [b"stand-in"])
+
+
+def test_if_closed_idle_connections_are_replaced():
+	async def announce():
+		async with StandInTracker(keep_alive=False) as tracker, TrackerClient() as client:
+			responses = [await client.announce_to(tracker.url, REQUEST) for _ in range(3)]
+			return tracker, responses
+
+	tracker, responses = asyncio.run(announce())
+	assert_equal(tracker.connections, 3)
+	assert_equal(len(responses), 3)
+
+
+def test_if_chunked_responses_are_read():
+	async def announce():
+		async with StandInTracker(chunked=True) as tracker, TrackerClient() as client:
+			return await client.announce_to(tracker.url, REQUEST), await client.announce_to(tracker.url, REQUEST)
+
+	first, second = asyncio.run(announce())
+	assert_equal(first, second)
+	assert_equal(first.interval, 1800)
+
+
+def test_if_announce_fails_over_across_tiers():
+	async def announce():
+		async with StandInTracker(failure_reply) as failing, StandInTracker() as good, TrackerClient() as client:
+			tiers = [[unused_url()], [failing.url, good.url]]
+			response = await client.announce(tiers, REQUEST)
+			return good, tiers, response
+
+	good, tiers, response = asyncio.run(announce())
+	assert_equal(response.tracker, good.url.geturl())
+	assert_equal(tiers[1][0], good.url)
+
+
+def test_if_announce_fails_over_past_overlong_headers():
+	async def announce():
+		async with (
+			StandInTracker(header=b"X-Padding: %s\r\n" % (b"x" * 2**17)) as padded,
+			StandInTracker() as good,
+			TrackerClient() as client,
+		):
+			return good, await client.announce([[padded.url, good.url]], REQUEST)
+
+	good, response = asyncio.run(announce())
+	assert_equal(response.tracker, good.url.geturl())
+
+
+def test_if_announce_fails_when_no_tracker_answers():
+	async def announce():
+		async with StandInTracker(failure_reply) as failing, TrackerClient() as client:
+			await client.announce([[unused_url(), failing.url]], REQUEST)
+
+	with assert_raises(ConnectionError) as ctx:
+		asyncio.run(announce())
+	assert_equal(str(ctx.exception).count("\n"), 2)
+	assert_true(str(ctx.exception).endswith("tracker failure: unregistered torrent"))
+
+
+def test_if_announce_many_bounds_concurrency():
+	async def announce(max_concurrency, max_per_host):
+		async with (
+			StandInTracker(delay=0.005) as tracker,
+			TrackerClient(max_concurrency, max_per_host) as client,
+		):
+			torrents = [([[tracker.url]], REQUEST._replace(info_hash=bytes(19) + bytes([i]))) for i in range(100)]
+			return tracker, await client.announce_many(torrents)
+
+	for max_concurrency, max_per_host in ((3, 16), (16, 4)):
+		tracker, responses = asyncio.run(announce(max_concurrency, max_per_host))
+		assert_equal(len(responses), 100)
+		for response in responses:
+			assert_is_instance(response, AnnounceResponse)
+		limit = min(max_concurrency, max_per_host)
+		assert_less_equal(tracker.max_in_flight, limit)
+		assert_less_equal(tracker.connections, limit)
+		assert_equal(sorted(query[b"info_hash"][0][-1] for _, query in tracker.requests), list(range(100)))
+
+
+def test_if_scrape_reads_binary_info_hash_keys():
+	other = bytes(20)
+
+	async def scrape():
+		async with StandInTracker() as tracker, TrackerClient() as client:
+			return tracker, await client.scrape(tracker.url, [INFO_HASH, other])
+
+	tracker, stats = asyncio.run(scrape())
+	assert_equal(tracker.requests[0][0], b"/scrape")
+	assert_equal(sorted(stats), sorted([INFO_HASH, other]))
+	assert_equal((stats[INFO_HASH].complete, stats[INFO_HASH].downloaded, stats[INFO_HASH].incomplete), (3, 7, 1))
+
+	url = tracker.url._replace(path=b"/x/announce.php")
+	assert_equal(scrape_url(url).path, b"/x/scrape.php")
+	assert_equal(scrape_url(url._replace(path=b"/x/a")), None)
+
+
+def load_tests(_loader, suite, _pattern):
+	tests = find_tests(__name__)
+	suite.addTests(tests)
+	return suite